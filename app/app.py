@@ -1,44 +1,751 @@
 # app/app.py
 
-from flask import Flask, jsonify, send_file, request
+from flask import Flask, Response, jsonify, send_file, request, g
 from flask_cors import CORS
-import sqlite3
 import os
+import sys
+import sqlite3
+import json
+import base64
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import partial
+from urllib.parse import urlencode
 from datetime import datetime, date
 import logging
 from flask import send_from_directory
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.connection import get_read_connection, transaction, snapshot_dir
+from database.database import ROLLING_WINDOWS
+from database.sketch import PriceSketch, RELATIVE_ACCURACY
+
 # --- Setup ---
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_NAME = os.environ.get("DB_PATH", "/app/db_volume/housing_tracker.db")
-
-def get_db_connection():
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def generate_signature(row):
-    def normalize(val):
-        if val is None:
-            return ""
-        if isinstance(val, (int, float)):
-            return f"{float(val):.1f}".rstrip('0').rstrip('.')  # e.g., 2.0 → "2", 2.5 → "2.5"
-        return str(val).strip().lower()
-
-    return "|".join([
-        normalize(row["unit_id"]),
-        normalize(row["title"]),
-        normalize(row["unit_name"]),
-        normalize(row["beds"]),
-        normalize(row["baths"]),
-        normalize(row["sqft"])
-    ])
 
 
+def rolling_window():
+    # ?window= for the rolling_metrics endpoints; None when it isn't a window the cleaner keeps
+    window = request.args.get("window", str(ROLLING_WINDOWS[0]))
+    return int(window) if window.isdigit() and int(window) in ROLLING_WINDOWS else None
+
+
+# --- Response cache ---
+
+# Every /api/* answer is a function of (path, query args, meta.last_updated), and
+# last_updated only moves when run.py finishes. Recent answers are kept in memory per
+# worker, and clients revalidate with ETag / If-Modified-Since instead of re-downloading.
+# Streamed endpoints compress on the fly, so their ETag also names the Content-Encoding:
+# each encoding of a body is its own representation.
+API_CACHE_SIZE = int(os.environ.get("API_CACHE_SIZE", "256"))          # responses per worker; 0 disables
+API_CACHE_MAX_AGE = int(os.environ.get("API_CACHE_MAX_AGE", "300"))    # seconds clients may reuse without asking
+UNCACHED_PATHS = {"/api/ping", "/api/download-latest-csv"}
+STREAMED_ENDPOINTS = {"gold_metrics", "silver_latest", "silver_by_date"}   # views returning stream_json_rows()
+
+
+class ResponseCache:
+    # Bounded LRU of (body, mimetype) shared by the worker's threads
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+def data_version():
+    # meta.last_updated, or None when the pipeline hasn't written it (then nothing is cached)
+    conn = get_read_connection()
+    try:
+        row = conn.execute("SELECT last_updated FROM meta WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    finally:
+        conn.close()
+    return row["last_updated"] if row else None
+
+
+def response_etag(cache_key, encoding):
+    return hashlib.sha1(repr((cache_key, encoding or "identity")).encode()).hexdigest()[:20]
+
+
+def register_response_cache(app):
+    cache = ResponseCache(API_CACHE_SIZE)
+
+    @app.before_request
+    def serve_from_cache():
+        g.cache_key = None
+        if request.method != "GET" or not request.path.startswith("/api/") or request.path in UNCACHED_PATHS:
+            return None
+        version = data_version()
+        if version is None:
+            return None
+        g.cache_key = (request.path, tuple(sorted(request.args.items(multi=True))), version)
+        encoding = negotiated_encoding() if request.endpoint in STREAMED_ENDPOINTS else None
+        g.etag = response_etag(g.cache_key, encoding)
+        # A client that already holds this version, in the encoding it would get now, needs no body at all
+        if request.if_none_match.contains(g.etag):
+            return app.response_class(status=304)
+        entry = cache.get(g.cache_key)
+        if entry is not None:
+            g.cache_hit = True
+            return app.response_class(entry[0], mimetype=entry[1])
+        return None
+
+    @app.after_request
+    def store_in_cache(response):
+        if g.get("cache_key") is None or response.status_code not in (200, 304):
+            return response
+        if (response.status_code == 200 and response.mimetype == "application/json"
+                and not g.get("cache_hit") and not response.is_streamed):
+            cache.put(g.cache_key, (response.get_data(), response.mimetype))
+        if response.status_code == 200:
+            g.etag = response_etag(g.cache_key, response.headers.get("Content-Encoding"))
+        response.set_etag(g.etag)
+        if request.endpoint in STREAMED_ENDPOINTS:
+            response.vary.add("Accept-Encoding")
+        try:
+            response.last_modified = datetime.fromisoformat(g.cache_key[2]).astimezone()
+        except ValueError:
+            pass
+        response.cache_control.public = True
+        response.cache_control.max_age = API_CACHE_MAX_AGE
+        return response.make_conditional(request)
+
+
+# --- Published snapshots ---
+
+# publish.py writes every parameterless (and per-date) response at the end of run.py,
+# pre-compressed. They are served as files while the manifest's last_updated matches
+# meta.last_updated; anything else, or a stale manifest, falls through to live queries.
+SNAPSHOT_ENCODINGS = (("br", ".br"), ("gzip", ".gz"), ("identity", ""))
+_snapshot_manifest = {"mtime": None, "manifest": None}
+
+
+def load_snapshot_manifest():
+    path = os.path.join(snapshot_dir(), "manifest.json")
+    try:
+        mtime = os.path.getmtime(path)
+        if _snapshot_manifest["mtime"] != mtime:
+            with open(path, "rb") as f:
+                _snapshot_manifest["manifest"] = json.load(f)
+            _snapshot_manifest["mtime"] = mtime
+    except (OSError, ValueError):
+        return None
+    return _snapshot_manifest["manifest"]
+
+
+def snapshot_key():
+    # Must match snapshot_key() in publish.py: the path plus its sorted query string
+    args = sorted(request.args.items(multi=True))
+    return request.path + ("?" + urlencode(args) if args else "")
+
+
+def register_snapshots(app):
+    app.config.setdefault("SERVE_SNAPSHOTS", True)
+
+    @app.before_request
+    def serve_snapshot():
+        if not app.config["SERVE_SNAPSHOTS"] or request.method != "GET" or not request.path.startswith("/api/"):
+            return None
+        manifest = load_snapshot_manifest()
+        name = manifest["files"].get(snapshot_key()) if manifest else None
+        if name is None or manifest["last_updated"] != data_version():
+            return None
+        base = os.path.join(snapshot_dir(), name)
+        for encoding, suffix in SNAPSHOT_ENCODINGS:
+            if (suffix == "" or request.accept_encodings[encoding]) and os.path.exists(base + suffix):
+                response = send_file(base + suffix, mimetype="application/json", max_age=API_CACHE_MAX_AGE)
+                if suffix:
+                    response.headers["Content-Encoding"] = encoding
+                response.vary.add("Accept-Encoding")
+                return response
+        return None
+
+
+# --- Streamed JSON ---
+
+# Whole-table and whole-day endpoints stream their rows straight from the cursor:
+# each batch is encoded (orjson when installed) and compressed as it is read, so
+# memory stays at one batch and the first bytes leave before the last row is read.
+# The body is the same JSON jsonify produced (sorted keys, compact, trailing newline).
+STREAM_BATCH_ROWS = 2000
+STREAM_GZIP_LEVEL = 6
+STREAM_BROTLI_QUALITY = 5
+
+
+def encode_json_rows(rows):
+    # A list of dicts as the inside of a JSON array (no brackets)
+    if orjson is not None:
+        return orjson.dumps(rows, option=orjson.OPT_SORT_KEYS)[1:-1]
+    return json.dumps(rows, sort_keys=True, separators=(",", ":"))[1:-1].encode()
+
+
+def negotiated_encoding():
+    # The best encoding the client accepts: br (when brotli is installed), gzip, or None
+    if brotli is not None and request.accept_encodings["br"]:
+        return "br"
+    if request.accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def stream_encoder():
+    # (Content-Encoding, compress(chunk), finish()) for negotiated_encoding()
+    encoding = negotiated_encoding()
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=STREAM_BROTLI_QUALITY)
+        return "br", lambda chunk: compressor.process(chunk) + compressor.flush(), compressor.finish
+    if encoding == "gzip":
+        compressor = zlib.compressobj(STREAM_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return "gzip", lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+    return None, lambda chunk: chunk, lambda: b""
+
+
+def stream_json_rows(conn, sql, params=()):
+    # Response streaming a JSON array of the query's rows. The cursor and connection are
+    # released when the server closes the response, which it does even if the client
+    # goes away before the body (and so the generator) was ever started.
+    cursor = conn.execute(sql, params)
+    columns = [column[0] for column in cursor.description]
+    encoding, compress, finish = stream_encoder()
+
+    def generate():
+        separator = b"["
+        while True:
+            batch = cursor.fetchmany(STREAM_BATCH_ROWS)
+            if not batch:
+                break
+            yield compress(separator + encode_json_rows([dict(zip(columns, row)) for row in batch]))
+            separator = b","
+        yield compress(b"[]\n" if separator == b"[" else b"]\n") + finish()
+
+    def release():
+        cursor.close()
+        conn.close()
+
+    response = Response(generate(), mimetype="application/json")
+    response.call_on_close(release)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+# --- Listings query ---
+
+# /api/listings returns one page of a day's listings, filtered and sorted in SQL and
+# annotated with the change since the previous scrape date. Pages continue from the
+# last row's (sort value, id) instead of an offset, so every page is an index range
+# that stops after `limit` rows, however deep it is.
+LISTINGS_PAGE_SIZE = 25
+LISTINGS_MAX_PAGE_SIZE = 500
+
+# ?field= for ?q=: a case-insensitive substring of the value as the table shows it
+LISTING_SEARCH_FIELDS = {
+    "title": "s.title",
+    "unit_name": "s.unit_name",
+    "unit_id": "s.unit_id",
+    "price": "CAST(s.price AS TEXT)",
+    "beds": "CAST(s.beds AS TEXT)",
+    "baths": "CASE WHEN s.baths = CAST(s.baths AS INTEGER) THEN CAST(CAST(s.baths AS INTEGER) AS TEXT)"
+             " ELSE CAST(s.baths AS TEXT) END",
+    "sqft": "CAST(s.sqft AS TEXT)",
+    "zipcode": "s.zipcode",
+    "neighborhood": "s.neighborhood",
+}
+LISTING_RANGE_FILTERS = {"beds": "s.beds", "price": "s.price", "sqft": "s.sqft"}  # ?min_beds=, ?max_price=, ...
+LISTING_SORT_KEYS = {"price": "s.price", "beds": "s.beds", "baths": "s.baths", "sqft": "s.sqft", "delta": "e.delta"}
+
+# A listing is new when its unit had no priced row on the previous scrape date, and
+# changed when price_events recorded a move for it
+NEW_LISTING_SQL = '''
+    :previous_date IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM silver_listings p INDEXED BY idx_silver_signature_date
+        WHERE p.signature = s.signature AND p.scrape_date = :previous_date AND p.price IS NOT NULL
+    )
+'''
+LISTINGS_FROM_SQL = '''
+    FROM silver_listings s
+    LEFT JOIN price_events e ON e.signature = s.signature AND e.scrape_date = s.scrape_date
+'''
+# Movers-only pages start from the day's price_events, so they stay bounded by its changes
+MOVERS_FROM_SQL = '''
+    FROM price_events e
+    JOIN silver_listings s INDEXED BY idx_silver_signature_date
+    ON s.signature = e.signature AND s.scrape_date = e.scrape_date
+'''
+
+
+def encode_listings_cursor(sort, order, value, row_id):
+    payload = json.dumps([sort, order, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_listings_cursor(cursor, sort, order):
+    # (sort value, id) of the last row of the previous page; None if it doesn't belong to this sort
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        return None
+    if (cursor_sort, cursor_order) != (sort, order) or not isinstance(row_id, int):
+        return None
+    if value is not None and not isinstance(value, (int, float)):
+        return None
+    return value, row_id
+
+
+def listing_page_ranges(sort, order, after):
+    # The index ranges one page may span, in order, as (condition, ORDER BY); the first
+    # one resumes after :after_value / :after_id. Rows with a NULL sort value come first
+    # ascending and last descending, as in ORDER BY, and are walked by id alone so the
+    # keyset never compares against NULL.
+    op = "<" if order == "desc" else ">"
+    by_id = f"s.id {order.upper()}"
+    if sort is None:
+        return [(f"s.id {op} :after_id" if after else "1", by_id)]
+
+    column = LISTING_SORT_KEYS[sort]
+    null_range = (f"{column} IS NULL", by_id, f"s.id {op} :after_id")
+    value_range = (f"{column} IS NOT NULL", f"{column} {order.upper()}, {by_id}",
+                   f"({column}, s.id) {op} (:after_value, :after_id)")
+    ranges = [null_range, value_range] if order == "asc" else [value_range, null_range]
+    if after is None:
+        return [(condition, order_by) for condition, order_by, _ in ranges]
+    ranges = ranges[ranges.index(null_range if after[0] is None else value_range):]
+    return [(f"{condition} AND {keyset}" if i == 0 else condition, order_by)
+            for i, (condition, order_by, keyset) in enumerate(ranges)]
+
+
+# --- Dashboard views ---
+
+# The small read-only views behind the dashboard pages. Each takes a ReadContext and
+# returns its JSON payload. /api/<name> serves one; /api/bundle?views=a,b,... serves
+# several from one connection and one read transaction, so they see the same data and
+# share lookups like the latest scrape dates instead of each repeating them.
+DASHBOARD_VIEWS = {}
+
+
+def dashboard_view(name):
+    def register(view):
+        DASHBOARD_VIEWS[name] = view
+        return view
+    return register
+
+
+class ApiError(Exception):
+    # A bad query parameter, answered as {"error": message} with HTTP 400
+    pass
+
+
+class ReadContext:
+    def __init__(self, conn):
+        self.conn = conn
+        self.memo = {}
+
+    def memoized(self, key, compute):
+        if key not in self.memo:
+            self.memo[key] = compute()
+        return self.memo[key]
+
+    def silver_dates(self):
+        # The two latest silver scrape dates, newest first
+        return self.memoized("silver_dates", lambda: [row["scrape_date"] for row in self.conn.execute(
+            "SELECT DISTINCT scrape_date FROM silver_listings ORDER BY scrape_date DESC LIMIT 2")])
+
+    def latest_silver_date(self):
+        dates = self.silver_dates()
+        return dates[0] if dates else None
+
+    def latest_date(self, table):
+        # MAX(scrape_date) of gold_cube or rolling_metrics
+        return self.memoized(("latest_date", table), lambda: self.conn.execute(
+            f"SELECT MAX(scrape_date) AS d FROM {table}").fetchone()["d"])
+
+    def window(self):
+        window = rolling_window()
+        if window is None:
+            raise ApiError(f"'window' must be one of {list(ROLLING_WINDOWS)}")
+        return window
+
+
+def run_views(names):
+    # {name: payload} for the named views, all inside one read transaction
+    with transaction(read_only=True) as conn:
+        context = ReadContext(conn)
+        return {name: DASHBOARD_VIEWS[name](context) for name in names}
+
+
+def serve_views(names, single=False):
+    try:
+        payloads = run_views(names)
+    except ApiError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(payloads[names[0]] if single else payloads)
+
+
+@dashboard_view("last-updated")
+def last_updated(context):
+    row = context.conn.execute("SELECT last_updated FROM meta WHERE id = 1").fetchone()
+    return { "last_updated": row["last_updated"] if row else None }
+
+
+@dashboard_view("summary-stats")
+def summary_stats(context):
+    conn = context.conn
+
+    # Get today's metrics
+    row_today = conn.execute("""
+        SELECT * FROM gold_metrics
+        ORDER BY scrape_date DESC LIMIT 1
+    """).fetchone()
+
+    # Get yesterday's metrics (for delta)
+    row_yesterday = conn.execute("""
+        SELECT * FROM gold_metrics
+        ORDER BY scrape_date DESC LIMIT 1 OFFSET 1
+    """).fetchone()
+
+    # Get last two scrape dates
+    date_rows = context.silver_dates()
+    if len(date_rows) < 2:
+        return {}
+
+    latest, previous = date_rows
+
+    # Units whose signature wasn't listed the day before
+    new_listing_count = conn.execute("""
+        SELECT COUNT(*) FROM silver_listings cur
+        WHERE cur.scrape_date = ?
+        AND NOT EXISTS (
+            SELECT 1 FROM silver_listings prev
+            WHERE prev.signature = cur.signature AND prev.scrape_date = ?
+        )
+    """, (latest, previous)).fetchone()[0]
+
+    # Compute price change if yesterday exists
+    price_change = None
+    if row_yesterday:
+        price_change = row_today["median_price"] - row_yesterday["median_price"]
+
+    return {
+        "scrape_date": row_today["scrape_date"],
+        "median_price": row_today["median_price"],
+        "price_change": price_change,
+        "listing_count": row_today["listing_count"],
+        "studio_count": row_today["studio_count"],
+        "one_bed_count": row_today["one_bed_count"],
+        "two_plus_bed_count": row_today["two_plus_bed_count"],
+        "new_listing_count": new_listing_count,
+    }
+
+
+@dashboard_view("todays-prices")
+def todays_prices(context):
+    rows = context.conn.execute("""
+        SELECT price FROM silver_listings
+        WHERE scrape_date = ?
+        AND price IS NOT NULL
+    """, (context.latest_silver_date(),)).fetchall()
+    return [row["price"] for row in rows]
+
+
+@dashboard_view("scrape-dates")
+def scrape_dates(context):
+    rows = context.conn.execute("SELECT DISTINCT scrape_date FROM silver_listings ORDER BY scrape_date DESC").fetchall()
+    return [row["scrape_date"] for row in rows]
+
+
+@dashboard_view("zip-counts")
+def zip_counts(context):
+    rows = context.conn.execute("""
+        SELECT NULLIF(zipcode, '') AS zipcode, listing_count AS count
+        FROM gold_cube
+        WHERE scrape_date = ?
+          AND neighborhood != '*' AND zipcode != '*' AND bed_bucket = '*'
+        ORDER BY count DESC
+    """, (context.latest_date("gold_cube"),)).fetchall()
+    return [{ "zip": row["zipcode"], "count": row["count"] } for row in rows]
+
+
+@dashboard_view("neighborhood-counts")
+def neighborhood_counts(context):
+    rows = context.conn.execute("""
+        SELECT neighborhood, listing_count AS count
+        FROM gold_cube
+        WHERE scrape_date = ?
+          AND neighborhood != '*' AND zipcode = '*' AND bed_bucket = '*'
+        ORDER BY count DESC
+    """, (context.latest_date("gold_cube"),)).fetchall()
+    return [dict(r) for r in rows]
+
+
+@dashboard_view("gold-metrics-unit-types")
+def gold_metrics_unit_types(context):
+    rows = context.conn.execute("""
+        SELECT scrape_date,
+            MAX(CASE WHEN bed_bucket = 'studio' THEN avg_price END) as avg_studio,
+            MAX(CASE WHEN bed_bucket = '1br' THEN avg_price END) as avg_1br,
+            MAX(CASE WHEN bed_bucket = '2plus' THEN avg_price END) as avg_2plus
+        FROM gold_cube
+        WHERE neighborhood = '*' AND zipcode = '*' AND bed_bucket != '*'
+        GROUP BY scrape_date
+        ORDER BY scrape_date ASC
+    """).fetchall()
+    return [dict(row) for row in rows]
+
+
+@dashboard_view("volatility-by-neighborhood")
+def volatility_by_neighborhood(context):
+    # Pooled over the trailing window from each day's exact price sums
+    rows = context.conn.execute("""
+        SELECT neighborhood, listing_count AS count, avg_price,
+            price_m2 / price_count AS variance,
+            price_std_dev AS std_dev
+        FROM rolling_metrics
+        WHERE scrape_date = ?
+          AND window_days = ?
+          AND neighborhood != '*'
+          AND listing_count >= 3
+        ORDER BY std_dev DESC
+        LIMIT 10
+    """, (context.latest_date("rolling_metrics"), context.window())).fetchall()
+    return [dict(row) for row in rows]
+
+
+@dashboard_view("neighborhood-deltas")
+def neighborhood_deltas(context):
+    # Median rent change per neighborhood: latest scrape vs. that neighborhood's last scrape at
+    # least `days` earlier, or its first one if it is newer than that. Neighborhoods with no
+    # earlier scrape are still listed, with a null start_median and delta_pct.
+    days = request.args.get("days", default=7, type=int)
+    conn = context.conn
+    end = context.latest_date("gold_cube")
+    if end is None:
+        return { "start_date": None, "end_date": None, "deltas": [] }
+    target = conn.execute("SELECT date(?, ?) AS d", (end, f"-{max(days, 1)} day")).fetchone()["d"]
+    start = conn.execute("""
+        SELECT COALESCE(
+            (SELECT MAX(scrape_date) FROM gold_cube WHERE scrape_date <= ?),
+            (SELECT MIN(scrape_date) FROM gold_cube)
+        ) AS d
+    """, (target,)).fetchone()["d"]
+    rows = conn.execute("""
+        WITH starts AS (
+            SELECT neighborhood,
+                COALESCE(MAX(scrape_date) FILTER (WHERE scrape_date <= ?), MIN(scrape_date)) AS start_date
+            FROM gold_cube
+            WHERE scrape_date < ?
+              AND neighborhood != '*' AND zipcode = '*' AND bed_bucket = '*'
+            GROUP BY neighborhood
+        )
+        SELECT cur.neighborhood,
+            starts.start_date,
+            prev.median_price AS start_median,
+            cur.median_price AS end_median,
+            cur.listing_count
+        FROM gold_cube cur
+        LEFT JOIN starts ON starts.neighborhood = cur.neighborhood
+        LEFT JOIN gold_cube prev
+          ON prev.scrape_date = starts.start_date AND prev.neighborhood = cur.neighborhood
+         AND prev.zipcode = '*' AND prev.bed_bucket = '*'
+        WHERE cur.scrape_date = ?
+          AND cur.neighborhood != '*' AND cur.zipcode = '*' AND cur.bed_bucket = '*'
+        ORDER BY cur.neighborhood
+    """, (target, end, end)).fetchall()
+
+    deltas = []
+    for row in rows:
+        item = dict(row)
+        start_median, end_median = row["start_median"], row["end_median"]
+        item["delta_pct"] = (round((end_median - start_median) / start_median * 100, 1)
+                             if start_median and end_median is not None else None)
+        deltas.append(item)
+    return { "start_date": start, "end_date": end, "deltas": deltas }
+
+
+@dashboard_view("price-quantiles")
+def price_quantiles(context):
+    # Price quantiles over any date range by merging gold_cube's per-day sketches;
+    # each value is within RELATIVE_ACCURACY of the exact quantile
+    try:
+        qs = [float(q) for q in request.args.get("q", "0.1,0.5,0.9").split(",")]
+    except ValueError:
+        raise ApiError("'q' must be a comma-separated list of numbers")
+    if not all(0 <= q <= 1 for q in qs):
+        raise ApiError("'q' values must be between 0 and 1")
+    neighborhood = request.args.get("neighborhood", "*")
+
+    end = request.args.get("end") or context.latest_date("gold_cube")
+    start = request.args.get("start") or end
+    rows = context.conn.execute("""
+        SELECT price_sketch FROM gold_cube
+        WHERE scrape_date BETWEEN ? AND ?
+          AND neighborhood = ? AND zipcode = '*' AND bed_bucket = '*'
+          AND price_sketch IS NOT NULL
+    """, (start, end, neighborhood)).fetchall()
+
+    sketch = PriceSketch()
+    for row in rows:
+        sketch.merge(PriceSketch.from_bytes(row["price_sketch"]))
+    return {
+        "start_date": start,
+        "end_date": end,
+        "neighborhood": neighborhood,
+        "count": sketch.count,
+        "relative_accuracy": RELATIVE_ACCURACY,
+        "quantiles": {str(q): sketch.quantile(q) for q in qs},
+    }
+
+
+@dashboard_view("avg-volatility")
+def avg_volatility(context):
+    row = context.conn.execute("""
+        SELECT avg_daily_std_dev AS avg_volatility
+        FROM rolling_metrics
+        WHERE scrape_date = ?
+          AND window_days = ?
+          AND neighborhood = '*'
+    """, (context.latest_date("rolling_metrics"), context.window())).fetchone()
+    return dict(row) if row else {"avg_volatility": None}
+
+
+@dashboard_view("fastest-market")
+def fastest_market(context):
+    # Neighborhood whose units stayed listed the fewest days on average over the window
+    row = context.conn.execute("""
+        SELECT neighborhood, avg_days_listed AS avg_days
+        FROM rolling_metrics
+        WHERE scrape_date = ?
+          AND window_days = ?
+          AND neighborhood NOT IN ('*', 'General Area')
+        ORDER BY avg_days ASC
+        LIMIT 1
+    """, (context.latest_date("rolling_metrics"), context.window())).fetchone()
+    return dict(row) if row else {}
+
+
+@dashboard_view("median-lifespan")
+def median_lifespan(context):
+    # Days on market for listings that came off in the week before the latest scrape,
+    # from the cleaner's unit_lifecycle. Anchored to the data, not the clock, so the
+    # answer only changes with last_updated (which the cache and snapshots are keyed on).
+    latest = context.latest_silver_date()
+    rows = context.conn.execute("""
+        SELECT days_listed FROM unit_lifecycle
+        WHERE last_seen >= date(?, '-7 day')
+        AND last_seen < ?
+        ORDER BY days_listed
+    """, (latest, latest)).fetchall()
+
+    ages = [row["days_listed"] for row in rows]
+    n = len(ages)
+    if n == 0:
+        median = None
+    elif n % 2 == 1:
+        median = ages[n // 2]
+    else:
+        median = (ages[n // 2 - 1] + ages[n // 2]) / 2
+
+    return {"median_days": int(median) if median is not None else None}
+
+
+@dashboard_view("max-price-drop")
+def max_price_drop(context):
+    # Biggest single drop in the week up to the latest scrape (anchored like median-lifespan)
+    row = context.conn.execute("""
+        SELECT MIN(delta) AS max_drop FROM price_events
+        WHERE scrape_date >= date(?, '-7 day')
+        AND delta < 0
+    """, (context.latest_silver_date(),)).fetchone()
+    return {"max_drop": row["max_drop"]}
+
+
+@dashboard_view("movers")
+def movers(context):
+    # Biggest price drops on a scrape date (default: the latest), with the listing they belong to
+    limit = request.args.get("limit", default=10, type=int)
+    if not 1 <= limit <= 100:
+        raise ApiError("'limit' must be between 1 and 100")
+    date_param = request.args.get("date") or context.latest_silver_date()
+    rows = context.conn.execute("""
+        SELECT s.*, e.previous_date, e.old_price, e.delta
+        FROM price_events e
+        JOIN silver_listings s ON s.signature = e.signature AND s.scrape_date = e.scrape_date
+        WHERE e.scrape_date = ?
+        AND e.delta < 0
+        ORDER BY e.delta ASC, s.id ASC
+        LIMIT ?
+    """, (date_param, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+
+# --- Warm-up ---
+
+# gunicorn.conf.py runs warm_up() in each worker before it takes traffic, so the first
+# visitor after a deploy or machine start doesn't pay for cold imports, the snapshot
+# manifest, database pages that aren't in the page cache and an empty response cache.
+# These are the requests the pages make on load.
+WARM_PATHS = [
+    "/api/last-updated", "/api/gold-metrics", "/api/todays-prices", "/api/neighborhood-counts",
+    "/api/neighborhood-deltas", "/api/gold-metrics-unit-types", "/api/volatility-by-neighborhood",
+    "/api/bundle?views=summary-stats,movers&limit=3",
+    "/api/bundle?views=avg-volatility,fastest-market,median-lifespan,max-price-drop",
+]
+
+
+def warm_up(app):
+    started = time.perf_counter()
+    client = app.test_client()
+    dates = client.get("/api/scrape-dates").get_json() or []
+    paths = WARM_PATHS + ([f"/api/listings?date={dates[0]}&limit=25"] if dates else [])  # Explore's first page
+    failed = []
+    for path in paths:
+        with client.get(path) as response:   # closing releases a streamed response's cursor
+            if response.status_code != 200:
+                failed.append(path)
+    if failed:
+        logging.warning(f"Warm-up requests failed: {', '.join(failed)}")
+    logging.info(f"Worker {os.getpid()} warmed {len(paths) + 1} endpoints in {time.perf_counter() - started:.2f}s.")
+
+
+# The API only reads: every request reuses its thread's read-only connection
+# (conn.close() just ends the request's unit of work)
+
 def create_app():
     app = Flask(__name__, static_folder="dist")
     CORS(app)
+    register_snapshots(app)
+    register_response_cache(app)
 
     # --- Existing Routes ---
     @app.route("/api/ping")
@@ -47,103 +754,30 @@ def create_app():
 
     @app.route("/api/gold-metrics")
     def gold_metrics():
-        conn = get_db_connection()
-        rows = conn.execute("SELECT * FROM gold_metrics ORDER BY scrape_date ASC").fetchall()
-        conn.close()
-        return jsonify([dict(row) for row in rows])
+        return stream_json_rows(get_read_connection(), "SELECT * FROM gold_metrics ORDER BY scrape_date ASC")
 
     @app.route("/api/silver-latest")
     def silver_latest():
-        conn = get_db_connection()
-        rows = conn.execute("""
+        return stream_json_rows(get_read_connection(), """
             SELECT * FROM silver_listings
             WHERE scrape_date = (SELECT MAX(scrape_date) FROM silver_listings)
-        """).fetchall()
-        conn.close()
-        return jsonify([dict(row) for row in rows])
-
-    @app.route("/api/last-updated")
-    def last_updated():
-        conn = get_db_connection()
-        try:
-            row = conn.execute("SELECT last_updated FROM meta WHERE id = 1").fetchone()
-            return jsonify({ "last_updated": row["last_updated"] if row else None })
-        finally:
-            conn.close()
-
-    # --- New Routes ---
-
-    @app.route("/api/summary-stats")
-    def summary_stats():
-        conn = get_db_connection()
-
-        # Get today's metrics
-        row_today = conn.execute("""
-            SELECT * FROM gold_metrics
-            ORDER BY scrape_date DESC LIMIT 1
-        """).fetchone()
-
-        # Get yesterday's metrics (for delta)
-        row_yesterday = conn.execute("""
-            SELECT * FROM gold_metrics
-            ORDER BY scrape_date DESC LIMIT 1 OFFSET 1
-        """).fetchone()
-
-        # Get last two scrape dates
-        date_rows = conn.execute("""
-            SELECT DISTINCT scrape_date FROM silver_listings
-            ORDER BY scrape_date DESC LIMIT 2
-        """).fetchall()
-        if len(date_rows) < 2:
-            conn.close()
-            return jsonify({})
-
-        latest = date_rows[0]["scrape_date"]
-        previous = date_rows[1]["scrape_date"]
-
-        # Get rows for both days
-        latest_units = conn.execute("SELECT * FROM silver_listings WHERE scrape_date = ?", (latest,)).fetchall()
-        previous_units = conn.execute("SELECT * FROM silver_listings WHERE scrape_date = ?", (previous,)).fetchall()
-
-        # Signature comparison
-        latest_signatures = set(generate_signature(r) for r in latest_units)
-        previous_signatures = set(generate_signature(r) for r in previous_units)
-
-        new_listing_count = len(latest_signatures - previous_signatures)
+        """)
 
-        conn.close()
-
-        # Compute price change if yesterday exists
-        price_change = None
-        if row_yesterday:
-            price_change = row_today["median_price"] - row_yesterday["median_price"]
-
-        return jsonify({
-            "scrape_date": row_today["scrape_date"],
-            "median_price": row_today["median_price"],
-            "price_change": price_change,
-            "listing_count": row_today["listing_count"],
-            "studio_count": row_today["studio_count"],
-            "one_bed_count": row_today["one_bed_count"],
-            "two_plus_bed_count": row_today["two_plus_bed_count"],
-            "new_listing_count": new_listing_count,
-        })
-
-    @app.route("/api/todays-prices")
-    def todays_prices():
-        conn = get_db_connection()
-        rows = conn.execute("""
-            SELECT price FROM silver_listings
-            WHERE scrape_date = (SELECT MAX(scrape_date) FROM silver_listings)
-            AND price IS NOT NULL
-        """).fetchall()
-        conn.close()
-        return jsonify([row["price"] for row in rows])
+    # --- Dashboard views ---
+    for name, view in DASHBOARD_VIEWS.items():
+        app.add_url_rule(f"/api/{name}", view.__name__, partial(serve_views, [name], single=True))
 
+    @app.route("/api/bundle")
+    def bundle():
+        # Several dashboard views in one response: {"view-name": payload, ...}
+        names = list(dict.fromkeys(name for name in request.args.get("views", "").split(",") if name))
+        if not names or any(name not in DASHBOARD_VIEWS for name in names):
+            return jsonify({"error": f"'views' must list some of: {', '.join(DASHBOARD_VIEWS)}"}), 400
+        return serve_views(names)
 
     @app.route("/api/silver-zip/<zip>")
     def silver_by_zip(zip):
-        conn = get_db_connection()
+        conn = get_read_connection()
         rows = conn.execute("""
             SELECT * FROM silver_listings
             WHERE zipcode = ?
@@ -152,19 +786,10 @@ def create_app():
         conn.close()
         return jsonify([dict(row) for row in rows])
 
-    @app.route("/api/scrape-dates")
-    def scrape_dates():
-        conn = get_db_connection()
-        rows = conn.execute("SELECT DISTINCT scrape_date FROM silver_listings ORDER BY scrape_date DESC").fetchall()
-        conn.close()
-        return jsonify([row["scrape_date"] for row in rows])
-
     @app.route("/api/silver-by-date/<date>")
     def silver_by_date(date):
-        conn = get_db_connection()
-        rows = conn.execute("SELECT * FROM silver_listings WHERE scrape_date = ?", (date,)).fetchall()
-        conn.close()
-        return jsonify([dict(row) for row in rows])
+        return stream_json_rows(get_read_connection(),
+                                "SELECT * FROM silver_listings WHERE scrape_date = ?", (date,))
 
     @app.route("/api/gold-compare")
     def compare_gold_dates():
@@ -173,7 +798,7 @@ def create_app():
         if not start or not end:
             return jsonify({"error": "Missing 'start' or 'end' query param"}), 400
 
-        conn = get_db_connection()
+        conn = get_read_connection()
         start_row = conn.execute("SELECT * FROM gold_metrics WHERE scrape_date = ?", (start,)).fetchone()
         end_row = conn.execute("SELECT * FROM gold_metrics WHERE scrape_date = ?", (end,)).fetchone()
         conn.close()
@@ -186,7 +811,7 @@ def create_app():
 
     @app.route("/api/silver-changes")
     def silver_changes():
-        conn = get_db_connection()
+        conn = get_read_connection()
         date_param = request.args.get("date")
         if not date_param:
             return jsonify({"error": "Missing 'date' query param"}), 400
@@ -201,29 +826,25 @@ def create_app():
             return jsonify({ "error": "Not enough data" }), 400
 
         latest, previous = dates[0]["scrape_date"], dates[1]["scrape_date"]
-        latest_units = conn.execute("SELECT * FROM silver_listings WHERE scrape_date = ?", (latest,)).fetchall()
-        previous_units = conn.execute("SELECT * FROM silver_listings WHERE scrape_date = ?", (previous,)).fetchall()
+        rows = conn.execute("""
+            SELECT cur.signature, cur.price, prev.price AS prev_price
+            FROM silver_listings cur
+            LEFT JOIN silver_listings prev
+            ON prev.signature = cur.signature
+            AND prev.scrape_date = ?
+            AND prev.price IS NOT NULL
+            WHERE cur.scrape_date = ?
+            AND cur.price IS NOT NULL
+        """, (previous, latest)).fetchall()
         conn.close()
 
-        # Remove build_signature entirely — replace all its usage with generate_signature
-
-
-
-        latest_map = {generate_signature(r): float(r["price"]) for r in latest_units if r["price"] is not None}
-        previous_map = {generate_signature(r): float(r["price"]) for r in previous_units if r["price"] is not None}
-
-
-        
-
-
         changes = {}
-
-        for sig, price in latest_map.items():
-            if sig not in previous_map:
-                changes[sig] = { "change": "new" }
-            elif previous_map[sig] != price:
-                delta = price - previous_map[sig]
-                changes[sig] = { "change": "changed", "delta": delta }
+        for row in rows:
+            if row["prev_price"] is None:
+                changes[row["signature"]] = { "change": "new" }
+            elif row["prev_price"] != row["price"]:
+                delta = float(row["price"]) - float(row["prev_price"])
+                changes[row["signature"]] = { "change": "changed", "delta": delta }
 
         return jsonify({
             "latest_date": latest,
@@ -232,6 +853,88 @@ def create_app():
         })
 
 
+    @app.route("/api/listings")
+    def listings():
+        # One page of a scrape date's priced listings, each with change ("new", "changed"
+        # or null) and delta. The first page (no cursor) also carries the filtered total.
+        args = request.args
+        sort = args.get("sort") or None
+        order = args.get("order", "asc")
+        field = args.get("field", "title")
+        if sort is not None and sort not in LISTING_SORT_KEYS:
+            return jsonify({"error": f"'sort' must be one of: {', '.join(LISTING_SORT_KEYS)}"}), 400
+        if order not in ("asc", "desc") or (sort is None and order != "asc"):
+            return jsonify({"error": "'order' must be 'asc' or 'desc', with a 'sort' key"}), 400
+        movers_only = args.get("movers") in ("1", "true")
+        if sort == "delta" and not movers_only:
+            return jsonify({"error": "'sort=delta' needs 'movers=1'"}), 400
+        if field not in LISTING_SEARCH_FIELDS:
+            return jsonify({"error": f"'field' must be one of: {', '.join(LISTING_SEARCH_FIELDS)}"}), 400
+        try:
+            limit = int(args.get("limit", LISTINGS_PAGE_SIZE))
+            bounds = {f"{bound}_{name}": float(args[f"{bound}_{name}"])
+                      for name in LISTING_RANGE_FILTERS for bound in ("min", "max") if args.get(f"{bound}_{name}")}
+        except ValueError:
+            return jsonify({"error": "'limit' and range filters must be numbers"}), 400
+        if not 1 <= limit <= LISTINGS_MAX_PAGE_SIZE:
+            return jsonify({"error": f"'limit' must be between 1 and {LISTINGS_MAX_PAGE_SIZE}"}), 400
+        after = None
+        if args.get("cursor"):
+            after = decode_listings_cursor(args["cursor"], sort, order)
+            if after is None:
+                return jsonify({"error": "Invalid 'cursor' for this sort"}), 400
+
+        conn = get_read_connection()
+        date_param = args.get("date") or conn.execute(
+            "SELECT MAX(scrape_date) AS d FROM silver_listings").fetchone()["d"]
+        previous_date = conn.execute("SELECT MAX(scrape_date) AS d FROM silver_listings WHERE scrape_date < ?",
+                                     (date_param,)).fetchone()["d"]
+
+        where = ["s.scrape_date = :date", "s.price IS NOT NULL"]
+        params = {"date": date_param, "previous_date": previous_date, **bounds}
+        if args.get("q"):
+            term = args["q"].replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            where.append(f"{LISTING_SEARCH_FIELDS[field]} LIKE :q ESCAPE '\\'")
+            params["q"] = f"%{term}%"
+        for name, bound in bounds.items():
+            where.append(f"{LISTING_RANGE_FILTERS[name[4:]]} {'>=' if name.startswith('min') else '<='} :{name}")
+        if args.get("new") in ("1", "true"):
+            where.append(NEW_LISTING_SQL)
+        if movers_only:
+            where.append("e.scrape_date = :date")
+        where = " AND ".join(where)
+        from_sql = MOVERS_FROM_SQL if movers_only else LISTINGS_FROM_SQL
+
+        rows = []
+        keyset = {"after_value": after[0], "after_id": after[1]} if after else {}
+        for condition, order_by in listing_page_ranges(sort, order, after):
+            # One row past the page says whether there is a next one
+            rows += conn.execute(f'''
+                SELECT s.*, e.delta,
+                    CASE WHEN e.delta IS NOT NULL THEN 'changed'
+                         WHEN {NEW_LISTING_SQL} THEN 'new'
+                    END AS change
+                {from_sql}
+                WHERE {where} AND {condition}
+                ORDER BY {order_by}
+                LIMIT :limit
+            ''', {**params, **keyset, "limit": limit + 1 - len(rows)}).fetchall()
+            if len(rows) > limit:
+                break
+
+        result = {"date": date_param, "previous_date": previous_date}
+        if after is None:
+            result["total"] = conn.execute(f"SELECT COUNT(*) AS n {from_sql} WHERE {where}",
+                                           params).fetchone()["n"]
+        conn.close()
+
+        page = [dict(row) for row in rows[:limit]]
+        last = page[-1] if len(rows) > limit else None
+        result["listings"] = page
+        result["next_cursor"] = last and encode_listings_cursor(sort, order, last[sort] if sort else None, last["id"])
+        return jsonify(result)
+
+
 
 
 
@@ -244,180 +947,6 @@ def create_app():
             return jsonify({ "error": "CSV not found." }), 404
         return send_file(path, as_attachment=True)
 
-    @app.route("/api/zip-counts")
-    def zip_counts():
-        conn = get_db_connection()
-        rows = conn.execute("""
-            SELECT zipcode, COUNT(*) as count
-            FROM silver_listings
-            WHERE scrape_date = (SELECT MAX(scrape_date) FROM silver_listings)
-            GROUP BY zipcode
-            ORDER BY count DESC
-        """).fetchall()
-        conn.close()
-        return jsonify([{ "zip": row["zipcode"], "count": row["count"] } for row in rows])
-
-    @app.route("/api/neighborhood-counts")
-    def neighborhood_counts():
-        conn = get_db_connection()
-        rows = conn.execute("""
-            SELECT neighborhood, COUNT(*) as count
-            FROM silver_listings
-            WHERE scrape_date = (SELECT MAX(scrape_date) FROM silver_listings)
-            GROUP BY neighborhood
-            ORDER BY count DESC
-        """).fetchall()
-        conn.close()
-        return jsonify([dict(r) for r in rows])
-    
-    @app.route("/api/gold-metrics-unit-types")
-    def gold_metrics_unit_types():
-        conn = get_db_connection()
-        rows = conn.execute("""
-            SELECT scrape_date, 
-                AVG(CASE WHEN beds = 0 THEN price END) as avg_studio,
-                AVG(CASE WHEN beds = 1 THEN price END) as avg_1br,
-                AVG(CASE WHEN beds >= 2 THEN price END) as avg_2plus
-            FROM silver_listings
-            GROUP BY scrape_date
-            ORDER BY scrape_date ASC
-        """).fetchall()
-        conn.close()
-        return jsonify([dict(row) for row in rows])
-    
-    @app.route("/api/volatility-by-neighborhood")
-    def volatility_by_neighborhood():
-        conn = get_db_connection()
-        rows = conn.execute("""
-            SELECT neighborhood, 
-                COUNT(*) as count,
-                AVG(price) as avg_price,
-                AVG(price * price) - AVG(price) * AVG(price) AS variance,
-                SQRT(AVG(price * price) - AVG(price) * AVG(price)) AS std_dev
-            FROM silver_listings
-            WHERE scrape_date >= date('now', '-7 day')
-            GROUP BY neighborhood
-            HAVING count >= 3
-            ORDER BY std_dev DESC
-            LIMIT 10
-        """).fetchall()
-        conn.close()
-        return jsonify([dict(row) for row in rows])
-    
-    @app.route("/api/avg-volatility")
-    def avg_volatility():
-        conn = get_db_connection()
-        row = conn.execute("""
-            SELECT AVG(price_std_dev) AS avg_volatility
-            FROM gold_metrics
-            WHERE scrape_date >= date('now', '-7 day')
-        """).fetchone()
-        conn.close()
-        return jsonify(dict(row) if row else {})
-    
-    @app.route("/api/fastest-market")
-    def fastest_market():
-        conn = get_db_connection()
-        row = conn.execute("""
-            SELECT neighborhood, AVG(listing_age) AS avg_days
-            FROM (
-                SELECT neighborhood, unit_id, COUNT(DISTINCT scrape_date) AS listing_age
-                FROM silver_listings
-                WHERE scrape_date >= date('now', '-7 day')
-                   AND neighborhood != 'General Area'        
-                GROUP BY neighborhood, unit_id
-            )
-            GROUP BY neighborhood
-            ORDER BY avg_days ASC
-            LIMIT 1
-        """).fetchone()
-        conn.close()
-        return jsonify(dict(row) if row else {})
-    
-    @app.route("/api/median-lifespan")
-    def median_lifespan():
-        conn = get_db_connection()
-        rows = conn.execute("""
-            SELECT COUNT(DISTINCT scrape_date) AS listing_age
-            FROM (
-                SELECT 
-                unit_id || '|' || LOWER(title) || '|' || LOWER(unit_name) || '|' || beds || '|' || baths || '|' || sqft AS signature,
-                scrape_date
-                FROM silver_listings
-                WHERE scrape_date >= date('now', '-7 day')
-            ) sub
-            WHERE signature NOT IN (
-                SELECT 
-                unit_id || '|' || LOWER(title) || '|' || LOWER(unit_name) || '|' || beds || '|' || baths || '|' || sqft AS signature
-                FROM silver_listings
-                WHERE scrape_date = date('now')
-            )
-            GROUP BY signature
-        """).fetchall()
-        conn.close()
-
-        ages = [row["listing_age"] for row in rows]
-        ages.sort()
-        n = len(ages)
-        if n == 0:
-            median = None
-        elif n % 2 == 1:
-            median = ages[n // 2]
-        else:
-            median = (ages[n // 2 - 1] + ages[n // 2]) / 2
-
-        return jsonify({"median_days": int(median) if median is not None else None})
-
-    
-    @app.route("/api/max-price-drop")
-    def max_price_drop():
-        conn = get_db_connection()
-        rows = conn.execute("""
-            SELECT current.unit_id,
-                current.price AS current_price,
-                prev.price AS prev_price,
-                current.scrape_date AS current_scrape_date,
-                prev.scrape_date AS prev_scrape_date
-            FROM silver_listings current
-            JOIN silver_listings prev
-            ON current.unit_id = prev.unit_id
-            AND current.title = prev.title
-            AND current.unit_name = prev.unit_name
-            AND current.beds = prev.beds
-            AND current.baths = prev.baths
-            AND current.sqft = prev.sqft
-            AND julianday(current.scrape_date) = julianday(prev.scrape_date) + 1
-            WHERE current.scrape_date >= date('now', '-7 day')
-            AND current.price IS NOT NULL
-            AND prev.price IS NOT NULL
-            AND current.price < prev.price
-        """).fetchall()
-
-        conn.close()
-
-        # 🔥 DEBUG PRINT ALL ROWS
-        for row in rows:
-            logging.info(f"unit_id: {row['unit_id']}, current: {row['current_price']}, prev: {row['prev_price']}, dates: {row['current_scrape_date']} / {row['prev_scrape_date']}")
-
-        # compute deltas
-        drops = []
-        for row in rows:
-            if row["current_price"] is not None and row["prev_price"] is not None:
-                delta = row["current_price"] - row["prev_price"]
-                if delta < 0:
-                    drops.append(delta)
-
-        logging.info(f"Collected {len(drops)} price drops: {drops}")
-
-        if drops:
-            max_drop = min(drops)
-        else:
-            max_drop = None
-
-        return jsonify({"max_drop": max_drop})
-
-
-
     @app.route("/", defaults={"path": ""})
     @app.route("/<path:path>")
     def serve_react(path):
@@ -0,0 +1,187 @@
+# benchmarks/bench_api.py
+#
+# Time every /api route of create_app() on synthetic databases at several multiples of
+# today's volume (benchmarks/synthetic.py), show how each one scales, and compare the
+# timings against a saved baseline. The response cache and published snapshots are
+# off, so every request runs its queries. The exponent column is how a route's time
+# grows with the data between the two largest scales: about 1 is linear, and anything
+# well above it is a route that will fall over as the data grows. Exits non-zero when
+# a route errors, misses the baseline by more than --tolerance, or (with
+# --max-exponent) scales worse than allowed. Every /api route must have a request
+# below, so new routes can't go unbenchmarked.
+#   python benchmarks/bench_api.py                       # 10x, 100x and 1000x
+#   python benchmarks/bench_api.py --scales 1 10 --cache-dir /tmp/bench_api
+#   python benchmarks/bench_api.py --scales 1 10 --save-baseline /tmp/api_baseline.json
+#   python benchmarks/bench_api.py --scales 1 10 --baseline /tmp/api_baseline.json --max-exponent 1.3
+
+import argparse
+import json
+import logging
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+os.environ["API_CACHE_SIZE"] = "0"  # time the queries, not the response cache
+from database.connection import get_read_connection
+from benchmarks.common import timed, using_db
+from benchmarks.synthetic import BASE_DAYS, scale_params, build_synthetic_db
+from app.app import create_app, DASHBOARD_VIEWS
+
+# Routes that don't read the database
+SKIPPED_RULES = {"/api/download-latest-csv": "sends today's file from csv_exports/"}
+
+SUPERLINEAR_EXPONENT = 1.2   # flagged in the report
+NOISE_FLOOR_MS = 2.0         # differences below this are never regressions
+
+
+def bench_requests(conn):
+    # name -> request path, with parameters taken from the database
+    dates = [row[0] for row in conn.execute("SELECT DISTINCT scrape_date FROM silver_listings ORDER BY scrape_date")]
+    first, latest = dates[0], dates[-1]
+    zipcode = conn.execute("SELECT zipcode FROM silver_listings WHERE scrape_date = ? GROUP BY zipcode"
+                           " ORDER BY COUNT(*) DESC LIMIT 1", (latest,)).fetchone()[0]
+    requests = {name: f"/api/{name}" for name in DASHBOARD_VIEWS}
+    requests.update({
+        "ping": "/api/ping",
+        "gold-metrics": "/api/gold-metrics",
+        "silver-latest": "/api/silver-latest",
+        "price-quantiles (all dates)": f"/api/price-quantiles?start={first}&end={latest}",
+        "movers (first day)": f"/api/movers?date={dates[1]}",
+        "bundle (all views)": "/api/bundle?views=" + ",".join(DASHBOARD_VIEWS),
+        "silver-zip": f"/api/silver-zip/{zipcode}",
+        "silver-by-date": f"/api/silver-by-date/{latest}",
+        "gold-compare": f"/api/gold-compare?start={first}&end={latest}",
+        "silver-changes": f"/api/silver-changes?date={latest}",
+        "listings": f"/api/listings?date={latest}&limit=25",
+        "listings (sorted, filtered)": f"/api/listings?date={latest}&sort=price&order=desc&min_beds=2&limit=25",
+        "listings (search)": f"/api/listings?date={latest}&q=park&limit=25",
+        "listings (new)": f"/api/listings?date={latest}&new=1&limit=25",
+        "listings (movers)": f"/api/listings?date={latest}&movers=1&sort=delta&limit=25",
+    })
+    return requests
+
+
+def check_coverage(app, requests):
+    adapter = app.url_map.bind("localhost")
+    covered = {adapter.match(path.split("?")[0], return_rule=True)[0].rule for path in requests.values()}
+    rules = {rule.rule for rule in app.url_map.iter_rules() if rule.rule.startswith("/api/")}
+    return sorted(rules - covered - set(SKIPPED_RULES))
+
+
+def time_request(client, path, repeat):
+    # Median of `repeat` runs after one untimed run; the body is read in full, streamed or not
+    response = client.get(path)
+    status = response.status_code
+    response.close()
+    if status != 200:
+        return None, status
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path)
+        response.get_data()
+        response.close()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, status
+
+
+def bench_scale(db_path, repeat):
+    with using_db(db_path):
+        app = create_app()
+        app.config["SERVE_SNAPSHOTS"] = False
+        requests = bench_requests(get_read_connection())
+        missing = check_coverage(app, requests)
+        client = app.test_client()
+        timings, errors = {}, []
+        for name, path in requests.items():
+            ms, status = time_request(client, path, repeat)
+            if ms is None:
+                errors.append(f"{name}: HTTP {status} for {path}")
+            else:
+                timings[name] = ms
+    return timings, errors, missing
+
+
+def scaling_exponent(results, name, small, large):
+    before, after = results[str(small)].get(name), results[str(large)].get(name)
+    if not before or not after:
+        return None
+    return math.log(after / before) / math.log(large / small)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every API route at several data volumes.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000], help="multiples of today's volume")
+    parser.add_argument("--days", type=int, default=BASE_DAYS, help="days of history at every scale")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per route; the median is reported")
+    parser.add_argument("--cache-dir", help="keep the synthetic databases here and reuse them")
+    parser.add_argument("--baseline", help="fail on routes slower than this earlier --save-baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown against the baseline (0.5 = 50%%)")
+    parser.add_argument("--max-exponent", type=float, help="fail on routes that scale worse than this")
+    parser.add_argument("--save-baseline", help="write the timings here")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)  # the pipeline logs every promoted day
+    if args.cache_dir:
+        os.makedirs(args.cache_dir, exist_ok=True)
+        ok = run(args, args.cache_dir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="bench_api_") as tmp:
+            ok = run(args, tmp)
+    sys.exit(0 if ok else 1)
+
+
+def run(args, db_dir):
+    scales = sorted(args.scales)
+    results, failures = {}, []
+    for scale in scales:
+        params = dict(scale_params(scale), days=args.days)
+        db_path = os.path.join(db_dir, f"synthetic_{scale}x_{args.days}d_seed{args.seed}.db")
+        if not os.path.exists(db_path):
+            (bronze, silver), elapsed = timed(build_synthetic_db, db_path, seed=args.seed, **params)
+            print(f"{scale}x: built {silver:,} silver rows ({params['markets']} markets x {params['days']} days"
+                  f" x {params['units']:,} units) in {elapsed:.1f}s")
+        timings, errors, missing = bench_scale(db_path, args.repeat)
+        results[str(scale)] = timings
+        failures += [f"{scale}x {line}" for line in errors]
+        failures += [f"No benchmark request for {rule}" for rule in missing]
+
+    print(f"\n{'route':<34}" + "".join(f"{f'{scale}x ms':>12}" for scale in scales) + f"{'exponent':>10}")
+    names = list(dict.fromkeys(name for timings in results.values() for name in timings))
+    for name in names:
+        line = f"{name:<34}" + "".join(f"{results[str(scale)].get(name, float('nan')):>12.1f}" for scale in scales)
+        exponent = scaling_exponent(results, name, scales[-2], scales[-1]) if len(scales) > 1 else None
+        if exponent is not None:
+            superlinear = exponent > SUPERLINEAR_EXPONENT and results[str(scales[-1])][name] > NOISE_FLOOR_MS
+            line += f"{exponent:>10.2f}" + ("  superlinear" if superlinear else "")
+            if args.max_exponent is not None and exponent > args.max_exponent \
+                    and results[str(scales[-1])][name] > NOISE_FLOOR_MS:
+                failures.append(f"{name} scales with exponent {exponent:.2f} (max {args.max_exponent})")
+        print(line)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        for scale, timings in results.items():
+            for name, ms in timings.items():
+                before = baseline.get(scale, {}).get(name)
+                if before is not None and ms > before * (1 + args.tolerance) and ms - before > NOISE_FLOOR_MS:
+                    failures.append(f"{scale}x {name}: {ms:.1f} ms, baseline {before:.1f} ms")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"days": args.days, "seed": args.seed, "repeat": args.repeat, "results": results}, f, indent=2)
+        print(f"\nSaved baseline to {args.save_baseline}")
+
+    for line in failures:
+        print(f"FAIL {line}")
+    return not failures
+
+
+if __name__ == "__main__":
+    main()
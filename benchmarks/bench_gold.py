@@ -0,0 +1,119 @@
+# benchmarks/bench_gold.py
+#
+# Check the numpy gold engine against the pure Python reference and time both on
+# several years of synthetic silver data. --check is the quick version: a fixed small
+# data set plus edge-case days (one listing, ties, no sqft, no prices), which must come
+# out bit-identical; it runs in a few seconds.
+#   python benchmarks/bench_gold.py                      # 3 years x 5,000 units a day
+#   python benchmarks/bench_gold.py --days 365 --units 1000 --keep /tmp/gold.db
+#   python benchmarks/bench_gold.py --check
+
+import argparse
+import math
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from database.connection import get_db_connection
+from benchmarks.common import load_silver, scratch_db, timed
+from cleaner import cleaner
+
+GOLD_COLUMNS = [
+    "scrape_date", "median_price", "avg_price",
+    "median_price_per_sqft", "avg_price_per_sqft",
+    "avg_sqft", "avg_beds", "avg_baths", "listing_count",
+    "min_price", "max_price", "price_std_dev",
+    "studio_count", "one_bed_count", "two_plus_bed_count",
+]
+
+
+def edge_case_silver():
+    # Days the random data rarely produces, after the synthetic ones
+    def day(scrape_date, listings):
+        for i, (price, beds, sqft) in enumerate(listings):
+            yield (f"Building {i}", "50309", "Downtown", price, beds, 1.0, sqft,
+                   f"edge{i}", scrape_date, f"{scrape_date}T12:00:00")
+    yield from day("2030-01-01", [(1200, 1, 700)])                                  # a single listing
+    yield from day("2030-01-02", [(1000, 0, 500), (1000, 1, 500), (1500, 2, 900), (1500, 2, 900)])  # even count, ties
+    yield from day("2030-01-03", [(900, 1, None), (1100, None, None), (1300, 2, None)])            # no sqft at all
+    yield from day("2030-01-04", [(None, 1, 600), (None, 2, 800)])                  # no prices: no gold row
+    yield from day("2030-01-05", [(999_999, 3, 1), (1, 0, 99_999), (875, 1, 611)])  # extreme $/sqft
+
+
+def compare(reference, candidate, rel_tol):
+    mismatches = []
+    if [row[0] for row in reference] != [row[0] for row in candidate]:
+        return ["scrape dates differ"]
+    for expected, actual in zip(reference, candidate):
+        for column, a, b in zip(GOLD_COLUMNS[1:], expected[1:], actual[1:]):
+            same = (a is None and b is None) or (
+                a is not None and b is not None and math.isclose(a, b, rel_tol=rel_tol, abs_tol=1e-9))
+            if not same:
+                mismatches.append(f"{expected[0]} {column}: python={a!r} numpy={b!r}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity check and benchmark for the gold aggregation engines.")
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--units", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--rel-tol", type=float, default=1e-9)
+    parser.add_argument("--keep", help="write the benchmark DB here instead of a temp file")
+    parser.add_argument("--check", action="store_true",
+                        help="only the quick parity check: 60 days x 300 units plus edge cases, bit-identical")
+    args = parser.parse_args()
+
+    if cleaner.np is None:
+        sys.exit("numpy is not installed; only the python engine is available.")
+
+    with scratch_db("bench_gold_", args.keep):
+        ok = check(args.seed) if args.check else run(args)
+    sys.exit(0 if ok else 1)
+
+
+def check(seed):
+    load_silver(60, 300, seed, edge_case_silver())
+    conn = get_db_connection()
+    reference = cleaner.compute_gold_rows(conn, engine="python")
+    candidate = cleaner.compute_gold_rows(conn, engine="numpy")
+    mismatches = compare(reference, candidate, rel_tol=0) or [
+        f"{expected[0]} {column}: python={a!r} numpy={b!r}"
+        for expected, actual in zip(reference, candidate)
+        for column, a, b in zip(GOLD_COLUMNS[1:], expected[1:], actual[1:]) if a != b]
+    for line in mismatches[:20]:
+        print(f"  MISMATCH {line}")
+    print(f"Parity: {'OK' if not mismatches else f'{len(mismatches)} mismatches'} across {len(reference)} dates"
+          " (bit-identical required)")
+    return not mismatches
+
+
+def run(args):
+    rows, elapsed = timed(load_silver, args.days, args.units, args.seed)
+    print(f"Loaded {rows:,} silver rows over {args.days} days in {elapsed:.1f}s")
+
+    # Each engine reads silver its own way, so the read is part of what is timed
+    conn = get_db_connection()
+    reference, python_time = timed(cleaner.compute_gold_rows, conn, engine="python")
+    candidate, numpy_time = timed(cleaner.compute_gold_rows, conn, engine="numpy")
+    print(f"python engine: {python_time:.2f}s")
+    print(f"numpy engine:  {numpy_time:.2f}s  ({python_time / numpy_time:.1f}x faster)")
+
+    mismatches = compare(reference, candidate, args.rel_tol)
+    for line in mismatches[:20]:
+        print(f"  MISMATCH {line}")
+    identical = sum(expected == actual for expected, actual in zip(reference, candidate))
+    print(f"Parity: {'OK' if not mismatches else f'{len(mismatches)} mismatches'} across {len(reference)} dates"
+          f" ({identical} bit-identical)")
+
+    # End to end, including the silver read and the gold writes
+    for engine in ("python", "numpy"):
+        cleaner.GOLD_ENGINE = engine
+        _, elapsed = timed(cleaner.promote_silver_to_gold, full_rebuild=True)
+        print(f"promote_silver_to_gold --full-rebuild ({engine}): {elapsed:.2f}s")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_parse.py
+#
+# Per-page parse time of BuildingPage for every installed HTML parser backend.
+#   python benchmarks/bench_parse.py                       # saved pages under deprecated/
+#   python benchmarks/bench_parse.py path/to/*.html --repeat 20
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from scraper.page import BuildingPage, PARSER_BACKENDS
+
+
+def load_pages(paths):
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            html = f.read()
+        if html.strip():
+            pages.append((os.path.basename(path), html))
+    return pages
+
+
+def time_backend(backend, html, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        BuildingPage(html, backend=backend)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BuildingPage parse time per backend.")
+    parser.add_argument("paths", nargs="*", help="saved HTML pages (default: deprecated/*.html)")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per page; the fastest is reported")
+    args = parser.parse_args()
+
+    pages = load_pages(args.paths or sorted(glob.glob(os.path.join(ROOT, "deprecated", "*.html"))))
+    if not pages:
+        print("No saved pages to parse.")
+        return
+
+    print(f"{len(pages)} page(s), best of {args.repeat}, backends: {', '.join(PARSER_BACKENDS)}\n")
+    print(f"{'backend':<12} {'ms/page':>10} {'pages/s':>10} {'units':>7}")
+    baseline = None
+    for backend in reversed(PARSER_BACKENDS):  # html.parser first, as the baseline
+        seconds = sum(time_backend(backend, html, args.repeat) for _, html in pages)
+        units = sum(len(BuildingPage(html, backend=backend).unit_cards) for _, html in pages)
+        per_page = seconds / len(pages) * 1000
+        baseline = baseline or per_page
+        print(f"{backend:<12} {per_page:>10.2f} {len(pages) / seconds:>10.1f} {units:>7}   ({baseline / per_page:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
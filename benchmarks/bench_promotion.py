@@ -0,0 +1,154 @@
+# benchmarks/bench_promotion.py
+#
+# Time Bronze → Silver promotion for one scrape day on a large synthetic bronze table,
+# against the row-by-row loop it replaced (kept below as legacy_promote) on the same
+# rows. Both must leave identical silver rows; then the full promote_bronze_to_silver
+# call (which also maintains unit_lifecycle and price_events) is timed on its own.
+#   python benchmarks/bench_promotion.py                 # 1,000,000 bronze rows
+#   python benchmarks/bench_promotion.py --rows 200000 --keep /tmp/bench.db
+
+import argparse
+import csv
+import glob
+import hashlib
+import os
+import random
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from database.connection import get_db_connection
+from database.database import BRONZE_COLUMNS, create_bronze_table, insert_bronze_listings, unit_signature
+from cleaner import cleaner
+from benchmarks.common import scratch_db, timed
+
+SCRAPE_DATE = "2025-05-07"
+SILVER_COLUMNS = ["title", "address", "city", "state", "zipcode", "neighborhood", "price", "beds", "baths", "sqft",
+                  "unit_name", "unit_id", "available_move_in_date", "total_available_units",
+                  "listing_url", "scrape_date", "scrape_timestamp", "signature"]
+
+
+def load_sample_rows():
+    rows = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "csv_exports", "*.csv"))):
+        with open(path, newline='', encoding='utf-8') as f:
+            rows.extend(csv.DictReader(f))
+    return rows
+
+
+def synthetic_bronze(sample, count, duplicate_rate, seed):
+    # Real rows with fresh unit_ids; a share of units is scraped twice so the dedup has work to do
+    rng = random.Random(seed)
+    unit = 0
+    produced = 0
+    while produced < count:
+        row = dict(rng.choice(sample))
+        unit += 1
+        versions = 2 if rng.random() < duplicate_rate else 1
+        for version in range(versions):
+            if produced >= count:
+                break
+            row["unit_id"] = f"u{unit}"
+            row["scrape_date"] = SCRAPE_DATE
+            row["scrape_timestamp"] = f"{SCRAPE_DATE}T12:{version:02d}:{unit % 60:02d}.{unit:06d}"
+            produced += 1
+            yield tuple(row.get(column) or None for column in BRONZE_COLUMNS)
+
+
+def legacy_promote(conn, scrape_date):
+    # The promotion loop before the set-based INSERT ... SELECT, writing today's silver
+    # columns: select the latest rows, normalize each in Python, then check and insert one by one
+    cursor = conn.cursor()
+    rows = cursor.execute('''
+        SELECT * FROM bronze_listings
+        WHERE scrape_timestamp IN (
+            SELECT MAX(scrape_timestamp) FROM bronze_listings WHERE scrape_date = ? GROUP BY unit_id
+        )
+    ''', (scrape_date,)).fetchall()
+    cursor.execute('DELETE FROM silver_listings WHERE scrape_date = ?', (scrape_date,))
+    cleaned_rows = []
+    for row in rows:
+        if not row['building_name'] or not row['price_raw']:
+            continue
+        zipcode = cleaner.normalize_zip(row['zipcode'])
+        beds, baths = cleaner.normalize_beds(row['beds']), cleaner.normalize_baths(row['baths'])
+        sqft = cleaner.normalize_sqft(row['sqft']) or None
+        cleaned_rows.append((
+            row['building_name'], cleaner.normalize_address(row['address']), cleaner.normalize_city(row['city']),
+            cleaner.normalize_state(row['state']), zipcode, cleaner.get_neighborhood(zipcode),
+            cleaner.normalize_price(row['price_raw']), beds, baths, sqft,
+            row['unit_name'], row['unit_id'],
+            cleaner.normalize_availability(row['available_move_in_date']), row['total_available_units'],
+            row['listing_url'], row['scrape_date'], row['scrape_timestamp'],
+            unit_signature(row['unit_id'], row['building_name'], row['unit_name'], beds, baths, sqft),
+        ))
+    promoted = 0
+    for cleaned in cleaned_rows:
+        if cursor.execute('SELECT 1 FROM silver_listings WHERE unit_id = ? AND scrape_date = ? LIMIT 1',
+                          (cleaned[11], cleaned[15])).fetchone():
+            continue
+        cursor.execute(f"INSERT INTO silver_listings ({', '.join(SILVER_COLUMNS)}) VALUES ({', '.join('?' * len(SILVER_COLUMNS))})",
+                       cleaned)
+        promoted += 1
+    return promoted
+
+
+def set_based_promote(conn, scrape_date):
+    cleaner.register_normalizers(conn)
+    return conn.execute(cleaner.PROMOTE_SILVER_SQL, (scrape_date,)).rowcount
+
+
+def silver_digest(conn):
+    rows = conn.execute(f"SELECT {', '.join(SILVER_COLUMNS)} FROM silver_listings ORDER BY unit_id").fetchall()
+    return hashlib.sha1(repr([tuple(row) for row in rows]).encode()).hexdigest()
+
+
+def promote_and_commit(promote, conn):
+    promoted = promote(conn, SCRAPE_DATE)
+    conn.commit()
+    return promoted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark promote_bronze_to_silver on a large bronze day.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of units scraped twice")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", help="write the benchmark DB here instead of a temp file")
+    args = parser.parse_args()
+
+    with scratch_db("bench_promotion_", args.keep):
+        run(args)
+
+
+def run(args):
+    create_bronze_table()
+
+    _, elapsed = timed(insert_bronze_listings, synthetic_bronze(load_sample_rows(), args.rows, args.duplicates, args.seed),
+                       batch_size=10_000)
+    print(f"Loaded {args.rows:,} bronze rows in {elapsed:.1f}s")
+
+    cleaner.create_silver_table()
+    conn = get_db_connection()
+    results = {}
+    for name, promote in (("row-by-row loop (before)", legacy_promote), ("set-based INSERT ... SELECT", set_based_promote)):
+        conn.execute("DELETE FROM silver_listings")   # both start from an empty silver table
+        conn.commit()
+        promoted, elapsed = timed(promote_and_commit, promote, conn)
+        results[name] = (elapsed, silver_digest(conn))
+        print(f"{name:<30}{promoted:>11,} silver rows in {elapsed:7.2f}s ({args.rows / elapsed:,.0f} bronze rows/s)")
+    (before, before_digest), (after, after_digest) = results.values()
+    print(f"Speedup: {before / after:.2f}x")
+    if before_digest != after_digest:
+        raise SystemExit("FAIL: the two promotions produced different silver rows")
+
+    # The whole call, on a populated silver table: delete-and-replace plus lifecycle and price events
+    _, elapsed = timed(cleaner.promote_bronze_to_silver, SCRAPE_DATE)
+    print(f"promote_bronze_to_silver (full call) in {elapsed:.2f}s")
+
+    silver = get_db_connection().execute("SELECT COUNT(*) FROM silver_listings").fetchone()[0]
+    print(f"silver_listings: {silver:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_quantiles.py
+#
+# Check /api/price-quantiles (merged gold_cube sketches) against exact quantiles from
+# silver over random date ranges and neighborhoods, and time both.
+#   python benchmarks/bench_quantiles.py                 # 1 year x 5,000 units a day
+#   python benchmarks/bench_quantiles.py --days 90 --units 1000 --queries 50
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from database.connection import get_db_connection
+from database.sketch import RELATIVE_ACCURACY
+from benchmarks.common import load_silver, scratch_db, timed
+from cleaner import cleaner
+from app.app import create_app
+
+QUANTILES = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+def exact_quantiles(conn, start, end, neighborhood):
+    # The order statistic the sketch approximates: sorted(prices)[floor(q * (n - 1))]
+    where = "" if neighborhood == "*" else "AND neighborhood = ?"
+    params = (start, end) if neighborhood == "*" else (start, end, neighborhood)
+    prices = sorted(row[0] for row in conn.execute(f'''
+        SELECT price FROM silver_listings
+        WHERE scrape_date BETWEEN ? AND ? AND price IS NOT NULL {where}
+    ''', params))
+    return len(prices), {q: prices[math.floor(q * (len(prices) - 1))] for q in QUANTILES} if prices else {}
+
+
+def random_queries(conn, count, seed):
+    rng = random.Random(seed)
+    dates = [row[0] for row in conn.execute('SELECT DISTINCT scrape_date FROM silver_listings ORDER BY scrape_date')]
+    neighborhoods = ["*"] + [row[0] for row in conn.execute('SELECT DISTINCT neighborhood FROM silver_listings')]
+    for _ in range(count):
+        first, last = sorted(rng.sample(range(len(dates)), 2)) if len(dates) > 1 else (0, 0)
+        yield dates[first], dates[last], rng.choice(neighborhoods)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy check and benchmark for the price quantile sketches.")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--units", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", help="write the benchmark DB here instead of a temp file")
+    args = parser.parse_args()
+
+    with scratch_db("bench_quantiles_", args.keep):
+        ok = run(args)
+    sys.exit(0 if ok else 1)
+
+
+def run(args):
+    rows, elapsed = timed(load_silver, args.days, args.units, args.seed)
+    print(f"Loaded {rows:,} silver rows over {args.days} days in {elapsed:.1f}s")
+    _, elapsed = timed(cleaner.promote_silver_to_gold, full_rebuild=True)
+    print(f"promote_silver_to_gold --full-rebuild: {elapsed:.2f}s")
+
+    conn = get_db_connection()
+    sketch_bytes, cube_rows = conn.execute(
+        "SELECT SUM(LENGTH(price_sketch)), COUNT(*) FROM gold_cube").fetchone()
+    print(f"Sketches: {sketch_bytes:,} bytes over {cube_rows:,} cube rows ({sketch_bytes / cube_rows:.0f} B/row)")
+
+    client = create_app().test_client()
+    q_param = ",".join(str(q) for q in QUANTILES)
+    violations, worst, sketch_time, exact_time = [], 0.0, 0.0, 0.0
+    queries = list(random_queries(conn, args.queries, args.seed))
+    for start, end, neighborhood in queries:
+        started = time.perf_counter()
+        response = client.get("/api/price-quantiles", query_string={
+            "start": start, "end": end, "neighborhood": neighborhood, "q": q_param}).get_json()
+        sketch_time += time.perf_counter() - started
+
+        (count, exact), elapsed = timed(exact_quantiles, conn, start, end, neighborhood)
+        exact_time += elapsed
+        if response["count"] != count:
+            violations.append(f"{start}..{end} {neighborhood}: count {response['count']} != {count}")
+            continue
+        for q, expected in exact.items():
+            estimate = response["quantiles"][str(q)]
+            error = abs(estimate - expected) / expected if expected else abs(estimate)
+            worst = max(worst, error)
+            if error > RELATIVE_ACCURACY + 1e-12:
+                violations.append(f"{start}..{end} {neighborhood} q={q}: {estimate:.2f} vs exact {expected}")
+
+    for line in violations[:20]:
+        print(f"  VIOLATION {line}")
+    print(f"Accuracy: {'OK' if not violations else f'{len(violations)} violations'} across {len(queries)} queries;"
+          f" worst relative error {worst:.4%} (bound {RELATIVE_ACCURACY:.0%})")
+    print(f"sketch merge (API): {sketch_time / len(queries) * 1000:.1f} ms/query")
+    print(f"exact from silver:  {exact_time / len(queries) * 1000:.1f} ms/query"
+          f"  ({exact_time / sketch_time:.1f}x slower)")
+    return not violations
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# benchmarks/bench_streaming.py
+#
+# Peak RSS and time-to-first-byte of /api/silver-by-date on one large day: the old
+# fetchall() + jsonify handler against the streamed response, uncompressed and with
+# each Content-Encoding. Every variant runs in a fresh process so peaks don't mix,
+# and every body must decode to the same bytes as jsonify's. RSS includes the pages
+# of the database file the connection maps (mmap_size), which every variant reads
+# alike; the Python heap peak (a second, untimed pass under tracemalloc) is what the
+# handler itself holds.
+#   python benchmarks/bench_streaming.py                 # one day of ~500,000 rows
+#   python benchmarks/bench_streaming.py --rows 100000 --keep /tmp/stream.db
+
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from database.connection import set_db_path, get_read_connection, close_thread_connections
+from benchmarks.common import load_silver, scratch_db, timed
+
+# variant: Accept-Encoding sent by the client
+VARIANTS = {"jsonify": None, "identity": None, "gzip": "gzip"}
+if brotli is not None:
+    VARIANTS["br"] = "br"
+
+
+def jsonify_silver_by_date(date):
+    # /api/silver-by-date as it was before streaming
+    from flask import jsonify
+    conn = get_read_connection()
+    rows = conn.execute("SELECT * FROM silver_listings WHERE scrape_date = ?", (date,)).fetchall()
+    conn.close()
+    return jsonify([dict(row) for row in rows])
+
+
+def current_rss_kb():
+    # Resident set now (ru_maxrss is a high-water mark that import and warm-up already raised)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def decoder(encoding):
+    if encoding == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+    if encoding == "br":
+        return brotli.Decompressor().process
+    return lambda chunk: chunk
+
+
+def measure(db_path, variant, date):
+    # Runs in a child process; prints one JSON line
+    from app.app import create_app
+    set_db_path(db_path)
+    app = create_app()
+    app.config["SERVE_SNAPSHOTS"] = False
+    app.add_url_rule("/bench/jsonify/<date>", view_func=jsonify_silver_by_date)
+    client = app.test_client()
+    client.get("/api/scrape-dates")  # open the connection and warm the imports first
+
+    path = f"/bench/jsonify/{date}" if variant == "jsonify" else f"/api/silver-by-date/{date}"
+    headers = {"Accept-Encoding": VARIANTS[variant]} if VARIANTS[variant] else {}
+
+    def fetch():
+        started = time.perf_counter()
+        response = client.get(path, headers=headers, buffered=False)
+        decode = decoder(response.headers.get("Content-Encoding"))
+        digest, sent, ttfb = hashlib.sha1(), 0, None
+        for chunk in response.response:
+            if chunk and ttfb is None:
+                ttfb = time.perf_counter() - started
+            sent += len(chunk)
+            digest.update(decode(chunk))
+        response.close()
+        return response.headers.get("Content-Encoding", "identity"), ttfb, time.perf_counter() - started, sent, digest
+
+    rss_before = current_rss_kb()
+    encoding, ttfb, total, sent, digest = fetch()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    fetch()
+    heap_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(json.dumps({
+        "variant": variant, "encoding": encoding,
+        "ttfb": ttfb, "total": total, "bytes": sent,
+        "rss_mb": rss_before / 1024, "peak_rss_mb": peak_rss / 1024, "heap_peak_mb": heap_peak / 1e6,
+        "sha1": digest.hexdigest(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS and TTFB of streamed vs buffered JSON responses.")
+    parser.add_argument("--rows", type=int, default=500_000, help="listings on the benchmark day")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", help="write the benchmark DB here instead of a temp file")
+    parser.add_argument("--child", nargs=3, metavar=("DB", "VARIANT", "DATE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(*args.child)
+        return
+    with scratch_db("bench_streaming_", args.keep) as db_path:
+        ok = run(args, db_path)
+    sys.exit(0 if ok else 1)
+
+
+def run(args, db_path):
+    # synthetic_silver leaves about one unit in five unlisted on a given day
+    rows, elapsed = timed(load_silver, 1, round(args.rows / 0.8), args.seed)
+    date = get_read_connection().execute("SELECT MAX(scrape_date) FROM silver_listings").fetchone()[0]
+    close_thread_connections()
+    print(f"Loaded {rows:,} silver rows for {date} in {elapsed:.1f}s")
+
+    results = []
+    for variant in VARIANTS:
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", db_path, variant, date],
+                               capture_output=True, text=True, check=True)
+        results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    print(f"{'variant':<10}{'encoding':>10}{'TTFB ms':>10}{'total ms':>10}{'MB sent':>10}"
+          f"{'peak RSS MB':>13}{'(+ request)':>13}{'heap peak MB':>14}")
+    for r in results:
+        print(f"{r['variant']:<10}{r['encoding']:>10}{r['ttfb'] * 1000:>10.0f}{r['total'] * 1000:>10.0f}"
+              f"{r['bytes'] / 1e6:>10.1f}{r['peak_rss_mb']:>13.1f}{r['peak_rss_mb'] - r['rss_mb']:>+13.1f}"
+              f"{r['heap_peak_mb']:>14.1f}")
+
+    mismatched = [r["variant"] for r in results if r["sha1"] != results[0]["sha1"]]
+    if mismatched:
+        print(f"Body mismatch against jsonify: {', '.join(mismatched)}")
+    return not mismatched
+
+
+if __name__ == "__main__":
+    main()
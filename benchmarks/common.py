@@ -0,0 +1,76 @@
+# benchmarks/common.py
+#
+# Helpers shared by the benchmark scripts: a stopwatch, a scratch database that the
+# process points at for the length of a run, and random silver rows loaded straight
+# into silver_listings for benchmarks that start after promotion.
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from database.connection import set_db_path, get_db_connection, close_thread_connections
+from cleaner import cleaner
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+@contextmanager
+def using_db(db_path):
+    # Point this process at db_path; this thread's connections are closed on the way out
+    try:
+        yield set_db_path(db_path)
+    finally:
+        close_thread_connections()
+
+
+@contextmanager
+def scratch_db(prefix, keep=None, name="bench.db"):
+    # A database in a temp dir that goes away after the run, or at --keep so it can be inspected
+    with tempfile.TemporaryDirectory(prefix=prefix) as tmp:
+        with using_db(keep or os.path.join(tmp, name)) as db_path:
+            yield db_path
+
+
+def synthetic_silver(days, units, seed):
+    # Rents drift a little every day; some rows miss a price, sqft or bed count like the real feed
+    rng = random.Random(seed)
+    zips = list(cleaner.ZIP_TO_NEIGHBORHOOD)
+    base = [(rng.choice(zips), rng.choice([0, 1, 1, 2, 2, 3]), rng.randint(450, 1600), rng.randint(700, 2600))
+            for _ in range(units)]
+    start = date(2023, 1, 1)
+    for day in range(days):
+        scrape_date = (start + timedelta(days=day)).isoformat()
+        drift = 1 + day / 3650
+        for unit, (zipcode, beds, sqft, rent) in enumerate(base):
+            if rng.random() < 0.2:
+                continue  # not listed today
+            price = None if rng.random() < 0.01 else int(rent * drift) + rng.randint(-40, 40)
+            yield (
+                f"Building {unit // 40}", zipcode, cleaner.get_neighborhood(zipcode),
+                price, None if rng.random() < 0.01 else beds, 1.0 + (beds > 1),
+                None if rng.random() < 0.05 else sqft,
+                f"u{unit}", scrape_date, f"{scrape_date}T12:00:00",
+            )
+
+
+def load_silver(days, units, seed, extra=()):
+    cleaner.create_silver_table()
+    conn = get_db_connection()
+    conn.executemany('''
+        INSERT INTO silver_listings (title, zipcode, neighborhood, price, beds, baths, sqft,
+                                     unit_id, scrape_date, scrape_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', itertools.chain(synthetic_silver(days, units, seed), extra))
+    conn.commit()
+    return conn.execute('SELECT COUNT(*) FROM silver_listings').fetchone()[0]
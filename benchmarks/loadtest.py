@@ -0,0 +1,197 @@
+# benchmarks/loadtest.py
+#
+# Load test of the production server: starts gunicorn with gunicorn.conf.py against a
+# synthetic database (or hits --url), then sends a fixed number of keep-alive requests
+# per endpoint from --concurrency client threads and reports p50/p95/p99 latency and
+# requests/sec for each. Latency is measured to the last byte of the body. Exits
+# non-zero if any request fails.
+#   python benchmarks/loadtest.py                        # 2 markets x 90 days, 2 workers x 4 threads
+#   python benchmarks/loadtest.py --workers 4 --concurrency 32 --requests 500
+#   python benchmarks/loadtest.py --db /tmp/load.db --publish
+#   python benchmarks/loadtest.py --url http://localhost:8080
+
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from benchmarks.common import timed, using_db
+from benchmarks.synthetic import BASE_UNITS, build_synthetic_db
+
+# The requests the pages make, plus parameterised ones spread over random dates
+ENDPOINTS = {
+    "gold-metrics": lambda dates, rng: "/api/gold-metrics",
+    "last-updated": lambda dates, rng: "/api/last-updated",
+    "todays-prices": lambda dates, rng: "/api/todays-prices",
+    "neighborhood-counts": lambda dates, rng: "/api/neighborhood-counts",
+    "neighborhood-deltas": lambda dates, rng: "/api/neighborhood-deltas",
+    "volatility-by-neighborhood": lambda dates, rng: "/api/volatility-by-neighborhood",
+    "bundle (dashboard)": lambda dates, rng: "/api/bundle?views=summary-stats,movers&limit=3",
+    "bundle (insights)": lambda dates, rng:
+        "/api/bundle?views=avg-volatility,fastest-market,median-lifespan,max-price-drop",
+    "listings (latest)": lambda dates, rng: f"/api/listings?date={dates[0]}&limit=25",  # dates are newest first
+    "listings (random)": lambda dates, rng:
+        f"/api/listings?date={rng.choice(dates)}&sort={rng.choice(['price', 'beds', 'sqft'])}"
+        f"&order={rng.choice(['asc', 'desc'])}&limit=25",
+    "movers (random)": lambda dates, rng: f"/api/movers?date={rng.choice(dates)}&limit=3",
+    "price-quantiles (range)": lambda dates, rng:
+        "/api/price-quantiles?start={}&end={}".format(*sorted(rng.sample(dates, 2))),
+    "silver-by-date (random)": lambda dates, rng: f"/api/silver-by-date/{rng.choice(dates)}",
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, db_path, snapshots):
+    port = free_port()
+    env = dict(os.environ, DB_PATH=db_path, SNAPSHOT_DIR=snapshots, PORT=str(port),
+               WEB_CONCURRENCY=str(args.workers), GUNICORN_THREADS=str(args.threads), LOG_LEVEL="warning")
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "app.app:create_app()"], cwd=ROOT, env=env)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"gunicorn exited with code {server.returncode}")
+        try:
+            status, _ = fetch(http.client.HTTPConnection("127.0.0.1", port, timeout=5), "/api/ping")
+            if status == 200:
+                return server, url
+        except OSError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("gunicorn did not answer /api/ping within 60s")
+
+
+def fetch(conn, path):
+    # Browsers ask for compressed bodies, so the server does the compression it would in production
+    conn.request("GET", path, headers={"Accept-Encoding": "gzip, br"})
+    response = conn.getresponse()
+    body = response.read()
+    return response.status, body
+
+
+def scrape_dates(url):
+    import json
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    conn.request("GET", "/api/scrape-dates")
+    dates = json.loads(conn.getresponse().read())
+    conn.close()
+    return dates
+
+
+def percentile(sorted_values, q):
+    # Nearest rank
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def load_endpoint(url, paths, concurrency):
+    # Every client thread keeps one connection open across its requests
+    parts = urlsplit(url)
+    local = threading.local()
+    latencies, errors = [], []
+
+    def one(path):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+        started = time.perf_counter()
+        try:
+            status, _ = fetch(conn, path)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            local.conn = None
+            errors.append(f"{path}: {e}")
+            return
+        if status != 200:
+            errors.append(f"{path}: HTTP {status}")
+            return
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, paths))
+    return sorted(latencies), errors, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency percentiles and throughput of the API under gunicorn.")
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--db", help="database to serve; built from synthetic data if missing")
+    parser.add_argument("--markets", type=int, default=2)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--units", type=int, default=BASE_UNITS, help="unit population per market")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="threads per worker")
+    parser.add_argument("--publish", action="store_true", help="publish snapshots first, so they are what gets served")
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--only", nargs="*", help="endpoint names to run (default: all)")
+    args = parser.parse_args()
+
+    if args.url:
+        sys.exit(0 if run(args, args.url) else 1)
+    with tempfile.TemporaryDirectory(prefix="loadtest_") as tmp:
+        db_path = os.path.abspath(args.db or os.path.join(tmp, "load.db"))
+        if not os.path.exists(db_path):
+            (_, rows), elapsed = timed(build_synthetic_db, db_path, args.markets, args.days, args.units, args.seed)
+            print(f"Built {db_path}: {rows:,} silver rows over {args.days} days in {elapsed:.1f}s")
+        snapshots = os.path.join(tmp, "snapshots")
+        if args.publish:
+            from publish import publish_snapshots
+            with using_db(db_path):
+                publish_snapshots(snapshots)
+
+        server, url = start_server(args, db_path, snapshots)
+        try:
+            ok = run(args, url)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    sys.exit(0 if ok else 1)
+
+
+def run(args, url):
+    dates = scrape_dates(url)
+    if len(dates) < 2:
+        print("Need at least two scrape dates to load test.")
+        return False
+    rng = random.Random(args.seed)
+    names = args.only or list(ENDPOINTS)
+    print(f"{args.requests} requests per endpoint, {args.concurrency} client threads, against {url}")
+    print(f"{'endpoint':<30}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+
+    failed = 0
+    for name in names:
+        paths = [ENDPOINTS[name](dates, rng) for _ in range(args.requests)]
+        latencies, errors, elapsed = load_endpoint(url, paths, args.concurrency)
+        failed += len(errors)
+        if not latencies:
+            print(f"{name:<30}{'-':>9}{'-':>9}{'-':>9}{'-':>9}{len(errors):>8}")
+        else:
+            print(f"{name:<30}{len(latencies) / elapsed:>9.0f}{percentile(latencies, 0.50) * 1000:>9.1f}"
+                  f"{percentile(latencies, 0.95) * 1000:>9.1f}{percentile(latencies, 0.99) * 1000:>9.1f}"
+                  f"{len(errors):>8}")
+        for line in errors[:3]:
+            print(f"  ERROR {line}")
+    return not failed
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# benchmarks/replay_pipeline.py
+#
+# Replay the daily pipeline offline from csv_exports/ into a temp database: each CSV
+# is one day's bronze, promoted to silver and then gold exactly as run.py does it.
+# --copies N adds N-1 synthetic copies of every unit (same rows under another
+# building and unit_id) to scale a day up. Reports, per stage, wall time, rows/sec,
+# peak RSS, and SQLite page I/O from /proc/self/io: pages read and written through
+# the syscalls (rchar/wchar) and bytes that reached the disk. Reads served from the
+# memory map (mmap_size) never show up as syscalls; --no-mmap routes them through
+# read() so they are counted too. Peak RSS is reset before each stage where the
+# kernel allows it (/proc/self/clear_refs); otherwise it is the process high-water mark.
+#   python benchmarks/replay_pipeline.py                          # every csv_exports/ day
+#   python benchmarks/replay_pipeline.py --copies 50 --no-mmap --heap
+#   python benchmarks/replay_pipeline.py --copies 20 --save-baseline /tmp/replay.json
+#   python benchmarks/replay_pipeline.py --copies 20 --baseline /tmp/replay.json
+
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from database import connection
+from database.connection import set_db_path, get_db_connection, close_thread_connections
+from database.database import BRONZE_COLUMNS, create_bronze_table, insert_bronze_listings
+from cleaner import cleaner
+
+STAGES = ["bronze", "silver", "gold", "publish"]
+NOISE_FLOOR_SECONDS = 0.05   # differences below this are never regressions
+
+
+def csv_date(path):
+    match = re.search(r"\d{4}-\d{2}-\d{2}", os.path.basename(path))
+    return match.group() if match else None
+
+
+def csv_bronze_rows(path, copies):
+    # The CSV's rows as bronze tuples; copy k of a unit gets its own building and unit_id
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            for copy in range(copies):
+                values = row if not copy else dict(row, building_name=f"{row['building_name']} (copy {copy})",
+                                                   unit_id=f"{row['unit_id']}-{copy}")
+                yield tuple(values.get(column) or None for column in BRONZE_COLUMNS)
+
+
+# --- Measurements ---
+
+def proc_io():
+    try:
+        with open("/proc/self/io") as f:
+            return {key: int(value) for key, value in (line.split(": ") for line in f)}
+    except OSError:
+        return {}
+
+
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(totals, stage, func, trace_heap):
+    # Runs one stage and folds its cost into totals[stage]; returns (rows, seconds)
+    reset_peak_rss()
+    io_before = proc_io()
+    if trace_heap:
+        tracemalloc.start()
+    started = time.perf_counter()
+    rows = func()
+    elapsed = time.perf_counter() - started
+    heap_peak = 0
+    if trace_heap:
+        heap_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    io_after = proc_io()
+
+    entry = totals.setdefault(stage, {"runs": 0, "seconds": 0.0, "rows": 0, "peak_rss_kb": 0, "heap_peak": 0,
+                                      "rchar": 0, "wchar": 0, "write_bytes": 0})
+    entry["runs"] += 1
+    entry["seconds"] += elapsed
+    entry["rows"] += rows
+    entry["peak_rss_kb"] = max(entry["peak_rss_kb"], peak_rss_kb())
+    entry["heap_peak"] = max(entry["heap_peak"], heap_peak)
+    for key in ("rchar", "wchar", "write_bytes"):
+        entry[key] += io_after.get(key, 0) - io_before.get(key, 0)
+    return rows, elapsed
+
+
+# --- Stages ---
+
+def bronze_stage(path, copies):
+    return insert_bronze_listings(csv_bronze_rows(path, copies), batch_size=10_000)
+
+
+def silver_stage(scrape_date):
+    return cleaner.promote_bronze_to_silver(scrape_date)
+
+
+def gold_stage():
+    # Rows in = the silver rows of the dates gold recomputes
+    dirty = get_db_connection().execute('''
+        SELECT COUNT(*) FROM silver_listings
+        WHERE scrape_date IN (SELECT scrape_date FROM gold_dirty_dates)
+    ''').fetchone()[0]
+    cleaner.promote_silver_to_gold()
+    import meta_tracker
+    meta_tracker.create_meta_table()
+    meta_tracker.update_last_updated()
+    return dirty
+
+
+def publish_stage(out_dir):
+    from publish import publish_snapshots
+    return publish_snapshots(out_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time bronze → silver → gold on csv_exports/ replayed into a temp DB.")
+    parser.add_argument("paths", nargs="*", help="scraped_<date>.csv files (default: csv_exports/*.csv)")
+    parser.add_argument("--copies", type=int, default=1, help="scale every day up to N copies of each unit")
+    parser.add_argument("--publish", action="store_true", help="also publish the API snapshots after each day")
+    parser.add_argument("--no-mmap", action="store_true", help="read pages with read() so page reads are counted")
+    parser.add_argument("--heap", action="store_true", help="also trace the Python heap peak (slower)")
+    parser.add_argument("--keep", help="write the replay DB here instead of a temp file")
+    parser.add_argument("--baseline", help="fail on stages slower than this earlier --save-baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown against the baseline (0.5 = 50%%)")
+    parser.add_argument("--save-baseline", help="write the per-stage totals here")
+    parser.add_argument("--verbose", action="store_true", help="keep the pipeline's own log lines")
+    args = parser.parse_args()
+
+    paths = sorted(args.paths or glob.glob(os.path.join(ROOT, "csv_exports", "scraped_*.csv")), key=csv_date)
+    paths = [path for path in paths if csv_date(path)]
+    if not paths:
+        raise SystemExit("No scraped_<date>.csv files to replay.")
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    if args.no_mmap:
+        connection.PRAGMAS["mmap_size"] = 0
+
+    with tempfile.TemporaryDirectory(prefix="replay_pipeline_") as tmp:
+        ok = run(args, paths, args.keep or os.path.join(tmp, "replay.db"), os.path.join(tmp, "snapshots"))
+    sys.exit(0 if ok else 1)
+
+
+def run(args, paths, db_path, snapshots):
+    set_db_path(db_path)
+    create_bronze_table()
+    page_size = get_db_connection().execute("PRAGMA page_size").fetchone()[0]
+    peak_resettable = reset_peak_rss()
+    print(f"Replaying {len(paths)} day(s) x {args.copies} cop{'y' if args.copies == 1 else 'ies'} into {db_path}"
+          f" (mmap {'off' if args.no_mmap else 'on'}, {page_size}-byte pages)\n")
+
+    totals = {}
+    for path in paths:
+        scrape_date = csv_date(path)
+        stages = [("bronze", lambda: bronze_stage(path, args.copies)),
+                  ("silver", lambda: silver_stage(scrape_date)),
+                  ("gold", gold_stage)]
+        if args.publish:
+            stages.append(("publish", lambda: publish_stage(snapshots)))
+        line = []
+        for stage, func in stages:
+            rows, elapsed = measure(totals, stage, func, args.heap)
+            line.append(f"{stage} {rows:,} in {elapsed:.2f}s")
+        print(f"{scrape_date}: " + ", ".join(line))
+    close_thread_connections()
+
+    print(f"\n{'stage':<9}{'seconds':>9}{'rows':>11}{'rows/s':>11}{'peak RSS MB':>13}"
+          + (f"{'heap MB':>9}" if args.heap else "")
+          + f"{'pages read':>12}{'pages written':>15}{'disk MB written':>17}")
+    for stage in STAGES:
+        entry = totals.get(stage)
+        if entry is None:
+            continue
+        print(f"{stage:<9}{entry['seconds']:>9.2f}{entry['rows']:>11,}{entry['rows'] / max(entry['seconds'], 1e-9):>11,.0f}"
+              f"{entry['peak_rss_kb'] / 1024:>13.1f}" + (f"{entry['heap_peak'] / 1e6:>9.1f}" if args.heap else "")
+              + f"{entry['rchar'] // page_size:>12,}{entry['wchar'] // page_size:>15,}{entry['write_bytes'] / 1e6:>17.1f}")
+    if not peak_resettable:
+        print("(peak RSS is the process high-water mark: /proc/self/clear_refs is not available)")
+    print(f"database: {os.path.getsize(db_path) / 1e6:.1f} MB")
+
+    failures = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["stages"]
+        for stage, entry in totals.items():
+            before = baseline.get(stage, {}).get("seconds")
+            if before is not None and entry["seconds"] > before * (1 + args.tolerance) \
+                    and entry["seconds"] - before > NOISE_FLOOR_SECONDS:
+                failures.append(f"{stage}: {entry['seconds']:.2f}s, baseline {before:.2f}s")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"paths": [os.path.basename(path) for path in paths], "copies": args.copies,
+                       "stages": totals}, f, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+    for line in failures:
+        print(f"FAIL {line}")
+    return not failures
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# benchmarks/synthetic.py
+#
+# Synthetic data at any scale: N markets x M days x K units, shaped like the real feed.
+# Every unit is a copy of a real one from csv_exports/ (building, zip, bed/bath mix,
+# sqft, rent), so the distributions match what the scraper sees. Each market has its
+# own rent level, yearly drift and seasonality. Listings come and go (churn), units
+# come back after a while at a new rent (relistings), rents change while listed, and
+# a few units are scraped twice a day. Rows go through the real pipeline: bronze,
+# then promote_bronze_to_silver() day by day, then one gold rebuild.
+#   python benchmarks/synthetic.py --out /tmp/synthetic.db --scale 10     # 10x today's volume
+#   python benchmarks/synthetic.py --out /tmp/synthetic.db --markets 3 --days 365 --units 2000
+
+import argparse
+import csv
+import glob
+import math
+import os
+import random
+import sys
+from array import array
+from datetime import date, timedelta
+from itertools import groupby
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from database.database import BRONZE_COLUMNS, create_bronze_table, insert_bronze_listings
+from cleaner import cleaner
+from benchmarks.common import timed, using_db
+
+# One market at today's volume: a few weeks of one city, about 1,000 listings a day
+BASE_UNITS = 1600
+BASE_DAYS = 21
+START_DATE = date(2025, 5, 1)
+
+MEAN_LISTED_DAYS = 30      # expected days a listing stays up before the unit is let
+MEAN_UNLISTED_DAYS = 20    # expected days a let unit stays off the market before it is relisted
+PRICE_CHANGE_RATE = 0.04   # daily chance a listed unit's asking rent changes
+DUPLICATE_RATE = 0.02      # units scraped twice in a day; silver keeps the later row
+SEASONAL_AMPLITUDE = 0.02  # rents peak in summer by this much
+
+SCRAPE_DATE_INDEX = BRONZE_COLUMNS.index("scrape_date")
+
+
+def scale_params(scale):
+    # "10x today's volume" is ten markets the size of today's one
+    return {"markets": scale, "days": BASE_DAYS, "units": BASE_UNITS}
+
+
+def load_templates():
+    # The latest row of every real unit in csv_exports/, with its rent parsed
+    units = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, "csv_exports", "*.csv"))):
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                rent = cleaner.normalize_price(row.get("price_raw"))
+                if row.get("building_name") and rent:
+                    units[(row["building_name"], row["unit_id"])] = (row, rent)
+    if not units:
+        raise SystemExit("No priced rows in csv_exports/ to seed synthetic data from.")
+    return list(units.values())
+
+
+def _round_rent(rent):
+    return max(300, int(round(rent / 5)) * 5)
+
+
+def synthetic_bronze(markets, days, units, seed, start=START_DATE):
+    # Bronze rows (BRONZE_COLUMNS order) for every day, in date order
+    rng = random.Random(seed)
+    templates = load_templates()
+    levels = [1.0] + [rng.uniform(0.75, 1.35) for _ in range(markets - 1)]
+    drifts = [rng.uniform(-0.02, 0.06) for _ in range(markets)]
+    phases = [rng.uniform(0, 2 * math.pi) for _ in range(markets)]
+
+    # Per-unit state in flat arrays, so a thousand markets still fit in memory
+    total = markets * units
+    template = array('i', (rng.randrange(len(templates)) for _ in range(total)))
+    base_rent = array('d', (templates[template[unit]][1] * rng.lognormvariate(0, 0.04) for unit in range(total)))
+    rent = array('i', bytes(4 * total))  # 0 while not listed
+    listed_share = MEAN_LISTED_DAYS / (MEAN_LISTED_DAYS + MEAN_UNLISTED_DAYS)
+    listed = bytearray(rng.random() < listed_share for _ in range(total))
+
+    for day in range(days):
+        scrape_date = (start + timedelta(days=day)).isoformat()
+        trend = [levels[m] * (1 + drifts[m] * day / 365)
+                 * (1 + SEASONAL_AMPLITUDE * math.sin(2 * math.pi * day / 365 + phases[m]))
+                 for m in range(markets)]
+        for unit in range(total):
+            market = unit // units
+            if listed[unit] and day and rng.random() < 1 / MEAN_LISTED_DAYS:
+                listed[unit], rent[unit] = 0, 0
+                continue
+            if not listed[unit]:
+                if not day or rng.random() >= 1 / MEAN_UNLISTED_DAYS:
+                    continue
+                listed[unit] = 1
+            if not rent[unit]:
+                # Fresh listings (and relistings) ask the market rate of the day
+                rent[unit] = _round_rent(base_rent[unit] * trend[market] * rng.lognormvariate(0, 0.03))
+            elif rng.random() < PRICE_CHANGE_RATE:
+                rent[unit] = _round_rent(rent[unit] * rng.uniform(0.94, 1.04))
+
+            row, _ = templates[template[unit]]
+            building = row["building_name"] if market == 0 else f"{row['building_name']} (market {market})"
+            values = dict(row, building_name=building, unit_id=f"{market}-{unit}", scrape_date=scrape_date,
+                          price_raw=f"price${rent[unit]:,}",
+                          scrape_timestamp=f"{scrape_date}T12:{unit // 60 % 60:02d}:{unit % 60:02d}.{unit % 10**6:06d}")
+            if rng.random() < DUPLICATE_RATE:
+                earlier = dict(values, price_raw=f"price${_round_rent(rent[unit] * 1.02):,}",
+                               scrape_timestamp=f"{scrape_date}T06:00:00.{unit % 10**6:06d}")
+                yield tuple(earlier.get(column) or None for column in BRONZE_COLUMNS)
+            yield tuple(values.get(column) or None for column in BRONZE_COLUMNS)
+
+
+def build_synthetic_db(db_path, markets, days, units, seed=7):
+    # Fills bronze, silver (with lifecycle and price events) and gold; returns (bronze rows, silver rows)
+    with using_db(db_path):
+        create_bronze_table()
+        bronze = silver = 0
+        for scrape_date, rows in groupby(synthetic_bronze(markets, days, units, seed),
+                                         key=lambda row: row[SCRAPE_DATE_INDEX]):
+            bronze += insert_bronze_listings(rows, batch_size=10_000)
+            silver += cleaner.promote_bronze_to_silver(scrape_date)
+        cleaner.promote_silver_to_gold(full_rebuild=True)
+        import meta_tracker
+        meta_tracker.create_meta_table()
+        meta_tracker.update_last_updated()
+    return bronze, silver
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a database with synthetic listings at any scale.")
+    parser.add_argument("--out", required=True, help="database file to create")
+    parser.add_argument("--scale", type=int, help=f"N x today's volume ({BASE_UNITS:,} units, {BASE_DAYS} days per market)")
+    parser.add_argument("--markets", type=int, default=1)
+    parser.add_argument("--days", type=int, default=BASE_DAYS)
+    parser.add_argument("--units", type=int, default=BASE_UNITS, help="unit population per market")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if os.path.exists(args.out):
+        raise SystemExit(f"{args.out} already exists")
+    params = scale_params(args.scale) if args.scale else {"markets": args.markets, "days": args.days, "units": args.units}
+    (bronze, silver), elapsed = timed(build_synthetic_db, args.out, seed=args.seed, **params)
+    print(f"Built {args.out}: {params['markets']} markets x {params['days']} days x {params['units']:,} units,"
+          f" {bronze:,} bronze and {silver:,} silver rows in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,38 @@
-import sqlite3
 import os
 import re
+import argparse
+import sys
+import time
+import math
 import statistics
 import logging
+from fractions import Fraction
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from itertools import groupby
+
+# NumPy runs the gold aggregation as vectorized group-bys; the pure Python path is the fallback
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.connection import get_db_connection, transaction
+from database.migrations import run_migrations
+from database.database import unit_signature, ROLLING_WINDOWS
+from database.sketch import PriceSketch
 
 # --------------------
 # Setup
 # --------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_NAME = "housing_tracker.db"
+# python, numpy, or auto: numpy only when scrape days are big enough for it to win. Its
+# fixed cost per date is larger than the Python loop's per-row cost below a few hundred
+# listings a day (the crossover measured cold with benchmarks/bench_gold.py is about 400 rows
+# per date; the threshold leaves some margin).
+GOLD_ENGINE = os.environ.get("GOLD_ENGINE", "auto")
+GOLD_NUMPY_MIN_ROWS_PER_DATE = 500
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
@@ -37,11 +61,6 @@ ZIP_TO_NEIGHBORHOOD = {
     "50111": "Grimes"
 }
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
-
 # --------------------
 # SILVER LAYER
 # --------------------
@@ -68,7 +87,8 @@ def create_silver_table():
             total_available_units INTEGER,
             listing_url TEXT,
             scrape_date DATE,
-            scrape_timestamp TEXT
+            scrape_timestamp TEXT,
+            signature TEXT
         )
     ''')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_silver_date ON silver_listings(scrape_date)')
@@ -82,8 +102,44 @@ def create_silver_table():
         ON silver_listings(unit_id, scrape_date)
     ''')
 
+    # Dates whose silver rows changed since gold last ran
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gold_dirty_dates (
+            scrape_date DATE PRIMARY KEY,
+            marked_at TEXT
+        )
+    ''')
+
+    # One row per unit signature: when it was first and last listed and its latest price
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS unit_lifecycle (
+            signature TEXT PRIMARY KEY,
+            unit_id TEXT,
+            first_seen DATE,
+            last_seen DATE,
+            days_listed INTEGER,
+            current_price INTEGER
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_lifecycle_last_seen ON unit_lifecycle(last_seen)')
+
+    # Price changes between a scrape date and the scrape date before it
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS price_events (
+            signature TEXT NOT NULL,
+            scrape_date DATE NOT NULL,
+            previous_date DATE,
+            old_price INTEGER,
+            new_price INTEGER,
+            delta INTEGER,
+            PRIMARY KEY (signature, scrape_date)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_events_date_delta ON price_events(scrape_date, delta)')
+
     conn.commit()
     conn.close()
+    run_migrations()
     logging.info("Silver table and indexes ensured.")
 
 # --------------------
@@ -153,107 +209,218 @@ def normalize_state(state):
 def get_neighborhood(zipcode):
     return ZIP_TO_NEIGHBORHOOD.get(zipcode, "General Area")
 
-
-def format_float(value, decimals=1):
-    try:
-        return f"{float(value):.{decimals}f}"
-    except (TypeError, ValueError):
-        return ""
-
 # --------------------
 # Promote Bronze → Silver
 # --------------------
 
-def promote_bronze_to_silver():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Get the most recent scrape_date
-    cursor.execute('SELECT scrape_date FROM bronze_listings ORDER BY scrape_timestamp DESC LIMIT 1')
-    latest_date = cursor.fetchone()['scrape_date']
+# Normalizers exposed to SQL so promotion runs as one INSERT ... SELECT.
+# Numeric columns are stored as native numbers, NULL when missing.
+SQL_NORMALIZERS = {
+    "normalize_address": normalize_address,
+    "normalize_city": normalize_city,
+    "normalize_state": normalize_state,
+    "normalize_zip": normalize_zip,
+    "get_neighborhood": get_neighborhood,
+    "normalize_price": normalize_price,
+    "normalize_beds": normalize_beds,
+    "normalize_baths": normalize_baths,
+    "silver_sqft": lambda raw: normalize_sqft(raw) or None,  # 0 sqft means unknown
+    "normalize_availability": normalize_availability,
+}
 
-    # Deduplicate by unit_id and get only the latest listing per unit
-    cursor.execute('''
-        SELECT * FROM bronze_listings 
-        WHERE scrape_timestamp IN (
-            SELECT MAX(scrape_timestamp)
+def _memoized(func):
+    # A day's bronze repeats the same few thousand address, price and bed strings,
+    # so each distinct value only goes through the regexes once
+    cache = {}
+    def lookup(raw):
+        try:
+            return cache[raw]
+        except KeyError:
+            value = cache[raw] = func(raw)
+            return value
+    return lookup
+
+def register_normalizers(conn):
+    # Fresh caches per registration, so they live for one promotion run
+    for name, func in SQL_NORMALIZERS.items():
+        conn.create_function(name, 1, _memoized(func), deterministic=True)
+    conn.create_function("unit_signature", 6, unit_signature, deterministic=True)
+
+# Latest bronze row per unit_id for the day, cleaned on the way into silver.
+# Rows without a building name or price are dropped. The unit signature is stored
+# with the row so day-over-day diffs can join on it instead of rebuilding it per request.
+# Only ids go through the window sort; `cleaned` is materialized so every normalizer
+# runs once per row and the signature is built from its results.
+PROMOTE_SILVER_SQL = '''
+    INSERT OR IGNORE INTO silver_listings (
+        title, address, city, state, zipcode, neighborhood,
+        price, beds, baths, sqft,
+        unit_name, unit_id,
+        available_move_in_date, total_available_units,
+        listing_url, scrape_date, scrape_timestamp, signature
+    )
+    WITH latest AS (
+        SELECT bronze_listings.* FROM bronze_listings
+        JOIN (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY unit_id ORDER BY scrape_timestamp DESC, id DESC) AS rn
             FROM bronze_listings
             WHERE scrape_date = ?
-            GROUP BY unit_id
-        )
-    ''', (latest_date,))
-    rows = cursor.fetchall()
-
-
+        ) ranked ON ranked.id = bronze_listings.id AND ranked.rn = 1
+    ),
+    cleaned AS MATERIALIZED (
+        SELECT id,
+            building_name AS title, normalize_address(address) AS address,
+            normalize_city(city) AS city, normalize_state(state) AS state, normalize_zip(zipcode) AS zipcode,
+            normalize_price(price_raw) AS price, normalize_beds(beds) AS beds,
+            normalize_baths(baths) AS baths, silver_sqft(sqft) AS sqft,
+            unit_name, unit_id,
+            normalize_availability(available_move_in_date) AS available_move_in_date, total_available_units,
+            listing_url, scrape_date, scrape_timestamp
+        FROM latest
+        WHERE COALESCE(building_name, '') != ''
+          AND COALESCE(price_raw, '') != ''
+    )
+    SELECT
+        title, address, city, state, zipcode, get_neighborhood(zipcode),
+        price, beds, baths, sqft,
+        unit_name, unit_id,
+        available_move_in_date, total_available_units,
+        listing_url, scrape_date, scrape_timestamp,
+        unit_signature(unit_id, title, unit_name, beds, baths, sqft)
+    FROM cleaned
+    ORDER BY id
+'''
+
+def mark_gold_dirty(cursor, scrape_dates):
+    # Runs inside the caller's silver transaction, so gold can never miss a change
+    now = datetime.now().isoformat()
+    cursor.executemany('INSERT OR REPLACE INTO gold_dirty_dates (scrape_date, marked_at) VALUES (?, ?)',
+                       [(scrape_date, now) for scrape_date in scrape_dates])
+
+def promote_bronze_to_silver(scrape_date=None):
+    create_silver_table()
+    with transaction() as conn:
+        register_normalizers(conn)
+        cursor = conn.cursor()
+
+        # Default to the most recent scrape_date
+        if scrape_date is None:
+            scrape_date = cursor.execute('SELECT MAX(scrape_date) AS scrape_date FROM bronze_listings').fetchone()['scrape_date']
+        if scrape_date is None or not cursor.execute(
+                'SELECT 1 FROM bronze_listings WHERE scrape_date = ? LIMIT 1', (scrape_date,)).fetchone():
+            logging.warning("No bronze listings to promote.")
+            return 0
 
-    if not rows:
-        logging.warning("No bronze listings to promote.")
-        return
+        started = time.perf_counter()
+        promoted = _replace_silver_date(cursor, scrape_date)
+        update_lifecycle(cursor, scrape_date)
+    logging.info(f"Promoted {promoted} listings into silver_listings table in {time.perf_counter() - started:.2f}s.")
+    return promoted
 
-    scrape_date = rows[0]['scrape_date']
-    create_silver_table()
+def _replace_silver_date(cursor, scrape_date):
     cursor.execute('DELETE FROM silver_listings WHERE scrape_date = ?', (scrape_date,))
     logging.info(f"Cleared existing Silver listings for {scrape_date}")
+    cursor.execute(PROMOTE_SILVER_SQL, (scrape_date,))
+    promoted = cursor.rowcount
+    mark_gold_dirty(cursor, [scrape_date])
+    return promoted
+
+def promote_bronze_dates(scrape_dates):
+    # Backfill / rebuild: promote many bronze dates in one pass, committing after each
+    # so the WAL stays small, then rebuild unit_lifecycle and price_events once instead
+    # of per date (dates promoted out of order would rebuild them every time anyway).
+    # Gold is left dirty for the caller to recompute once.
+    create_silver_table()
+    register_normalizers(get_db_connection())
+
+    started = time.perf_counter()
+    promoted = 0
+    for i, scrape_date in enumerate(scrape_dates, 1):
+        with transaction() as conn:
+            count = _replace_silver_date(conn.cursor(), scrape_date)
+        promoted += count
+        elapsed = time.perf_counter() - started
+        remaining = elapsed / i * (len(scrape_dates) - i)
+        logging.info(f"[{i}/{len(scrape_dates)}] Promoted {count} listings for {scrape_date}"
+                     f" ({promoted / max(elapsed, 1e-9):,.0f} rows/s, about {remaining:.0f}s left).")
+
+    lifecycle_started = time.perf_counter()
+    with transaction() as conn:
+        rebuild_lifecycle(conn.cursor())
+    logging.info(f"Rebuilt unit_lifecycle and price_events from silver in {time.perf_counter() - lifecycle_started:.1f}s.")
+    return promoted
 
-    cleaned_rows = []
-    for row in rows:
-        if not row['building_name'] or not row['price_raw']:
-            logging.warning(f"Skipping row with missing building name or price: {row['building_name']}, {row['price_raw']}")
-            continue
-
-        zipcode = normalize_zip(row['zipcode'])
-        neighborhood = get_neighborhood(zipcode)
-
-        cleaned = (
-            row['building_name'],
-            normalize_address(row['address']),
-            normalize_city(row['city']),
-            normalize_state(row['state']),
-            zipcode,
-            neighborhood,
-            normalize_price(row['price_raw']),
-            format_float(normalize_beds(row['beds']), 1),
-            format_float(normalize_baths(row['baths']), 1),
-            str(normalize_sqft(row['sqft']) or ""),
-            row['unit_name'],
-            row['unit_id'],
-            normalize_availability(row['available_move_in_date']),
-            row['total_available_units'],
-            row['listing_url'],
-            row['scrape_date'],
-            row['scrape_timestamp']
-        )
-        cleaned_rows.append(cleaned)
-
-    for cleaned in cleaned_rows:
-        unit_id = cleaned[11]  # index of unit_id in the cleaned tuple
-        scrape_date = cleaned[15]  # index of scrape_date in the cleaned tuple
-
-    # Check if unit_id already exists for this scrape_date in Silver
-        cursor.execute('''
-            SELECT 1 FROM silver_listings
-            WHERE unit_id = ? AND scrape_date = ?
-            LIMIT 1
-        ''', (unit_id, scrape_date))
-
-        if cursor.fetchone():
-            logging.info(f"Skipping duplicate unit_id {unit_id} for {scrape_date}")
-            continue
-
-        cursor.execute('''
-            INSERT INTO silver_listings (
-                title, address, city, state, zipcode, neighborhood,
-                price, beds, baths, sqft,
-                unit_name, unit_id,
-                available_move_in_date, total_available_units,
-                listing_url, scrape_date, scrape_timestamp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', cleaned)
+# --------------------
+# Listing lifecycle
+# --------------------
 
+LIFECYCLE_UPSERT_SQL = '''
+    INSERT INTO unit_lifecycle (signature, unit_id, first_seen, last_seen, days_listed, current_price)
+    SELECT signature, unit_id, scrape_date, scrape_date, 1, price
+    FROM silver_listings
+    WHERE scrape_date = ? AND signature IS NOT NULL
+    ON CONFLICT(signature) DO UPDATE SET
+        last_seen = excluded.last_seen,
+        days_listed = days_listed + 1,
+        current_price = excluded.current_price
+'''
+
+# unit_id is part of the signature, so any row's value will do
+LIFECYCLE_REBUILD_SQL = '''
+    INSERT INTO unit_lifecycle (signature, unit_id, first_seen, last_seen, days_listed, current_price)
+    SELECT lifecycle.signature, lifecycle.unit_id, first_seen, last_seen, days_listed, latest.price
+    FROM (
+        SELECT signature, unit_id, MIN(scrape_date) AS first_seen, MAX(scrape_date) AS last_seen,
+            COUNT(*) AS days_listed
+        FROM silver_listings
+        WHERE signature IS NOT NULL
+        GROUP BY signature
+    ) AS lifecycle
+    JOIN silver_listings latest ON latest.signature = lifecycle.signature AND latest.scrape_date = last_seen
+'''
+
+# {dates} pairs each scrape date with the one before it. The previous day's row is
+# looked up by signature; left to itself the planner walks idx_silver_date_price for
+# the whole previous day once per row, which makes every promotion quadratic.
+PRICE_EVENTS_SQL = '''
+    INSERT INTO price_events (signature, scrape_date, previous_date, old_price, new_price, delta)
+    SELECT cur.signature, cur.scrape_date, prev.scrape_date, prev.price, cur.price, cur.price - prev.price
+    FROM ({dates}) AS dates
+    JOIN silver_listings cur ON cur.scrape_date = dates.scrape_date
+    JOIN silver_listings prev INDEXED BY idx_silver_signature_date ON prev.signature = cur.signature AND prev.scrape_date = dates.previous_date
+    WHERE cur.price IS NOT NULL
+      AND prev.price IS NOT NULL
+      AND cur.price != prev.price
+'''
+
+def rebuild_lifecycle(cursor):
+    cursor.execute('DELETE FROM unit_lifecycle')
+    cursor.execute(LIFECYCLE_REBUILD_SQL)
+    cursor.execute('DELETE FROM price_events')
+    cursor.execute(PRICE_EVENTS_SQL.format(dates='''
+        SELECT scrape_date, LAG(scrape_date) OVER (ORDER BY scrape_date) AS previous_date
+        FROM (SELECT DISTINCT scrape_date FROM silver_listings)
+    '''))
+
+def update_lifecycle(cursor, scrape_date):
+    # Runs inside the silver transaction. When the tables are current through the
+    # previous scrape date, only the new day is folded in; anything else (first run,
+    # a re-promoted or back-filled date) rebuilds them from silver.
+    previous_date = cursor.execute('SELECT MAX(scrape_date) FROM silver_listings WHERE scrape_date < ?',
+                                   (scrape_date,)).fetchone()[0]
+    latest_date = cursor.execute('SELECT MAX(scrape_date) FROM silver_listings').fetchone()[0]
+    last_seen = cursor.execute('SELECT MAX(last_seen) FROM unit_lifecycle').fetchone()[0]
+
+    if scrape_date != latest_date or previous_date is None or last_seen != previous_date:
+        rebuild_lifecycle(cursor)
+        logging.info("Rebuilt unit_lifecycle and price_events from silver.")
+        return
 
-    conn.commit()
-    conn.close()
-    logging.info(f"Promoted {len(cleaned_rows)} listings into silver_listings table.")
+    cursor.execute(LIFECYCLE_UPSERT_SQL, (scrape_date,))
+    cursor.execute('DELETE FROM price_events WHERE scrape_date = ?', (scrape_date,))
+    cursor.execute(PRICE_EVENTS_SQL.format(dates='SELECT ? AS scrape_date, ? AS previous_date'),
+                   (scrape_date, previous_date))
+    logging.info(f"Recorded {cursor.rowcount} price changes for {scrape_date}.")
 
 # --------------------
 # GOLD LAYER
@@ -284,90 +451,469 @@ def create_gold_table():
         )
     ''')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_gold_date ON gold_metrics(scrape_date)')
+
+    # Per-day aggregates by neighborhood x zipcode x bed bucket; '*' marks a rolled-up
+    # dimension and '' a listing without a zipcode. Price sums are kept exact so
+    # multi-day figures can be pooled without going back to silver.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gold_cube (
+            scrape_date DATE NOT NULL,
+            neighborhood TEXT NOT NULL,
+            zipcode TEXT NOT NULL,
+            bed_bucket TEXT NOT NULL,
+            listing_count INTEGER,
+            price_count INTEGER,
+            price_sum INTEGER,
+            price_sq_sum INTEGER,
+            median_price REAL,
+            avg_price REAL,
+            price_std_dev REAL,
+            price_m2 REAL,
+            ppsf_count INTEGER,
+            median_price_per_sqft REAL,
+            avg_price_per_sqft REAL,
+            price_sketch BLOB,
+            PRIMARY KEY (scrape_date, neighborhood, zipcode, bed_bucket)
+        ) WITHOUT ROWID
+    ''')
+
+    # Trailing-window figures per neighborhood ('*' for the whole city), one row per
+    # (end date, window length). Built from gold_cube's exact per-day price sums.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rolling_metrics (
+            scrape_date DATE NOT NULL,
+            window_days INTEGER NOT NULL,
+            neighborhood TEXT NOT NULL,
+            day_count INTEGER,
+            listing_count INTEGER,
+            unit_count INTEGER,
+            price_count INTEGER,
+            price_sum INTEGER,
+            price_sq_sum INTEGER,
+            avg_price REAL,
+            price_m2 REAL,
+            price_std_dev REAL,
+            avg_daily_std_dev REAL,
+            avg_days_listed REAL,
+            PRIMARY KEY (scrape_date, window_days, neighborhood)
+        ) WITHOUT ROWID
+    ''')
     conn.commit()
     conn.close()
-    logging.info("Gold table and index ensured.")
+    logging.info("Gold tables and indexes ensured.")
+
+
+def compute_gold_row(date, rows):
+    values = {
+        'prices': [],
+        'price_per_sqft': [],
+        'sqfts': [],
+        'beds': [],
+        'baths': [],
+        'studio_count': 0,
+        'one_bed_count': 0,
+        'two_plus_bed_count': 0,
+        'count': 0
+    }
+
+    for price, sqft, beds, baths in rows:
+        if price is not None:
+            values['prices'].append(price)
+        if price and sqft and sqft != 0:
+            values['price_per_sqft'].append(price / sqft)
+        if sqft:
+            values['sqfts'].append(sqft)
+        if beds is not None:
+            values['beds'].append(beds)
+            if beds == 0:
+                values['studio_count'] += 1
+            elif beds == 1:
+                values['one_bed_count'] += 1
+            elif beds >= 2:
+                values['two_plus_bed_count'] += 1
+        if baths is not None:
+            values['baths'].append(baths)
+
+        values['count'] += 1
+
+    count = values['count']
+    if count == 0 or not values['prices']:
+        return None
 
+    avg_price = sum(values['prices']) / count
+    median_price = statistics.median(values['prices'])
+    min_price = min(values['prices'])
+    max_price = max(values['prices'])
+    price_std_dev = statistics.stdev(values['prices']) if len(values['prices']) > 1 else 0
+
+    avg_price_per_sqft = sum(values['price_per_sqft']) / len(values['price_per_sqft']) if values['price_per_sqft'] else None
+    median_price_per_sqft = statistics.median(values['price_per_sqft']) if values['price_per_sqft'] else None
+    avg_sqft = sum(values['sqfts']) / len(values['sqfts']) if values['sqfts'] else None
+    avg_beds = sum(values['beds']) / len(values['beds']) if values['beds'] else None
+    avg_baths = sum(values['baths']) / len(values['baths']) if values['baths'] else None
+
+    return (
+        date, median_price, avg_price,
+        median_price_per_sqft, avg_price_per_sqft,
+        avg_sqft, avg_beds, avg_baths, count,
+        min_price, max_price, price_std_dev,
+        values['studio_count'], values['one_bed_count'], values['two_plus_bed_count']
+    )
+
+
+# Which silver dates a gold pass reads: all of them, or only those marked dirty
+GOLD_SOURCE_FILTERS = {
+    "all": "",
+    "dirty": "WHERE scrape_date IN (SELECT scrape_date FROM gold_dirty_dates)",
+}
 
-def promote_silver_to_gold():
-    conn = get_db_connection()
+
+def _gold_rows_python(cursor, where):
+    cursor.execute(f'''
+        SELECT scrape_date, price, sqft, beds, baths FROM silver_listings {where}
+        ORDER BY scrape_date, id
+    ''')
+    gold_rows = []
+    for date, group in groupby(cursor, key=lambda row: row[0]):
+        gold_row = compute_gold_row(date, [row[1:] for row in group])
+        if gold_row is not None:
+            gold_rows.append(gold_row)
+    return gold_rows
+
+
+# One row per scrape date. SQLite does the grouping and the order-free aggregates; the
+# values the medians and the spread need come back packed as one string per column,
+# which NumPy parses without creating a Python object per listing.
+GOLD_GROUPS_SQL = '''
+    SELECT
+        scrape_date,
+        COUNT(*),
+        AVG(CASE WHEN sqft != 0 THEN sqft END),
+        AVG(beds),
+        AVG(baths),
+        COUNT(CASE WHEN beds = 0 THEN 1 END),
+        COUNT(CASE WHEN beds = 1 THEN 1 END),
+        COUNT(CASE WHEN beds >= 2 THEN 1 END),
+        group_concat(price),
+        group_concat(CASE WHEN price != 0 AND sqft != 0 THEN price END),
+        group_concat(CASE WHEN price != 0 AND sqft != 0 THEN sqft END)
+    -- walking the date index keeps each group in id order, the order the Python reference sums in
+    FROM silver_listings INDEXED BY idx_silver_date
+    {where}
+    GROUP BY scrape_date
+    ORDER BY scrape_date
+'''
+
+
+def _sqrt_of_fraction(numerator, denominator):
+    # Correctly rounded sqrt(numerator / denominator), as statistics.stdev returns it;
+    # math.sqrt of the already rounded quotient can land one ulp away.
+    target = Fraction(numerator, denominator)
+    root = math.sqrt(numerator / denominator)
+    candidates = (math.nextafter(root, 0), root, math.nextafter(root, math.inf))
+    return min(candidates, key=lambda r: abs(Fraction(r) ** 2 - target))
+
+
+def _unpack_ints(packed):
+    # A group_concat of silver prices or sqfts, which are whole numbers (see normalize_price/normalize_sqft)
+    if np is None:
+        return [int(value) for value in packed.split(',')] if packed else []
+    return np.fromstring(packed, dtype=np.int64, sep=',') if packed else np.empty(0, dtype=np.int64)
+
+
+def _gold_rows_numpy(cursor, where):
+    # Same numbers as compute_gold_row, vectorized per date
+    gold_rows = []
+    cursor.execute(GOLD_GROUPS_SQL.format(where=where))
+    for (date, count, avg_sqft, avg_beds, avg_baths, studio_count, one_bed_count, two_plus_bed_count,
+         packed_prices, packed_ppsf_prices, packed_ppsf_sqfts) in cursor:
+        prices = _unpack_ints(packed_prices)
+        n = len(prices)
+        if n == 0:
+            continue
+
+        price_sum = int(prices.sum())
+        if n > 1:
+            # Exact integer sums of x and x^2, so the variance is not hurt by cancellation
+            square_sum = int(np.dot(prices, prices))
+            price_std_dev = _sqrt_of_fraction(n * square_sum - price_sum * price_sum, n * (n - 1))
+        else:
+            price_std_dev = 0
+
+        price_per_sqft = _unpack_ints(packed_ppsf_prices) / _unpack_ints(packed_ppsf_sqfts)
+        if len(price_per_sqft):
+            # Summed left to right like the Python reference, not pairwise
+            avg_price_per_sqft = sum(price_per_sqft.tolist()) / len(price_per_sqft)
+            median_price_per_sqft = float(np.median(price_per_sqft))
+        else:
+            avg_price_per_sqft = median_price_per_sqft = None
+
+        gold_rows.append((
+            date, float(np.median(prices)), price_sum / count,
+            median_price_per_sqft, avg_price_per_sqft,
+            avg_sqft, avg_beds, avg_baths, count,
+            int(prices.min()), int(prices.max()), price_std_dev,
+            studio_count, one_bed_count, two_plus_bed_count
+        ))
+    return gold_rows
+
+
+def resolve_gold_engine(conn, engine=None):
+    # GOLD_ENGINE=auto sizes the work by the latest scrape date, one index range to count
+    engine = engine or GOLD_ENGINE
+    if engine != "auto":
+        return engine
+    if np is None:
+        return "python"
+    rows = conn.execute(
+        'SELECT COUNT(*) FROM silver_listings WHERE scrape_date = (SELECT MAX(scrape_date) FROM silver_listings)'
+    ).fetchone()[0]
+    return "numpy" if rows >= GOLD_NUMPY_MIN_ROWS_PER_DATE else "python"
+
+
+def compute_gold_rows(conn, dates="all", engine=None):
+    # Gold rows for every silver date selected by GOLD_SOURCE_FILTERS[dates].
+    # compute_gold_row stays the reference; the numpy engine must reproduce it.
+    engine = resolve_gold_engine(conn, engine)
     cursor = conn.cursor()
+    cursor.row_factory = None  # plain tuples are noticeably cheaper on millions of rows
+    if engine == "numpy":
+        if np is None:
+            raise RuntimeError("GOLD_ENGINE=numpy requires numpy to be installed")
+        return _gold_rows_numpy(cursor, GOLD_SOURCE_FILTERS[dates])
+    return _gold_rows_python(cursor, GOLD_SOURCE_FILTERS[dates])
 
-    # Get the most recent scrape_date
-# Get all distinct scrape dates in Silver
-    cursor.execute('SELECT DISTINCT scrape_date FROM silver_listings ORDER BY scrape_date ASC')
-    scrape_dates = [row['scrape_date'] for row in cursor.fetchall()]
-
-    data_by_date = {}
-
-    for date in scrape_dates:
-        cursor.execute('SELECT * FROM silver_listings WHERE scrape_date = ?', (date,))
-        rows = cursor.fetchall()
-
-        for row in rows:
-            date = row['scrape_date']
-            if date not in data_by_date:
-                data_by_date[date] = {
-                    'prices': [],
-                    'price_per_sqft': [],
-                    'sqfts': [],
-                    'beds': [],
-                    'baths': [],
-                    'studio_count': 0,
-                    'one_bed_count': 0,
-                    'two_plus_bed_count': 0,
-                    'count': 0
-                }
-
-            price = row['price']
-            sqft = row['sqft']
-            beds = row['beds']
-
-            if price is not None:
-                data_by_date[date]['prices'].append(price)
-            if price and sqft and sqft != 0:
-                data_by_date[date]['price_per_sqft'].append(price / sqft)
-            if sqft:
-                data_by_date[date]['sqfts'].append(sqft)
-            if beds is not None:
-                data_by_date[date]['beds'].append(beds)
-                if beds == 0:
-                    data_by_date[date]['studio_count'] += 1
-                elif beds == 1:
-                    data_by_date[date]['one_bed_count'] += 1
-                elif beds >= 2:
-                    data_by_date[date]['two_plus_bed_count'] += 1
-            if row['baths'] is not None:
-                data_by_date[date]['baths'].append(row['baths'])
-
-            data_by_date[date]['count'] += 1
 
+# --------------------
+# GOLD CUBE
+# --------------------
 
-    create_gold_table()
+BED_BUCKETS = ("studio", "1br", "2plus", "unknown")
+BED_BUCKET_SQL = '''
+    CASE WHEN beds = 0 THEN 'studio'
+         WHEN beds = 1 THEN '1br'
+         WHEN beds >= 2 THEN '2plus'
+         ELSE 'unknown' END
+'''
+
+# Finest cells (date x neighborhood x zipcode x bed bucket) come from one GROUP BY over
+# silver; the rollups are built by merging the cells' packed values in Python.
+CUBE_CELLS_SQL = f'''
+    SELECT scrape_date, neighborhood, COALESCE(zipcode, ''), {BED_BUCKET_SQL},
+        COUNT(*),
+        group_concat(price),
+        group_concat(CASE WHEN price != 0 AND sqft != 0 THEN price END),
+        group_concat(CASE WHEN price != 0 AND sqft != 0 THEN sqft END)
+    FROM silver_listings
+    {{where}}
+    GROUP BY 1, 2, 3, 4
+    ORDER BY 1, 2, 3, 4
+'''
+
+
+def _cube_keys(neighborhood, zipcode, bed_bucket):
+    # Every cube row a finest cell contributes to
+    return (
+        (neighborhood, zipcode, bed_bucket),
+        (neighborhood, zipcode, '*'),
+        (neighborhood, '*', '*'),
+        ('*', '*', bed_bucket),
+        ('*', '*', '*'),
+    )
+
+
+def _median(values):
+    ordered = np.sort(values) if np is not None else sorted(values)
+    mid = len(ordered) // 2
+    return float(ordered[mid]) if len(ordered) % 2 else float(ordered[mid - 1] + ordered[mid]) / 2
+
+
+def _cube_row(key, listing_count, packed_prices, packed_ppsf_prices, packed_ppsf_sqfts):
+    prices = _unpack_ints(packed_prices)
+    n = len(prices)
+    if np is not None:
+        price_sum, square_sum = int(prices.sum()), int(np.dot(prices, prices))
+        price_per_sqft = _unpack_ints(packed_ppsf_prices) / _unpack_ints(packed_ppsf_sqfts)
+    else:
+        price_sum, square_sum = sum(prices), sum(price * price for price in prices)
+        price_per_sqft = [price / sqft for price, sqft in
+                          zip(_unpack_ints(packed_ppsf_prices), _unpack_ints(packed_ppsf_sqfts))]
+    price_sketch = PriceSketch.from_values(prices).to_bytes()
+
+    if n:
+        # n * M2 = n * sum(x^2) - sum(x)^2, exact since prices are integers
+        n_m2 = n * square_sum - price_sum * price_sum
+        price_stats = (_median(prices), price_sum / n,
+                       math.sqrt(n_m2 / (n * (n - 1))) if n > 1 else 0, n_m2 / n)
+    else:
+        price_stats = (None, None, None, None)
+
+    # fsum is exact, so the mean does not depend on the order group_concat saw the rows in
+    ppsf_count = len(price_per_sqft)
+    ppsf_stats = (_median(price_per_sqft), math.fsum(price_per_sqft) / ppsf_count) if ppsf_count else (None, None)
+
+    return (*key, listing_count, n, price_sum, square_sum, *price_stats, ppsf_count, *ppsf_stats, price_sketch)
+
+
+def compute_cube_rows(conn, dates="all"):
+    # gold_cube rows for every silver date selected by GOLD_SOURCE_FILTERS[dates]
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(CUBE_CELLS_SQL.format(where=GOLD_SOURCE_FILTERS[dates]))
 
-    for date, values in data_by_date.items():
-        count = values['count']
-        if count == 0 or not values['prices']:
-            continue
+    cube_rows = []
+    for date, cells in groupby(cursor, key=lambda row: row[0]):
+        merged = {}
+        for _, neighborhood, zipcode, bed_bucket, listing_count, *packed in cells:
+            for key in _cube_keys(neighborhood, zipcode, bed_bucket):
+                entry = merged.setdefault(key, [0, [], [], []])
+                entry[0] += listing_count
+                for parts, value in zip(entry[1:], packed):
+                    if value:
+                        parts.append(value)
+        for key, (listing_count, *parts) in merged.items():
+            cube_rows.append(_cube_row((date, *key), listing_count, *(",".join(p) for p in parts)))
+    return cube_rows
 
-        avg_price = sum(values['prices']) / count
-        median_price = statistics.median(values['prices'])
-        min_price = min(values['prices'])
-        max_price = max(values['prices'])
-        price_std_dev = statistics.stdev(values['prices']) if len(values['prices']) > 1 else 0
 
-        avg_price_per_sqft = sum(values['price_per_sqft']) / len(values['price_per_sqft']) if values['price_per_sqft'] else None
-        median_price_per_sqft = statistics.median(values['price_per_sqft']) if values['price_per_sqft'] else None
-        avg_sqft = sum(values['sqfts']) / len(values['sqfts']) if values['sqfts'] else None
-        avg_beds = sum(values['beds']) / len(values['beds']) if values['beds'] else None
-        avg_baths = sum(values['baths']) / len(values['baths']) if values['baths'] else None
 
-        studio_count = values['studio_count']
-        one_bed_count = values['one_bed_count']
-        two_plus_bed_count = values['two_plus_bed_count']
+# --------------------
+# ROLLING WINDOWS
+# --------------------
+
+ROLLING_CUBE_SQL = '''
+    SELECT scrape_date, neighborhood, listing_count, price_count, price_sum, price_sq_sum, price_std_dev
+    FROM gold_cube
+    WHERE scrape_date BETWEEN ? AND ? AND zipcode = '*' AND bed_bucket = '*'
+    ORDER BY scrape_date
+'''
+
+ROLLING_UNITS_SQL = '''
+    SELECT scrape_date, neighborhood, unit_id
+    FROM silver_listings INDEXED BY idx_silver_date
+    WHERE scrape_date BETWEEN ? AND ?
+    ORDER BY scrape_date
+'''
+
+
+def rolling_anchors(dates, changed_dates):
+    # A changed day moves every window that ends on it or within the longest window after it
+    span = max(ROLLING_WINDOWS)
+    changed = [datetime.fromisoformat(date) for date in changed_dates]
+    return [date for date in dates
+            if any(0 <= (datetime.fromisoformat(date) - day).days < span for day in changed)]
+
+
+class _UnitWindow:
+    # Distinct (neighborhood, unit_id) pairs and their days listed over a sliding window
+    def __init__(self, window_days):
+        self.window_days = window_days
+        self.days = deque()
+        self.pair_days = Counter()
+        self.unit_days = Counter()
+
+    def add(self, ordinal, date, pairs, neighborhood_counts):
+        self.days.append((ordinal, date, pairs, neighborhood_counts))
+        self.pair_days.update(pairs)
+        self.unit_days.update(neighborhood_counts)
+        while self.days[0][0] <= ordinal - self.window_days:
+            _, _, old_pairs, old_counts = self.days.popleft()
+            self.pair_days.subtract(old_pairs)
+            self.unit_days.subtract(old_counts)
+            for pair in old_pairs:
+                if not self.pair_days[pair]:
+                    del self.pair_days[pair]
+
+    def units(self):
+        return Counter(neighborhood for neighborhood, _ in self.pair_days)
+
+
+def _rolling_row(key, cells, unit_count, unit_days):
+    # Price moments pool exactly from the cube's integer sums: n * M2 = n * sum(x^2) - sum(x)^2
+    n = sum(cell[1] for cell in cells)
+    price_sum = sum(cell[2] for cell in cells)
+    square_sum = sum(cell[3] for cell in cells)
+    std_devs = [cell[4] for cell in cells if cell[4] is not None]
+    if n:
+        price_m2 = (n * square_sum - price_sum * price_sum) / n
+        price_stats = (price_sum / n, price_m2, math.sqrt(price_m2 / n))
+    else:
+        price_stats = (None, None, None)
+    return (*key, len(cells), sum(cell[0] for cell in cells), unit_count, n, price_sum, square_sum, *price_stats,
+            math.fsum(std_devs) / len(std_devs) if std_devs else None,
+            unit_days / unit_count if unit_count else None)
+
+
+def compute_rolling_rows(conn, anchors):
+    # rolling_metrics rows for every (anchor date, window); anchors must be sorted
+    if not anchors:
+        return []
+    first = (datetime.fromisoformat(anchors[0]) - timedelta(days=max(ROLLING_WINDOWS) - 1)).date().isoformat()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+
+    cube = {}
+    for date, neighborhood, *cell in cursor.execute(ROLLING_CUBE_SQL, (first, anchors[-1])):
+        cube.setdefault(date, []).append((neighborhood, *cell))
+
+    anchor_set = set(anchors)
+    windows = [_UnitWindow(days) for days in ROLLING_WINDOWS]
+    rolling_rows = []
+    cursor.execute(ROLLING_UNITS_SQL, (first, anchors[-1]))
+    for date, rows in groupby(cursor, key=lambda row: row[0]):
+        ordinal = datetime.fromisoformat(date).toordinal()
+        # (unit_id, scrape_date) is unique in silver, so each pair appears once per day
+        pairs = [row[1:] for row in rows]
+        neighborhood_counts = Counter(neighborhood for neighborhood, _ in pairs)
+        for window in windows:
+            window.add(ordinal, date, pairs, neighborhood_counts)
+        if date not in anchor_set:
+            continue
 
-        cursor.execute('DELETE FROM gold_metrics WHERE scrape_date = ?', (date,))
-        cursor.execute('''
+        for window in windows:
+            cells = {}
+            for _, day, _, _ in window.days:
+                for neighborhood, *cell in cube.get(day, ()):
+                    cells.setdefault(neighborhood, []).append(cell)
+            units = window.units()
+            for neighborhood, neighborhood_cells in cells.items():
+                if neighborhood == '*':
+                    unit_count, unit_days = len(window.pair_days), sum(window.unit_days.values())
+                else:
+                    unit_count, unit_days = units[neighborhood], window.unit_days[neighborhood]
+                rolling_rows.append(_rolling_row((date, window.window_days, neighborhood),
+                                                 neighborhood_cells, unit_count, unit_days))
+    return rolling_rows
+
+def promote_silver_to_gold(full_rebuild=False):
+    create_silver_table()
+    create_gold_table()
+    with transaction() as conn:
+        cursor = conn.cursor()
+
+        # Only dates whose silver changed since the last run are recomputed. An empty gold
+        # table (first run, or a fresh volume) or --full-rebuild recomputes everything.
+        if not full_rebuild and not (cursor.execute('SELECT 1 FROM gold_metrics LIMIT 1').fetchone()
+                                     and cursor.execute('SELECT 1 FROM gold_cube LIMIT 1').fetchone()):
+            logging.info("Gold tables are empty; rebuilding every scrape date.")
+            full_rebuild = True
+
+        if full_rebuild:
+            cursor.execute('SELECT DISTINCT scrape_date FROM silver_listings ORDER BY scrape_date ASC')
+            scrape_dates = [row['scrape_date'] for row in cursor.fetchall()]
+            cursor.execute('DELETE FROM gold_metrics')
+            cursor.execute('DELETE FROM gold_cube')
+        else:
+            cursor.execute('SELECT scrape_date FROM gold_dirty_dates ORDER BY scrape_date ASC')
+            scrape_dates = [row['scrape_date'] for row in cursor.fetchall()]
+
+        # The affected silver rows are read once and aggregated per date by the gold engine
+        started = time.perf_counter()
+        engine = resolve_gold_engine(conn)
+        gold_rows = compute_gold_rows(conn, "all" if full_rebuild else "dirty", engine)
+
+        cursor.executemany('DELETE FROM gold_metrics WHERE scrape_date = ?', [(date,) for date in scrape_dates])
+        cursor.executemany('''
             INSERT INTO gold_metrics (
                 scrape_date, median_price, avg_price,
                 median_price_per_sqft, avg_price_per_sqft,
@@ -375,17 +921,48 @@ def promote_silver_to_gold():
                 min_price, max_price, price_std_dev,
                 studio_count, one_bed_count, two_plus_bed_count
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            date, median_price, avg_price,
-            median_price_per_sqft, avg_price_per_sqft,
-            avg_sqft, avg_beds, avg_baths, count,
-            min_price, max_price, price_std_dev,
-            studio_count, one_bed_count, two_plus_bed_count
-        ))
-
-    conn.commit()
-    conn.close()
-    logging.info(f"Promoted {len(data_by_date)} scrape days into gold_metrics table.")
+        ''', gold_rows)
+        promoted = len(gold_rows)
+
+        cube_rows = compute_cube_rows(conn, "all" if full_rebuild else "dirty")
+        cursor.executemany('DELETE FROM gold_cube WHERE scrape_date = ?', [(date,) for date in scrape_dates])
+        cursor.executemany('''
+            INSERT INTO gold_cube (
+                scrape_date, neighborhood, zipcode, bed_bucket,
+                listing_count, price_count, price_sum, price_sq_sum,
+                median_price, avg_price, price_std_dev, price_m2,
+                ppsf_count, median_price_per_sqft, avg_price_per_sqft, price_sketch
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', cube_rows)
+
+        # Rolling windows ending on or up to the longest window after a changed day
+        gold_dates = [row['scrape_date'] for row in cursor.execute('SELECT scrape_date FROM gold_metrics ORDER BY scrape_date')]
+        if full_rebuild or not cursor.execute('SELECT 1 FROM rolling_metrics LIMIT 1').fetchone():
+            cursor.execute('DELETE FROM rolling_metrics')
+            anchors = gold_dates
+        else:
+            anchors = rolling_anchors(gold_dates, scrape_dates)
+        rolling_rows = compute_rolling_rows(conn, anchors)
+        cursor.executemany('DELETE FROM rolling_metrics WHERE scrape_date = ?',
+                           [(date,) for date in sorted(set(anchors) | set(scrape_dates))])
+        cursor.executemany('''
+            INSERT INTO rolling_metrics (
+                scrape_date, window_days, neighborhood,
+                day_count, listing_count, unit_count,
+                price_count, price_sum, price_sq_sum,
+                avg_price, price_m2, price_std_dev,
+                avg_daily_std_dev, avg_days_listed
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rolling_rows)
+
+        if full_rebuild:
+            cursor.execute('DELETE FROM gold_dirty_dates')
+        else:
+            cursor.executemany('DELETE FROM gold_dirty_dates WHERE scrape_date = ?', [(date,) for date in scrape_dates])
+    logging.info(f"Promoted {promoted} scrape days into gold_metrics table, {len(cube_rows)} gold_cube rows"
+                 f" and {len(rolling_rows)} rolling_metrics rows"
+                 + (" (full rebuild)" if full_rebuild else f" ({len(scrape_dates)} dirty)")
+                 + f" with the {engine} engine in {time.perf_counter() - started:.2f}s.")
 
 
 # --------------------
@@ -393,5 +970,10 @@ def promote_silver_to_gold():
 # --------------------
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Promote bronze → silver → gold.")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="recompute gold for every silver date instead of only changed ones")
+    args = parser.parse_args()
+
     promote_bronze_to_silver()
-    promote_silver_to_gold()
+    promote_silver_to_gold(full_rebuild=args.full_rebuild)
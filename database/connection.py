@@ -0,0 +1,138 @@
+# database/connection.py
+
+import os
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+
+# One place to resolve the DB path: $DB_PATH (set in the Docker image for the Fly volume),
+# otherwise housing_tracker.db at the repo root.
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DB_PATH = os.path.abspath(os.environ.get("DB_PATH", os.path.join(ROOT_DIR, "housing_tracker.db")))
+
+BUSY_TIMEOUT_SECONDS = 10
+PRAGMAS = {
+    "synchronous": "NORMAL",       # safe with WAL, one fsync per checkpoint instead of per commit
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,      # negative = KiB, so 64 MiB
+    "temp_store": "MEMORY",
+}
+
+_local = threading.local()
+
+
+class SharedConnection(sqlite3.Connection):
+    # Connections are reused per thread, so close() only ends the caller's unit of work:
+    # like a real close, anything left uncommitted is discarded. Inside transaction()
+    # the outermost scope owns the transaction, so nothing it calls can end it early:
+    # close() leaves it alone, and commit() or rollback() raise instead of silently
+    # committing or discarding the caller's work.
+    scope_depth = 0
+
+    def commit(self):
+        self._check_unscoped("commit")
+        super().commit()
+
+    def rollback(self):
+        self._check_unscoped("rollback")
+        super().rollback()
+
+    def close(self):
+        if not self.scope_depth:
+            super().rollback()
+
+    def close_for_real(self):
+        super().close()
+
+    def _check_unscoped(self, action):
+        if self.scope_depth:
+            raise sqlite3.ProgrammingError(
+                f"{action}() inside transaction(); the outermost transaction() scope commits or rolls back")
+
+
+def _open(path, read_only):
+    if read_only:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=BUSY_TIMEOUT_SECONDS,
+                               factory=SharedConnection, cached_statements=256)
+    else:
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, factory=SharedConnection, cached_statements=256)
+        # WAL lets the API keep reading while the pipeline writes; the setting is stored in the file
+        conn.execute("PRAGMA journal_mode=WAL")
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _thread_connection(read_only):
+    # Keyed by pid too, so a forked worker never inherits its parent's connection
+    key = (DB_PATH, read_only, os.getpid())
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(key)
+    if conn is None:
+        conn = connections[key] = _open(DB_PATH, read_only)
+    return conn
+
+
+def get_db_connection():
+    return _thread_connection(read_only=False)
+
+
+def get_read_connection():
+    return _thread_connection(read_only=True)
+
+
+@contextmanager
+def transaction(read_only=False):
+    # One unit of work on this thread's connection, committed when the outermost scope's
+    # block finishes and rolled back if it raises. A nested transaction() (or a helper's
+    # get_db_connection()) joins the open one and cannot commit or roll it back.
+    conn = _thread_connection(read_only)
+    outermost = conn.scope_depth == 0
+    if outermost:
+        if conn.in_transaction:
+            logging.warning("Discarding uncommitted work left open on this thread's connection.")
+            sqlite3.Connection.rollback(conn)
+        conn.execute("BEGIN")
+    depth = conn.scope_depth
+    conn.scope_depth = depth + 1
+    try:
+        yield conn
+        conn.scope_depth = depth
+        if outermost:
+            sqlite3.Connection.commit(conn)
+    finally:
+        conn.scope_depth = depth
+        if outermost and conn.in_transaction:   # the block raised, or the commit failed
+            sqlite3.Connection.rollback(conn)
+
+
+def close_thread_connections():
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close_for_real()
+    _local.connections = {}
+
+
+def set_db_path(path):
+    # Point this process at another database (benchmarks, replays, temp DBs)
+    global DB_PATH
+    close_thread_connections()
+    DB_PATH = os.path.abspath(path)
+    return DB_PATH
+
+
+def snapshot_dir():
+    # Pre-rendered API responses (publish.py) live beside the database unless $SNAPSHOT_DIR says otherwise
+    return os.environ.get("SNAPSHOT_DIR") or os.path.join(os.path.dirname(DB_PATH), "snapshots")
+
+
+def checkpoint_wal():
+    # Fold the WAL back into the main file, e.g. before the .db file alone is copied to Fly
+    conn = get_db_connection()
+    busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    if busy:
+        logging.warning("WAL checkpoint could not complete; a reader is still active.")
+    return checkpointed
@@ -1,19 +1,18 @@
 # database/database.py
 
-import sqlite3
 import os
+import csv
+import time
 import logging
+import itertools
+from datetime import datetime
 
-# Use dynamic path to allow deployment to Fly.io or other servers
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_NAME = "housing_tracker.db"
+from database.connection import get_db_connection, transaction
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Trailing windows (in days) kept in gold's rolling_metrics and accepted by the API's ?window=
+ROLLING_WINDOWS = (7, 30, 90)
 
 def create_bronze_table():
     conn = get_db_connection()
@@ -58,36 +57,125 @@ def clear_bronze_table():
     conn.close()
     logging.info("Bronze table cleared.")
 
+BRONZE_COLUMNS = [
+    'building_name', 'address', 'city', 'state', 'zipcode',
+    'unit_name', 'unit_id', 'price_raw', 'beds', 'baths', 'sqft',
+    'available_move_in_date', 'total_available_units',
+    'listing_url', 'scrape_date', 'scrape_timestamp'
+]
+
+BRONZE_INSERT_SQL = f'''
+    INSERT INTO bronze_listings ({', '.join(BRONZE_COLUMNS)})
+    VALUES ({', '.join('?' for _ in BRONZE_COLUMNS)})
+'''
+
+BRONZE_BATCH_SIZE = 1000
+
+def _bronze_row(listing):
+    # Dicts are keyed by column name; tuples/lists must already be in BRONZE_COLUMNS order
+    if isinstance(listing, dict):
+        return tuple(listing[column] for column in BRONZE_COLUMNS)
+    return tuple(listing)
+
+def insert_bronze_listings(listings, batch_size=BRONZE_BATCH_SIZE):
+    # executemany in one transaction per batch instead of a connect/commit per row.
+    # Called inside the caller's transaction(), the batches join it and the caller commits.
+    nested = get_db_connection().scope_depth > 0
+    started = time.perf_counter()
+    inserted = 0
+    iterator = iter(listings)
+    while True:
+        batch = [_bronze_row(listing) for listing in itertools.islice(iterator, batch_size)]
+        if not batch:
+            break
+        with transaction() as conn:
+            conn.executemany(BRONZE_INSERT_SQL, batch)
+        inserted += len(batch)
+
+    elapsed = time.perf_counter() - started
+    if inserted and not nested:
+        logging.info(f"Inserted {inserted} bronze rows in {elapsed:.2f}s ({inserted / max(elapsed, 1e-9):,.0f} rows/s)")
+    return inserted
+
 def insert_bronze_listing(listing):
+    insert_bronze_listings([listing])
+
+def load_csv_to_bronze(path, batch_size=BRONZE_BATCH_SIZE):
+    # csv_exports/ files are exact bronze snapshots; empty cells go back in as NULL
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = ({column: (row.get(column) or None) for column in BRONZE_COLUMNS} for row in csv.DictReader(f))
+        inserted = insert_bronze_listings(rows, batch_size=batch_size)
+    logging.info(f"Loaded {inserted} rows from {os.path.basename(path)} into bronze_listings.")
+    return inserted
+
+def replace_bronze_for_date(scrape_date, listings):
+    # Swap a whole day of bronze in one transaction (used when re-parsing archived pages)
+    with transaction() as conn:
+        deleted = conn.execute('DELETE FROM bronze_listings WHERE scrape_date = ?', (scrape_date,)).rowcount
+        insert_bronze_listings(listings)
+    logging.info(f"Replaced {deleted} bronze rows for {scrape_date} with {len(listings)} rows.")
+
+def get_bronze_listings(scrape_date):
     conn = get_db_connection()
-    cursor = conn.cursor()
+    rows = conn.execute(
+        f'SELECT {", ".join(BRONZE_COLUMNS)} FROM bronze_listings WHERE scrape_date = ? ORDER BY id',
+        (scrape_date,)
+    ).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
 
-    cursor.execute('''
-        INSERT INTO bronze_listings (
-            building_name, address, city, state, zipcode,
-            unit_name, unit_id, price_raw, beds, baths, sqft,
-            available_move_in_date, total_available_units,
-            listing_url, scrape_date, scrape_timestamp
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        listing['building_name'],
-        listing['address'],
-        listing['city'],
-        listing['state'],
-        listing['zipcode'],
-        listing['unit_name'],
-        listing['unit_id'],
-        listing['price_raw'],
-        listing['beds'],
-        listing['baths'],
-        listing['sqft'],
-        listing['available_move_in_date'],
-        listing['total_available_units'],
-        listing['listing_url'],
-        listing['scrape_date'],
-        listing['scrape_timestamp']
-    ))
+# --------------------
+# Scrape checkpoints
+# --------------------
 
+def create_checkpoint_table():
+    conn = get_db_connection()
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS scrape_checkpoints (
+            scrape_date DATE,
+            listing_url TEXT,
+            unit_count INTEGER,
+            completed_at TEXT,
+            PRIMARY KEY (scrape_date, listing_url)
+        )
+    ''')
     conn.commit()
     conn.close()
+
+def get_completed_urls(scrape_date):
+    conn = get_db_connection()
+    rows = conn.execute('SELECT listing_url FROM scrape_checkpoints WHERE scrape_date = ?', (scrape_date,)).fetchall()
+    conn.close()
+    return {row['listing_url'] for row in rows}
+
+def clear_scrape_date(scrape_date):
+    # Start the day over: its bronze rows go with its checkpoints, in one transaction,
+    # so re-scraping a building can't leave its units in bronze twice
+    with transaction() as conn:
+        conn.execute('DELETE FROM bronze_listings WHERE scrape_date = ?', (scrape_date,))
+        conn.execute('DELETE FROM scrape_checkpoints WHERE scrape_date = ?', (scrape_date,))
+
+def save_building_batch(scrape_date, listing_url, floorplans):
+    # Bronze rows and the checkpoint land in the same transaction, so a crash
+    # either keeps the whole building or none of it.
+    with transaction() as conn:
+        insert_bronze_listings(floorplans)
+        conn.execute(
+            'INSERT OR REPLACE INTO scrape_checkpoints (scrape_date, listing_url, unit_count, completed_at) VALUES (?, ?, ?, ?)',
+            (scrape_date, listing_url, len(floorplans), datetime.now().isoformat())
+        )
+
+# --------------------
+# Unit signatures
+# --------------------
+
+def _signature_part(value):
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)):
+        return f"{float(value):.1f}".rstrip('0').rstrip('.')  # e.g., 2.0 → "2", 2.5 → "2.5"
+    return str(value).strip().lower()
+
+def unit_signature(unit_id, title, unit_name, beds, baths, sqft):
+    # Identifies "the same unit at the same spec" across days; stored in silver_listings.signature
+    return "|".join(_signature_part(v) for v in (unit_id, title, unit_name, beds, baths, sqft))
@@ -0,0 +1,180 @@
+# database/migrations.py
+#
+# Versioned, in-place schema/data migrations. Each migration runs once per database,
+# in order, and is recorded in schema_version. They are written to be safe to re-run,
+# since a long backfill may commit in batches before its version row is written.
+#
+#   python -m database.migrations            # apply anything pending
+#   python -m database.migrations --status
+
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.connection import get_db_connection
+from database.database import unit_signature
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+MIGRATION_BATCH_SIZE = 50_000
+
+
+def _table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def _id_batches(conn, table, batch_size):
+    low, high = conn.execute(f"SELECT MIN(id), MAX(id) FROM {table}").fetchone()
+    if low is None:
+        return
+    for start in range(low, high + 1, batch_size):
+        yield start, start + batch_size - 1
+
+
+# --------------------
+# Migrations
+# --------------------
+
+SILVER_NUMERIC_COLUMNS = ("price", "beds", "baths", "sqft")
+
+
+def typed_silver_columns(conn):
+    # Silver used to round-trip beds/baths/sqft through strings. Column affinity turned
+    # "1.0" and "570" back into numbers, but the '' placeholders for missing values stayed
+    # TEXT. Make every non-numeric value NULL, and re-run gold for the dates that changed.
+    if not _table_exists(conn, "silver_listings"):
+        return
+    has_text = " OR ".join(f"typeof({c}) = 'text'" for c in SILVER_NUMERIC_COLUMNS)
+    retype = ", ".join(f"{c} = CASE WHEN typeof({c}) = 'text' THEN NULL ELSE {c} END" for c in SILVER_NUMERIC_COLUMNS)
+
+    changed = 0
+    for start, end in _id_batches(conn, "silver_listings", MIGRATION_BATCH_SIZE):
+        dates = [row[0] for row in conn.execute(
+            f"SELECT DISTINCT scrape_date FROM silver_listings WHERE id BETWEEN ? AND ? AND ({has_text})", (start, end))]
+        cursor = conn.execute(
+            f"UPDATE silver_listings SET {retype} WHERE id BETWEEN ? AND ? AND ({has_text})", (start, end))
+        changed += cursor.rowcount
+        if dates and _table_exists(conn, "gold_dirty_dates"):
+            now = datetime.now().isoformat()
+            conn.executemany("INSERT OR REPLACE INTO gold_dirty_dates (scrape_date, marked_at) VALUES (?, ?)",
+                             [(date, now) for date in dates])
+        conn.commit()
+    logging.info(f"Retyped {changed} silver rows.")
+
+
+def silver_numeric_indexes(conn):
+    # Range filters on beds/price and sqft within a day
+    if not _table_exists(conn, "silver_listings"):
+        return
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_silver_date_beds_price ON silver_listings(scrape_date, beds, price)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_silver_date_sqft ON silver_listings(scrape_date, sqft)")
+
+
+def unit_signature_column(conn):
+    # Store each row's unit signature so diff and lifespan queries can join on an index
+    if not _table_exists(conn, "silver_listings"):
+        return
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(silver_listings)")]
+    if "signature" not in columns:
+        conn.execute("ALTER TABLE silver_listings ADD COLUMN signature TEXT")
+        conn.commit()
+
+    conn.create_function("unit_signature", 6, unit_signature, deterministic=True)
+    filled = 0
+    for start, end in _id_batches(conn, "silver_listings", MIGRATION_BATCH_SIZE):
+        cursor = conn.execute('''
+            UPDATE silver_listings
+            SET signature = unit_signature(unit_id, title, unit_name, beds, baths, sqft)
+            WHERE id BETWEEN ? AND ? AND signature IS NULL
+        ''', (start, end))
+        filled += cursor.rowcount
+        conn.commit()
+    logging.info(f"Backfilled signatures for {filled} silver rows.")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_silver_signature_date ON silver_listings(signature, scrape_date)")
+
+
+def gold_cube_price_sketch(conn):
+    # Quantile sketches are computed with the rest of a cube row, so re-run gold everywhere
+    if not _table_exists(conn, "gold_cube"):
+        return
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(gold_cube)")]
+    if "price_sketch" not in columns:
+        conn.execute("ALTER TABLE gold_cube ADD COLUMN price_sketch BLOB")
+    if _table_exists(conn, "gold_dirty_dates"):
+        conn.execute("INSERT OR REPLACE INTO gold_dirty_dates (scrape_date, marked_at) "
+                     "SELECT DISTINCT scrape_date, ? FROM silver_listings", (datetime.now().isoformat(),))
+    conn.commit()
+
+
+def silver_listing_sort_indexes(conn):
+    # /api/listings pages walk a day in (column, id) order; with these, every sort key
+    # (sqft already has one) is an index range that stops after one page
+    if not _table_exists(conn, "silver_listings"):
+        return
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_silver_date_price ON silver_listings(scrape_date, price)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_silver_date_beds ON silver_listings(scrape_date, beds)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_silver_date_baths ON silver_listings(scrape_date, baths)")
+
+
+# Append only; never renumber or edit a migration that has shipped
+MIGRATIONS = [
+    (1, "typed_silver_columns", typed_silver_columns),
+    (2, "silver_numeric_indexes", silver_numeric_indexes),
+    (3, "unit_signature_column", unit_signature_column),
+    (4, "gold_cube_price_sketch", gold_cube_price_sketch),
+    (5, "silver_listing_sort_indexes", silver_listing_sort_indexes),
+]
+
+
+# --------------------
+# Runner
+# --------------------
+
+def create_schema_version_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT,
+            applied_at TEXT
+        )
+    ''')
+    conn.commit()
+
+
+def get_schema_version(conn=None):
+    conn = conn or get_db_connection()
+    create_schema_version_table(conn)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def run_migrations():
+    conn = get_db_connection()
+    current = get_schema_version(conn)
+    applied = 0
+    for version, name, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        logging.info(f"Applying migration {version}: {name}")
+        migrate(conn)
+        conn.execute("INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                     (version, name, datetime.now().isoformat()))
+        conn.commit()
+        applied += 1
+    conn.close()
+    return applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--status", action="store_true", help="show the schema version and exit")
+    args = parser.parse_args()
+
+    if args.status:
+        version = get_schema_version()
+        pending = [f"{v}: {name}" for v, name, _ in MIGRATIONS if v > version]
+        print(f"Schema version {version}; pending: {', '.join(pending) or 'none'}")
+    else:
+        print(f"Applied {run_migrations()} migration(s).")
@@ -0,0 +1,139 @@
+# database/sketch.py
+#
+# Mergeable quantile sketch for prices (a DDSketch with unbounded log buckets).
+#
+# Every positive value x lands in bucket k = ceil(log(x) / log(gamma)), with
+# gamma = (1 + a) / (1 - a), and a bucket reports 2 * gamma^k / (gamma + 1).
+# That point is within a relative error of a from every value in the bucket, so:
+#
+#   quantile(q) is within RELATIVE_ACCURACY (1%) of the exact order statistic
+#   sorted(values)[floor(q * (n - 1))], for any q and any mix of merged sketches.
+#
+# Merging is adding bucket counts, so a multi-day or multi-group quantile is the
+# same as if every price had gone into one sketch. Values <= 0 are kept in a
+# separate zero bucket and reported as 0; values in (0, 1] share the lowest bucket.
+# Bucket edges come from one precomputed table, so the NumPy and pure Python paths
+# assign every value to the same bucket.
+#
+# Serialized form (the gold_cube.price_sketch BLOB), all unsigned LEB128 varints:
+#   version, zero_count, bucket count, then per bucket in key order: key gap, count
+
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+from operator import sub
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RELATIVE_ACCURACY = 0.01
+SKETCH_VERSION = 1
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+
+# Bucket k holds (gamma^(k-1), gamma^k]; 2,100 buckets reach past 10^18
+_BUCKET_EDGES = [_GAMMA ** key for key in range(2100)]
+_BUCKET_EDGES_ARRAY = np.array(_BUCKET_EDGES) if np is not None else None
+
+
+def _bucket_value(key):
+    return 2 * _GAMMA ** key / (_GAMMA + 1)
+
+
+def _write_varint(out, value):
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(blob, pos):
+    value = shift = 0
+    while True:
+        byte = blob[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class PriceSketch:
+    def __init__(self):
+        self.buckets = Counter()
+        self.zero_count = 0
+        self.count = 0
+
+    @classmethod
+    def from_values(cls, values):
+        # Build from a NumPy array or a list of numbers in one pass
+        sketch = cls()
+        if np is not None and isinstance(values, np.ndarray):
+            positive = values[values > 0]
+            keys, counts = np.unique(np.searchsorted(_BUCKET_EDGES_ARRAY, positive), return_counts=True)
+            sketch.buckets.update(dict(zip(keys.tolist(), counts.tolist())))
+            sketch.zero_count = len(values) - len(positive)
+        else:
+            sketch.buckets.update(bisect_left(_BUCKET_EDGES, value) for value in values if value > 0)
+            sketch.zero_count = sum(1 for value in values if value <= 0)
+        sketch.count = len(values)
+        return sketch
+
+    def add(self, value, count=1):
+        if value > 0:
+            self.buckets[bisect_left(_BUCKET_EDGES, value)] += count
+        else:
+            self.zero_count += count
+        self.count += count
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return _bucket_value(key)
+        return _bucket_value(max(self.buckets))
+
+    def to_bytes(self):
+        out = bytearray()
+        _write_varint(out, SKETCH_VERSION)
+        _write_varint(out, self.zero_count)
+        _write_varint(out, len(self.buckets))
+        keys = sorted(self.buckets)
+        fields = list(chain.from_iterable(zip(map(sub, keys, [0] + keys[:-1]), map(self.buckets.__getitem__, keys))))
+        # Keys only increase, and gaps and counts nearly always fit in a single byte
+        if not fields or max(fields) < 0x80:
+            out.extend(fields)
+        else:
+            for value in fields:
+                _write_varint(out, value)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, blob):
+        sketch = cls()
+        version, pos = _read_varint(blob, 0)
+        if version != SKETCH_VERSION:
+            raise ValueError(f"Unsupported price sketch version {version}")
+        sketch.zero_count, pos = _read_varint(blob, pos)
+        bucket_count, pos = _read_varint(blob, pos)
+        key = 0
+        for _ in range(bucket_count):
+            gap, pos = _read_varint(blob, pos)
+            key += gap
+            sketch.buckets[key], pos = _read_varint(blob, pos)
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        return sketch
@@ -1,12 +1,7 @@
-import sqlite3
-import os
-
-# --- Setup ---
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_NAME = os.environ.get("DB_PATH", "/app/db_volume/housing_tracker.db")
+from database.connection import get_db_connection
 
 def dedupe_silver():
-    conn = sqlite3.connect(DB_NAME)
+    conn = get_db_connection()
     cursor = conn.cursor()
 
     # Count how many duplicates exist
@@ -1,4 +1,4 @@
-import React from "react";
+import React, { useEffect, useState } from "react";
 import { scaleLinear } from "d3-scale";
 import { interpolateRdYlGn } from "d3-scale-chromatic";
 
@@ -27,27 +27,31 @@ const ZIP_TO_NEIGHBORHOOD = {
   "50111": "Grimes",
 };
 
-// TEMPORARY placeholder data → replace with fetchedData from API
-const placeholderDeltas = {
-  "Downtown": 2.5,
-  "South Side": -1.8,
-  "Sherman Hill": 0,
-  "Beaverdale": -0.5,
-  "SE Des Moines": 3.1,
-  "Ingersoll": -4.2,
-  "Merle Hay": -0.9,
-  "East Village": 0.8,
-  "Drake": 2.9,
-};
-
 const colorScale = scaleLinear()
   .domain([-5, 0, 5]) // map -5% → 0% → +5%
   .range([0, 0.5, 1])
   .clamp(true);
 
-export default function HeroHeatmap({ data = placeholderDeltas }) {
+export default function HeroHeatmap({ data: dataProp }) {
+  const [fetched, setFetched] = useState({});
   const neighborhoods = Object.values(ZIP_TO_NEIGHBORHOOD);
 
+  useEffect(() => {
+    if (dataProp) return;
+    fetch("/api/neighborhood-deltas")
+      .then((res) => res.json())
+      .then((json) => {
+        const deltas = {};
+        (json.deltas || []).forEach((d) => {
+          if (d.delta_pct !== null) deltas[d.neighborhood] = d.delta_pct;
+        });
+        setFetched(deltas);
+      })
+      .catch((err) => console.error("Error loading neighborhood deltas:", err));
+  }, [dataProp]);
+
+  const data = dataProp ?? fetched;
+
   return (
     <div className="grid grid-cols-2 sm:grid-cols-3 md:grid-cols-4 lg:grid-cols-5 gap-1 p-2">
       {neighborhoods.map((name, idx) => {
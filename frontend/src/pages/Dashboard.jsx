@@ -6,12 +6,26 @@ import UnitMixPieChart from "../components/UnitMixPieChart";
 import PriceDistributionChart from "../components/PriceDistributionChart";
 export default function Dashboard() {
   const [summary, setSummary] = useState(null);
+  const [movers, setMovers] = useState([]);
+  const [moversError, setMoversError] = useState(false);
+  const [error, setError] = useState(false);
 
   useEffect(() => {
-    fetch("/api/summary-stats")
-      .then((res) => res.json())
-      .then((data) => setSummary(data))
-      .catch((err) => console.error("API error:", err));
+    // Snapshot card and top 3 price drops in one request
+    fetch("/api/bundle?views=summary-stats,movers&limit=3")
+      .then((res) => {
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        return res.json();
+      })
+      .then((data) => {
+        setSummary(data["summary-stats"]);
+        setMovers(Array.isArray(data.movers) ? data.movers : []);
+        setMoversError(!Array.isArray(data.movers));
+      })
+      .catch((err) => {
+        console.error("API error:", err);
+        setError(true);
+      });
   }, []);
 
 return (
@@ -53,9 +67,11 @@ return (
         {/* Movers Card */}
         <div className=" w-full lg:w-1/2 bg-white rounded-lg shadow p-4 text-sm max-h-[220px] overflow-y-auto">
           <h3 className="text-lg font-semibold mb-3">Top Price Drops</h3>
-          <MoversTodayTable date={summary.scrape_date} />
+          <MoversTodayTable movers={movers} error={moversError} />
         </div>
       </div>
+    ) : error ? (
+      <p className="text-sm text-zinc-500">Couldn’t load today’s snapshot.</p>
     ) : (
       <p>Loading summary stats...</p>
     )}
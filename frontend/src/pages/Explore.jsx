@@ -1,8 +1,28 @@
 import { useState, useEffect, useMemo, useRef } from "react";
 import { saveAs } from "file-saver";
 
+const LISTINGS_PER_PAGE = 25;
+const CSV_PAGE_SIZE = 500;
+
+// Filtering, sorting and paging all happen in /api/listings; each page continues
+// from the cursor the previous one returned
+function listingsUrl(filters, cursor, limit) {
+  const params = new URLSearchParams({ date: filters.date, limit });
+  if (filters.searchTerm) {
+    params.set("field", filters.searchField);
+    params.set("q", filters.searchTerm);
+  }
+  if (filters.showOnlyNew) params.set("new", "1");
+  if (filters.showOnlyMovers) params.set("movers", "1");
+  if (filters.sortKey) {
+    params.set("sort", filters.sortKey);
+    params.set("order", filters.sortDirection);
+  }
+  if (cursor) params.set("cursor", cursor);
+  return `/api/listings?${params}`;
+}
+
 export default function Explore() {
-  const [listings, setListings] = useState([]);
   const [dates, setDates] = useState([]);
   const [selectedDate, setSelectedDate] = useState("");
   const [searchInput, setSearchInput] = useState("");
@@ -12,33 +32,10 @@ export default function Explore() {
   const [showOnlyNew, setShowOnlyNew] = useState(false);
   const [showOnlyMovers, setShowOnlyMovers] = useState(false);
   const [isLoading, setIsLoading] = useState(false);
-
-  const [priceChanges, setPriceChanges] = useState({
-    changes: {},
-    latest_date: "",
-    previous_date: ""
-  });
   const [sortConfig, setSortConfig] = useState({ key: null, direction: null });
 
-  const generateSignature = (listing) => {
-  const normalize = (val) => {
-    if (val == null) return "";
-    if (typeof val === "number") {
-      return val % 1 === 0 ? String(val) : val.toFixed(1).replace(/\.0$/, "");
-    }
-    return val.toString().trim().toLowerCase();
-  };
-
-
-  return [
-    normalize(listing.unit_id),
-    normalize(listing.title),
-    normalize(listing.unit_name),
-    normalize(listing.beds),
-    normalize(listing.baths),
-    normalize(listing.sqft)
-  ].join("|");
-};
+  const [page, setPage] = useState({ listings: [], next_cursor: null });
+  const [totalListings, setTotalListings] = useState(0);
 
   const handleSort = (key) => {
     setSortConfig(prev => {
@@ -68,32 +65,51 @@ export default function Explore() {
       .catch(err => console.error("Error fetching scrape dates:", err));
   }, []);
 
+  const filters = useMemo(() => ({
+    date: selectedDate,
+    searchField,
+    searchTerm,
+    showOnlyNew,
+    showOnlyMovers,
+    sortKey: sortConfig.key,
+    sortDirection: sortConfig.direction
+  }), [selectedDate, searchField, searchTerm, showOnlyNew, showOnlyMovers, sortConfig]);
+
+  // Cursors of the pages visited so far; any input/filter/sort/scrapeDate change starts again at Page 1
+  const [paging, setPaging] = useState({ filters, cursors: [null] });
+  const cursors = paging.filters === filters ? paging.cursors : [null];
+  const currentPage = cursors.length;
+  const cursor = cursors[cursors.length - 1];
+
   useEffect(() => {
-    if (!selectedDate) return;
+    if (!filters.date) return;
+    let ignore = false;
 
-    fetch(`/api/silver-by-date/${selectedDate}`)
+    fetch(listingsUrl(filters, cursor, LISTINGS_PER_PAGE))
       .then(res => res.json())
       .then(data => {
-  const filtered = data.filter(d => d.price != null);
-  setListings(filtered);
-})
-
+        if (ignore) return;
+        setPage(data);
+        if (data.total != null) setTotalListings(data.total);
+      })
       .catch(err => console.error("Error loading listings:", err));
 
-    fetch(`/api/silver-changes?date=${selectedDate}`)
-      .then(res => res.json())
-      .then(data => {
-        setPriceChanges(data);
-        
-      })
-      .catch(err => console.error("Error fetching price changes:", err));
-  }, [selectedDate]);
+    return () => { ignore = true; };
+  }, [filters, cursor]);
 
-  
+  const goToNextPage = () => {
+    if (page.next_cursor) setPaging({ filters, cursors: [...cursors, page.next_cursor] });
+  };
 
+  const goToPreviousPage = () => {
+    if (cursors.length > 1) setPaging({ filters, cursors: cursors.slice(0, -1) });
+  };
 
+  const totalPages = Math.ceil(totalListings / LISTINGS_PER_PAGE);
 
-  const downloadCSV = () => {
+
+
+  const downloadCSV = async () => {
   const headers = [
     "Building",
     "Unit Type",
@@ -107,46 +123,26 @@ export default function Explore() {
     "Listing URL"
   ];
 
-  const rows = listings
-    .filter(listing => {
-      const val = listing[searchField];
-      if (val == null) return false;
-
-      const fieldVal = typeof val === "number" ? String(val) : val.toString().toLowerCase();
-
-
-      if (!fieldVal.includes(searchTerm)) return false;
-
-  const signature = generateSignature(listing);
-  const changeData = priceChanges?.changes?.[signature];
-
-  if (showOnlyNew && changeData?.change !== "new") return false;
-
-  if (showOnlyMovers && changeData?.change !== "changed") return false;
-
-  
-
-  return true;
-    })
-    .sort((a, b) => {
-      if (showOnlyMovers) {
-    const getDelta = (listing) => {
-      const sig = generateSignature(listing);
-      const data = priceChanges?.changes?.[sig];
-      return data?.delta ?? 0;
-    };
-    return getDelta(a) - getDelta(b); // Drops first (negative)
+  // Movers export biggest drops first
+  const csvFilters = showOnlyMovers && !filters.sortKey
+    ? { ...filters, sortKey: "delta", sortDirection: "asc" }
+    : filters;
+
+  const listings = [];
+  let nextCursor = null;
+  try {
+    do {
+      const res = await fetch(listingsUrl(csvFilters, nextCursor, CSV_PAGE_SIZE));
+      const data = await res.json();
+      listings.push(...data.listings);
+      nextCursor = data.next_cursor;
+    } while (nextCursor);
+  } catch (err) {
+    console.error("Error exporting listings:", err);
+    return;
   }
 
-  const { key, direction } = sortConfig;
-  if (!key || direction === null) return 0;
-
-  const aVal = a[key] ?? 0;
-  const bVal = b[key] ?? 0;
-  return direction === "asc" ? aVal - bVal : bVal - aVal;
-
-    })
-    .map(l => [
+  const rows = listings.map(l => [
       l.title,
       l.unit_name,
       l.unit_id,
@@ -168,82 +164,28 @@ export default function Explore() {
   saveAs(blob, fileName);
 };
 
-const filteredListings = useMemo(() => {
-  return listings
-    .filter(listing => {
-      const val = listing[searchField];
-      if (val == null) return false;
-
-      const fieldVal = typeof val === "number" ? String(val) : val.toString().toLowerCase();
-      if (!fieldVal.includes(searchTerm)) return false;
-
-      const signature = generateSignature(listing);
-      const changeData = priceChanges?.changes?.[signature];
-
-      if (showOnlyNew && changeData?.change !== "new") return false;
-      if (showOnlyMovers && changeData?.change !== "changed") return false;
-
-      return true;
-    })
-    .sort((a, b) => {
-      const { key, direction } = sortConfig;
-      if (!key || direction === null) return 0;
-
-      const aVal = a[key] ?? 0;
-      const bVal = b[key] ?? 0;
-
-      return direction === "asc" ? aVal - bVal : bVal - aVal;
-    });
-}, [listings, searchField, searchTerm, sortConfig, showOnlyNew, showOnlyMovers, priceChanges]);
-
-const [currentPage, setCurrentPage] = useState(1);
-const listingsPerPage = 25;
-
-const paginatedListings = useMemo(() => {
-  const start = (currentPage - 1) * listingsPerPage;
-  return filteredListings.slice(start, start + listingsPerPage);
-}, [filteredListings, currentPage]);
-
-const totalPages = Math.ceil(filteredListings.length / listingsPerPage);
-
-
-
-const priceBadges = useMemo(() => {
-  const map = new Map();
-
-  filteredListings.forEach(listing => {
-    const signature = generateSignature(listing);
-    const changeData = priceChanges?.changes?.[signature];
-
-    if (!changeData) return;
-
-    let badge = null;
-
-    if (changeData.change === "new") {
-      badge = (
+const priceBadge = (listing) => {
+  if (listing.change === "new") {
+    return (
   <span className="ml-2 inline-block min-w-[2rem] text-xs text-center text-blue-700 bg-blue-100 rounded px-2 py-0.5">
     New
   </span>
 );
+  }
+  if (listing.change === "changed") {
+    const delta = listing.delta;
+    const isDrop = delta < 0;
+    const color = isDrop ? "text-green-700 bg-green-100" : "text-red-700 bg-red-100";
 
-    } else if (changeData.change === "changed") {
-      const delta = changeData.delta;
-      const isDrop = delta < 0;
-      const color = isDrop ? "text-green-700 bg-green-100" : "text-red-700 bg-red-100";
-
-      badge = (
+    return (
         <span className={`ml-2 inline-block min-w-[2rem] text-xs ${color} rounded px-2 py-0.5 text-center`}>
   {isDrop ? "↓" : "↑"} ${Math.abs(delta)}
 </span>
 
       );
-    }
-
-    map.set(signature, badge);
-  });
-
-  return map;
-}, [filteredListings, priceChanges]);
+  }
+  return null;
+};
 
 useEffect(() => {
   const startDelay = setTimeout(() => {
@@ -255,12 +197,7 @@ useEffect(() => {
   }, 1); // debounce the shimmer start just a touch
 
   return () => clearTimeout(startDelay);
-}, [filteredListings]);
-
-// Reset to Page 1 on any input/filter/sort/scrapeDate change
-useEffect(() => {
-  setCurrentPage(1);
-}, [searchTerm, searchField, showOnlyNew, showOnlyMovers, sortConfig, selectedDate]);
+}, [page]);
 
 
   return (
@@ -343,7 +280,7 @@ useEffect(() => {
       </select>
       <input
         type="text"
-        placeholder={`Search ${filteredListings.length.toLocaleString()} active listings...`}
+        placeholder={`Search ${totalListings.toLocaleString()} active listings...`}
         value={searchInput}
         onChange={(e) => setSearchInput(e.target.value)}
         className="border rounded px-2 py-1 text-sm w-full sm:w-64 bg-zinc-50 hover:bg-zinc-200 transition cursor-text placeholder:text-zinc-400"
@@ -385,14 +322,14 @@ useEffect(() => {
 
 
           <tbody>
-              {paginatedListings.map(listing => {
+              {page.listings.map(listing => {
 
 
 
                 
 
                 return (
-                  <tr key={listing.unit_id + listing.scrape_date} className="border-t hover:bg-zinc-100">
+                  <tr key={listing.id} className="border-t hover:bg-zinc-100">
   <td className="w-[14rem] px-4 py-3 truncate text-sm text-zinc-700 text-left">
     <a href={listing.listing_url} target="_blank" rel="noopener noreferrer" className="text-blue-600 hover:underline">
       {listing.title}
@@ -402,9 +339,9 @@ useEffect(() => {
   <td className="w-[8rem] px-4 py-3 truncate text-sm text-zinc-700 text-center">{listing.unit_id}</td>
   <td className="w-[7rem] px-4 py-3 text-sm text-zinc-700 text-center relative">
   <span className="block">${listing.price}</span>
-  {priceBadges.get(generateSignature(listing)) && (
+  {listing.change && (
     <span className="absolute top-1/2 -translate-y-1/2 right-1">
-      {priceBadges.get(generateSignature(listing))}
+      {priceBadge(listing)}
     </span>
   )}
 </td>
@@ -442,7 +379,7 @@ useEffect(() => {
 {totalPages > 1 && (
   <div className="sticky bottom-0 left-0 right-0 bg-white/90 backdrop-blur border-t-1 border-black-200 px-6 py-3 flex justify-between items-center shadow-md z-20">
     <button
-      onClick={() => setCurrentPage((p) => Math.max(p - 1, 1))}
+      onClick={goToPreviousPage}
       disabled={currentPage === 1}
       className="px-4 py-2 border rounded text-sm font-medium hover:bg-zinc-200 transition disabled:opacity-40 disabled:cursor-not-allowed cursor-pointer"
     >
@@ -454,8 +391,8 @@ useEffect(() => {
     </span>
 
     <button
-      onClick={() => setCurrentPage((p) => Math.min(p + 1, totalPages))}
-      disabled={currentPage === totalPages}
+      onClick={goToNextPage}
+      disabled={!page.next_cursor}
       className="px-4 py-2 border rounded text-sm font-medium hover:bg-zinc-200 transition disabled:opacity-40 disabled:cursor-not-allowed cursor-pointer"
     >
       Next →
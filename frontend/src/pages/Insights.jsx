@@ -9,21 +9,16 @@ export default function Insights() {
   const [maxPriceDrop, setMaxPriceDrop] = useState(null);
 
   useEffect(() => {
-    fetch("/api/avg-volatility")
+    // All four nuggets in one request
+    fetch("/api/bundle?views=avg-volatility,fastest-market,median-lifespan,max-price-drop")
       .then(res => res.json())
-      .then(data => setAvgVolatility(data.avg_volatility?.toFixed(1)));
-
-    fetch("/api/fastest-market")
-      .then(res => res.json())
-      .then(data => setFastestMarket(data.neighborhood));
-
-    fetch("/api/median-lifespan")
-      .then(res => res.json())
-      .then(data => setMedianLifespan(data.median_days?.toFixed(1)));
-
-    fetch("/api/max-price-drop")
-      .then(res => res.json())
-      .then(data => setMaxPriceDrop(data.max_drop));
+      .then(data => {
+        setAvgVolatility(data["avg-volatility"].avg_volatility?.toFixed(1));
+        setFastestMarket(data["fastest-market"].neighborhood);
+        setMedianLifespan(data["median-lifespan"].median_days?.toFixed(1));
+        setMaxPriceDrop(data["max-price-drop"].max_drop);
+      })
+      .catch(err => console.error("Insights fetch error:", err));
   }, []);
 
 
@@ -0,0 +1,37 @@
+# gunicorn.conf.py
+#
+# Production server for the API, picked up from the working directory by the
+# dockerfile's CMD. Every setting can be overridden from the environment:
+#   PORT               port to listen on (8080)
+#   WEB_CONCURRENCY    worker processes (2)
+#   GUNICORN_THREADS   threads per worker (4)
+#   GUNICORN_TIMEOUT   seconds before a stuck worker is replaced (60)
+#   LOG_LEVEL          debug / info / warning / error (info)
+#   ACCESS_LOG=1       log every request to stdout
+#   WARM_UP=0          skip the warm-up requests at worker start
+#
+#   gunicorn "app.app:create_app()"      # locally, from the repo root
+
+import os
+import sys
+import logging
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+accesslog = "-" if os.environ.get("ACCESS_LOG") == "1" else None
+
+# Workers load the app themselves, so no SQLite connection is ever opened before the fork
+preload_app = False
+
+logging.basicConfig(level=loglevel.upper(), format='[%(levelname)s] %(message)s')
+
+
+def post_worker_init(worker):
+    # worker.wsgi is the Flask app; warm_up() lives in its module (app.py in the image, app.app locally)
+    if os.environ.get("WARM_UP", "1") != "0":
+        sys.modules[worker.wsgi.import_name].warm_up(worker.wsgi)
@@ -1,43 +1,25 @@
 # meta_tracker.py
 
-import sqlite3
-import os
 from datetime import datetime
-
-
-# Dynamic DB path for Fly or local
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_NAME = "housing_tracker.db"
+from database.connection import DB_PATH, get_db_connection, transaction
 
 print("meta_tracker is using this DB path:")
-print(DB_NAME)
-
-
-def get_db_connection():
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
+print(DB_PATH)
 
 def create_meta_table():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS meta (
-            id INTEGER PRIMARY KEY CHECK (id = 1),
-            last_updated TEXT
-        )
-    ''')
-    cursor.execute('INSERT OR IGNORE INTO meta (id, last_updated) VALUES (1, NULL)')
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_updated TEXT
+            )
+        ''')
+        conn.execute('INSERT OR IGNORE INTO meta (id, last_updated) VALUES (1, NULL)')
 
 def update_last_updated():
     now = datetime.now().isoformat()
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('UPDATE meta SET last_updated = ? WHERE id = 1', (now,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute('UPDATE meta SET last_updated = ? WHERE id = 1', (now,))
 
 def get_last_updated():
     conn = get_db_connection()
@@ -0,0 +1,141 @@
+# publish.py
+#
+# Render every read-only API response once at the end of a pipeline run and write it
+# as .json, .json.gz and (with the brotli package) .json.br under snapshot_dir().
+# The API serves these files directly while manifest.json's last_updated matches
+# meta.last_updated, and falls back to live queries for anything else.
+#   python publish.py
+#   python publish.py --out /tmp/snapshots
+
+import os
+import sys
+import gzip
+import json
+import time
+import argparse
+from datetime import datetime
+from urllib.parse import urlencode
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from database.connection import get_read_connection, snapshot_dir
+from app.app import create_app
+
+# Endpoints without parameters, rendered as their no-argument (default) variant
+SNAPSHOT_PATHS = [
+    "/api/gold-metrics", "/api/silver-latest", "/api/last-updated", "/api/summary-stats",
+    "/api/todays-prices", "/api/scrape-dates", "/api/zip-counts", "/api/neighborhood-counts",
+    "/api/gold-metrics-unit-types", "/api/neighborhood-deltas", "/api/price-quantiles",
+    "/api/volatility-by-neighborhood", "/api/avg-volatility", "/api/fastest-market",
+    "/api/median-lifespan", "/api/max-price-drop", "/api/movers",
+]
+
+# The /api/bundle requests the pages make on load
+SNAPSHOT_BUNDLES = {
+    "dashboard": {"views": "summary-stats,movers", "limit": 3},
+    "insights": {"views": "avg-volatility,fastest-market,median-lifespan,max-price-drop"},
+}
+
+
+def snapshot_requests(conn):
+    # (API path, query args, file name) for everything that gets published
+    for path in SNAPSHOT_PATHS:
+        yield path, {}, path[len("/api/"):] + ".json"
+    for name, args in SNAPSHOT_BUNDLES.items():
+        yield "/api/bundle", args, f"bundle/{name}.json"
+    dates = [row["scrape_date"] for row in
+             conn.execute("SELECT DISTINCT scrape_date FROM silver_listings ORDER BY scrape_date")]
+    for i, date in enumerate(dates):
+        yield f"/api/silver-by-date/{date}", {}, f"silver-by-date/{date}.json"
+        if i > 0:  # the first day has nothing to compare against
+            yield "/api/silver-changes", {"date": date}, f"silver-changes/{date}.json"
+        yield "/api/movers", {"date": date, "limit": 3}, f"movers/{date}.json"
+        yield "/api/listings", {"date": date, "limit": 25}, f"listings/{date}.json"  # Explore's first page
+
+
+def snapshot_key(path, args):
+    # Must match snapshot_key() in app.py: the path plus its sorted query string
+    return path + ("?" + urlencode(sorted((k, str(v)) for k, v in args.items())) if args else "")
+
+
+def _write(path, data):
+    # Write beside the target and swap it in, so the API never reads a half-written file
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_snapshot(base, data):
+    # Unchanged bodies keep their files (and so their ETags)
+    try:
+        with open(base, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    _write(base + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write(base + ".br", brotli.compress(data, quality=11))
+    elif os.path.exists(base + ".br"):
+        os.remove(base + ".br")  # never leave an older body behind under another encoding
+    _write(base, data)
+    return True
+
+
+def publish_snapshots(out_dir=None):
+    out_dir = out_dir or snapshot_dir()
+    started = time.perf_counter()
+    conn = get_read_connection()
+    row = conn.execute("SELECT last_updated FROM meta WHERE id = 1").fetchone()
+    last_updated = row["last_updated"] if row else None
+    requests = list(snapshot_requests(conn))
+    conn.close()
+
+    app = create_app()
+    app.config["SERVE_SNAPSHOTS"] = False  # render from the database, never from old files
+    client = app.test_client()
+
+    files, written, total_bytes = {}, 0, 0
+    for path, args, name in requests:
+        response = client.get(path, query_string=args)
+        if response.status_code != 200:
+            print(f"[WARNING] Skipping snapshot of {path} {args}: HTTP {response.status_code}")
+            continue
+        data = response.get_data()
+        written += _write_snapshot(os.path.join(out_dir, name), data)
+        total_bytes += len(data)
+        files[snapshot_key(path, args)] = name
+
+    # Drop files for dates that no longer exist
+    published = {os.path.normpath(os.path.join(out_dir, name)) for name in files.values()}
+    for root, _, names in os.walk(out_dir):
+        for name in names:
+            path = os.path.normpath(os.path.join(root, name))
+            base = path[:-3] if path.endswith((".gz", ".br")) else path
+            if base.endswith(".json") and base not in published and name != "manifest.json":
+                os.remove(path)
+
+    # The manifest goes last: until it names the new last_updated, the API ignores the files
+    manifest = {
+        "last_updated": last_updated,
+        "generated_at": datetime.now().isoformat(),
+        "encodings": ["gzip"] + (["br"] if brotli is not None else []),
+        "files": files,
+    }
+    _write(os.path.join(out_dir, "manifest.json"), json.dumps(manifest, indent=2).encode())
+    print(f"[INFO] Published {len(files)} snapshots ({written} changed, {total_bytes / 1e6:.1f} MB uncompressed)"
+          f" to {out_dir} in {time.perf_counter() - started:.1f}s.")
+    return len(files)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render the API's responses to static, pre-compressed files.")
+    parser.add_argument("--out", help="snapshot directory (default: snapshots/ beside the database, or $SNAPSHOT_DIR)")
+    args = parser.parse_args()
+    publish_snapshots(args.out)
@@ -0,0 +1,123 @@
+# rebuild.py
+#
+# Backfill or rebuild the database from history instead of today's scrape. With --csv,
+# scraped_<date>.csv files are parsed in a process pool and replace their dates in
+# bronze; then every bronze date (or a --from/--to range) is promoted to silver
+# in one pass, and gold is recomputed once at the end. Re-running is safe: each day
+# replaces its own bronze and silver rows.
+#   python rebuild.py                                         # re-promote every bronze date (e.g. after a normalizer fix)
+#   python rebuild.py --from 2025-05-03 --to 2025-05-05       # just these dates
+#   python rebuild.py --csv                                   # load csv_exports/ into a fresh volume
+#   DB_PATH=/data/housing_tracker.db python rebuild.py --csv backfill/*.csv --workers 8
+
+import os
+import sys
+import csv
+import glob
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from database.connection import get_db_connection, transaction, checkpoint_wal
+from database.database import BRONZE_COLUMNS, create_bronze_table, insert_bronze_listings
+from cleaner import cleaner
+from meta_tracker import create_meta_table, update_last_updated
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+CSV_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "csv_exports")
+
+
+def _in_range(scrape_date, start, end):
+    return (start is None or scrape_date >= start) and (end is None or scrape_date <= end)
+
+
+def _parse_csv(args):
+    # Runs in a worker: {scrape_date: [bronze row tuples]} for one file, empty cells as NULL
+    path, start, end = args
+    days = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            scrape_date = row.get("scrape_date")
+            if scrape_date and _in_range(scrape_date, start, end):
+                days.setdefault(scrape_date, []).append(tuple(row.get(column) or None for column in BRONZE_COLUMNS))
+    return path, days
+
+
+def load_csvs(paths, start=None, end=None, workers=None):
+    # A date's existing bronze is dropped the first time the date shows up, so re-running
+    # replaces rather than duplicates, and a date spread over several files keeps every row.
+    # Each file is committed as it arrives while the pool keeps parsing the next ones.
+    started = time.time()
+    cleared, rows = set(), 0
+    jobs = [(path, start, end) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, (path, days) in enumerate(pool.map(_parse_csv, jobs), 1):
+            with transaction() as conn:
+                for scrape_date, day_rows in days.items():
+                    if scrape_date not in cleared:
+                        conn.execute('DELETE FROM bronze_listings WHERE scrape_date = ?', (scrape_date,))
+                        cleared.add(scrape_date)
+                    rows += insert_bronze_listings(day_rows, batch_size=10_000)
+            elapsed = time.time() - started
+            logging.info(f"[{i}/{len(jobs)}] Loaded {os.path.basename(path)}"
+                         f" ({rows:,} rows so far, {rows / max(elapsed, 1e-9):,.0f} rows/s).")
+    logging.info(f"Loaded {rows:,} bronze rows for {len(cleared)} dates in {time.time() - started:.1f}s.")
+    return sorted(cleared)
+
+
+def bronze_dates(start=None, end=None):
+    conn = get_db_connection()
+    dates = [row["scrape_date"] for row in
+             conn.execute("SELECT DISTINCT scrape_date FROM bronze_listings ORDER BY scrape_date")]
+    conn.close()
+    return [scrape_date for scrape_date in dates if _in_range(scrape_date, start, end)]
+
+
+def csv_paths(patterns):
+    # scraped_<date>.csv names sort by date
+    return sorted({path for pattern in patterns for path in glob.glob(pattern)}, key=os.path.basename)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill bronze from CSV exports and re-promote silver and gold.")
+    parser.add_argument("--csv", nargs="*", metavar="PATH",
+                        help="load these scraped_<date>.csv files into bronze first (default: csv_exports/*.csv)")
+    parser.add_argument("--from", dest="start", metavar="YYYY-MM-DD", help="first scrape date to rebuild")
+    parser.add_argument("--to", dest="end", metavar="YYYY-MM-DD", help="last scrape date to rebuild")
+    parser.add_argument("--workers", type=int, default=None, help="CSV parser processes (default: CPU count)")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="recompute gold for every silver date (the default without --from/--to)")
+    parser.add_argument("--no-publish", action="store_true", help="skip publishing the API snapshots")
+    args = parser.parse_args()
+
+    started = time.time()
+    create_bronze_table()
+    if args.csv is not None:
+        paths = csv_paths(args.csv or [os.path.join(CSV_DIR, "scraped_*.csv")])
+        if not paths:
+            sys.exit("No CSV files to load.")
+        load_csvs(paths, args.start, args.end, args.workers)
+
+    dates = bronze_dates(args.start, args.end)
+    if not dates:
+        sys.exit("No bronze dates in range to promote.")
+    logging.info(f"Promoting {len(dates)} dates ({dates[0]} to {dates[-1]}) to silver.")
+    promoted = cleaner.promote_bronze_dates(dates)
+
+    # Only the promoted dates are dirty, but a whole-history rebuild recomputes everything in one read
+    full_rebuild = args.full_rebuild or (args.start is None and args.end is None)
+    cleaner.promote_silver_to_gold(full_rebuild=full_rebuild)
+    create_meta_table()
+    update_last_updated()
+
+    if not args.no_publish:
+        from publish import publish_snapshots
+        try:
+            publish_snapshots()
+        except Exception as e:
+            logging.warning(f"Snapshot publish failed, the API will answer live: {e}")
+    checkpoint_wal()
+    logging.info(f"Rebuilt {len(dates)} dates ({promoted:,} silver rows) in {time.time() - started:.1f}s.")
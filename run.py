@@ -4,15 +4,52 @@ from scraper import scraper
 from cleaner import cleaner
 from datetime import datetime
 from meta_tracker import create_meta_table, update_last_updated
+from publish import publish_snapshots
+from database.connection import checkpoint_wal
+from database.database import (
+    create_bronze_table, create_checkpoint_table, get_completed_urls,
+    clear_scrape_date, save_building_batch, get_bronze_listings
+)
+import argparse
 import os
+import sys
+
+# Task Scheduler redirects stdout to log.txt in the console code page; don't let an emoji kill the run
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(errors="replace")
+
+parser = argparse.ArgumentParser(description="Scrape, clean and promote today's listings.")
+parser.add_argument("--workers", type=int, default=scraper.SCRAPER_WORKERS,
+                    help="number of parallel browser sessions (default: $SCRAPER_WORKERS or 1)")
+parser.add_argument("--fresh", action="store_true",
+                    help="discard today's bronze rows and checkpoints and re-scrape every building")
+parser.add_argument("--full-rebuild", action="store_true",
+                    help="recompute gold for every silver date instead of only changed ones")
+args = parser.parse_args()
 
 print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting housing scrape job...\n")
 
-listings, building_count = scraper.fetch_listings()
+scrape_date = datetime.now().date().isoformat()
+create_bronze_table()
+create_checkpoint_table()
+if args.fresh:
+    clear_scrape_date(scrape_date)
+
+# Each building is committed to bronze with its checkpoint as soon as it is scraped,
+# so a crash only loses the buildings in flight and a rerun picks up where it left off.
+done_urls = get_completed_urls(scrape_date)
+if done_urls:
+    print(f"[INFO] Resuming {scrape_date}: {len(done_urls)} buildings already in bronze.")
+
+building_count = len(done_urls)
+for listing_url, floorplans in scraper.iter_building_batches(workers=args.workers, skip_urls=done_urls, scrape_date=scrape_date):
+    save_building_batch(scrape_date, listing_url, floorplans)
+    building_count += 1
+
+listings = get_bronze_listings(scrape_date)
 
 expected = 200
-actual = len(listings)
-if actual < expected:
+if building_count < expected:
     print(f"[WARNING] Only scraped {building_count} of {expected} buildings.")
 else:
     print(f"[INFO] Scraped full {expected} buildings successfully.")
@@ -22,16 +59,24 @@ if listings:
     # 👇 Ensure the CSV folder exists
     os.makedirs(os.path.join(os.path.dirname(__file__), "csv_exports"), exist_ok=True)
 
-    # 👇 Save the CSV export
+    # 👇 Save the CSV export (rebuilt from bronze so resumed runs export the whole day)
     scraper.save_listings_to_csv(listings)
 
     # 👇 Continue with normal pipeline
-    scraper.save_listings_to_db(listings)
     cleaner.promote_bronze_to_silver()
-    cleaner.promote_silver_to_gold()
+    cleaner.promote_silver_to_gold(full_rebuild=args.full_rebuild)
     create_meta_table()
     update_last_updated()
 
+    # Pre-render the API for this data version; the app ignores the files if this fails
+    try:
+        publish_snapshots()
+    except Exception as e:
+        print(f"[WARNING] Snapshot publish failed, the API will answer live: {e}")
+
+    # scheduledscrape.bat uploads the .db file without its -wal, so nothing may be left in the WAL
+    checkpoint_wal()
+
     print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ✅ Job complete.\n")
 else:
     print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ❌ No listings fetched — skipping clean + promote.\n")
@@ -12,6 +12,14 @@ fly ssh console -a redwing --command "rm /app/db_volume/housing_tracker.db"
     echo put housing_tracker.db /app/db_volume/housing_tracker.db
 ) | fly ssh sftp shell -a redwing
 
+:: 3b Upload the pre-rendered API snapshots (publish.py) as one archive and unpack it beside the DB
+tar -cf snapshots.tar snapshots
+(
+    echo put snapshots.tar /app/db_volume/snapshots.tar
+) | fly ssh sftp shell -a redwing
+fly ssh console -a redwing --command "sh -c 'rm -rf /app/db_volume/snapshots && tar -xf /app/db_volume/snapshots.tar -C /app/db_volume && rm /app/db_volume/snapshots.tar'"
+del snapshots.tar
+
 :: 4️⃣ Restart web app
 fly machine restart d890122ae99418 -a redwing
 
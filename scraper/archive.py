@@ -0,0 +1,94 @@
+# scraper/archive.py
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+# zstd when available (smaller and much faster), gzip otherwise
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_DIR = os.environ.get("HTML_ARCHIVE_PATH", os.path.join(BASE_DIR, "../html_archive"))
+ARCHIVE_ENABLED = os.environ.get("HTML_ARCHIVE", "1") != "0"
+
+# Layout:
+#   html_archive/objects/ab/<sha256>.html.zst   page bodies, content-addressed and shared across days
+#   html_archive/<scrape_date>/manifest.jsonl   one line per fetched page: kind, url, sha256, codec, fetched_at
+
+_manifest_lock = threading.Lock()
+
+
+def _object_path(sha256, codec):
+    return os.path.join(ARCHIVE_DIR, "objects", sha256[:2], f"{sha256}.html.{codec}")
+
+
+def _manifest_path(scrape_date):
+    return os.path.join(ARCHIVE_DIR, str(scrape_date), "manifest.jsonl")
+
+
+def archive_page(kind, url, html, scrape_date=None, page=None):
+    if not ARCHIVE_ENABLED or not html:
+        return None
+
+    fetched_at = datetime.now()
+    scrape_date = scrape_date or fetched_at.date()
+    body = html.encode('utf-8')
+    sha256 = hashlib.sha256(body).hexdigest()
+    codec = "zst" if zstandard else "gz"
+
+    path = _object_path(sha256, codec)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zstandard.ZstdCompressor(level=10).compress(body) if codec == "zst" else gzip.compress(body, 6)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+
+    entry = {
+        "kind": kind,
+        "url": url,
+        "page": page,
+        "sha256": sha256,
+        "codec": codec,
+        "fetched_at": fetched_at.isoformat(),
+    }
+    manifest = _manifest_path(scrape_date)
+    with _manifest_lock:
+        os.makedirs(os.path.dirname(manifest), exist_ok=True)
+        with open(manifest, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+    return sha256
+
+
+def read_manifest(scrape_date, kind=None):
+    path = _manifest_path(scrape_date)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return [e for e in entries if kind is None or e["kind"] == kind]
+
+
+def read_page(entry):
+    with open(_object_path(entry["sha256"], entry["codec"]), 'rb') as f:
+        compressed = f.read()
+    if entry["codec"] == "zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst archive objects")
+        body = zstandard.ZstdDecompressor().decompress(compressed)
+    else:
+        body = gzip.decompress(compressed)
+    return body.decode('utf-8')
+
+
+def archived_dates():
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    return sorted(d for d in os.listdir(ARCHIVE_DIR) if os.path.exists(_manifest_path(d)))
@@ -0,0 +1,200 @@
+# scraper/page.py
+
+import os
+import re
+import logging
+from datetime import datetime
+from bs4 import BeautifulSoup
+
+# Optional faster parsers; html.parser always works
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser  # selectolax < 1.0
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml  # noqa: F401  (only needed as a BeautifulSoup tree builder)
+except ImportError:
+    lxml = None
+
+PARSER_BACKENDS = [
+    name for name, available in (
+        ("selectolax", HTMLParser is not None),
+        ("lxml", lxml is not None),
+        ("html.parser", True),
+    ) if available
+]
+DEFAULT_BACKEND = os.environ.get("HTML_PARSER_BACKEND") or PARSER_BACKENDS[0]
+
+
+class BuildingPage:
+    # A building detail page, serialized out of the browser once and parsed once.
+
+    def __init__(self, html, backend=None):
+        self.backend = backend or DEFAULT_BACKEND
+        if self.backend not in PARSER_BACKENDS:
+            raise ValueError(f"HTML parser backend '{self.backend}' is not available (have: {', '.join(PARSER_BACKENDS)})")
+
+        self.html = html
+        if self.backend == "selectolax":
+            fields = _extract_selectolax(HTMLParser(html))
+        else:
+            fields = _extract_bs4(BeautifulSoup(html, self.backend))
+
+        self.name = fields["name"]
+        self.address = fields["address"]
+        self.city = fields["city"]
+        self.state = fields["state"]
+        self.zipcode = fields["zipcode"]
+        self.available_units = fields["available_units"]
+        self.unit_cards = fields["unit_cards"]
+
+    @classmethod
+    def from_driver(cls, driver, backend=None):
+        return cls(driver.page_source, backend=backend)
+
+
+def _parse_available_units(text):
+    match = re.search(r'(\d+)', text)
+    return int(match.group(1)) if match else None
+
+
+def _parse_sqft(text):
+    match = re.search(r'(\d{3,5})', text.replace(',', ''))
+    return match.group(1) if match else None
+
+
+def _extract_bs4(soup):
+    title_tag = soup.find('h1', class_='propertyName')
+    fields = {
+        "name": title_tag.get_text(strip=True) if title_tag else None,
+        "address": None, "city": None, "state": None, "zipcode": None,
+        "available_units": None,
+        "unit_cards": [],
+    }
+
+    address_block = soup.find('div', class_='propertyAddressRow')
+    if address_block:
+        address_span = address_block.find('span', class_='delivery-address')
+        if address_span:
+            fields["address"] = address_span.get_text(strip=True)
+            city_span = address_span.find_next_sibling('span')
+            if city_span:
+                fields["city"] = city_span.get_text(strip=True)
+            statezip_container = address_block.find('span', class_='stateZipContainer')
+            if statezip_container:
+                state_zip_spans = statezip_container.find_all('span')
+                if len(state_zip_spans) >= 2:
+                    fields["state"] = state_zip_spans[0].get_text(strip=True)
+                    fields["zipcode"] = state_zip_spans[1].get_text(strip=True)
+
+    availability_header = soup.find('div', class_='availability')
+    if availability_header:
+        fields["available_units"] = _parse_available_units(availability_header.get_text(strip=True))
+
+    for unit in soup.find_all('li', class_='unitContainer js-unitContainerV3'):
+        price_raw = unit.find('div', class_='pricingColumn')
+        sqft_raw = unit.find('div', class_='sqftColumn')
+        available_move_in_date = unit.find('div', class_='availableColumn')
+        fields["unit_cards"].append({
+            "unit_id": unit.get('data-unit'),
+            "unit_name": unit.get('data-model'),
+            "beds": unit.get('data-beds'),
+            "baths": unit.get('data-baths'),
+            "price_raw": price_raw.get_text(strip=True) if price_raw else None,
+            "sqft": _parse_sqft(sqft_raw.get_text(strip=True)) if sqft_raw else None,
+            "available_move_in_date": available_move_in_date.get_text(strip=True) if available_move_in_date else None,
+        })
+
+    return fields
+
+
+def _extract_selectolax(tree):
+    def text(node):
+        return node.text(strip=True) if node is not None else None
+
+    fields = {
+        "name": text(tree.css_first('h1.propertyName')),
+        "address": None, "city": None, "state": None, "zipcode": None,
+        "available_units": None,
+        "unit_cards": [],
+    }
+
+    address_block = tree.css_first('div.propertyAddressRow')
+    if address_block is not None:
+        address_span = address_block.css_first('span.delivery-address')
+        if address_span is not None:
+            fields["address"] = text(address_span)
+            sibling = address_span.next
+            while sibling is not None and sibling.tag != 'span':
+                sibling = sibling.next
+            if sibling is not None:
+                fields["city"] = text(sibling)
+            statezip_container = address_block.css_first('span.stateZipContainer')
+            if statezip_container is not None:
+                # traverse() yields the container itself first
+                state_zip_spans = [n for n in statezip_container.traverse() if n.tag == 'span'][1:]
+                if len(state_zip_spans) >= 2:
+                    fields["state"] = text(state_zip_spans[0])
+                    fields["zipcode"] = text(state_zip_spans[1])
+
+    availability_header = tree.css_first('div.availability')
+    if availability_header is not None:
+        fields["available_units"] = _parse_available_units(text(availability_header))
+
+    for unit in tree.css('li.unitContainer.js-unitContainerV3'):
+        sqft_raw = unit.css_first('div.sqftColumn')
+        fields["unit_cards"].append({
+            "unit_id": unit.attributes.get('data-unit'),
+            "unit_name": unit.attributes.get('data-model'),
+            "beds": unit.attributes.get('data-beds'),
+            "baths": unit.attributes.get('data-baths'),
+            "price_raw": text(unit.css_first('div.pricingColumn')),
+            "sqft": _parse_sqft(text(sqft_raw)) if sqft_raw is not None else None,
+            "available_move_in_date": text(unit.css_first('div.availableColumn')),
+        })
+
+    return fields
+
+
+def scrape_floorplans(page, listing_url, scrape_date=None, scrape_timestamp=None):
+    # scrape_date/scrape_timestamp default to now; reparsing an archived page passes its fetch time
+    try:
+        if not page.unit_cards:
+            logging.warning(f"No unitContainer elements found for building: {page.name} ({listing_url})")
+            # OPTIONAL: Add placeholder row here if you want a record of zero-units
+            return []
+
+        floorplans = []
+        seen_unit_ids = set()
+        for unit in page.unit_cards:
+            if unit["unit_id"] in seen_unit_ids:
+                continue
+            seen_unit_ids.add(unit["unit_id"])
+
+            floorplans.append({
+                "building_name": page.name,
+                "address": page.address,
+                "city": page.city,
+                "state": page.state,
+                "zipcode": page.zipcode,
+                "unit_name": unit["unit_name"],
+                "unit_id": unit["unit_id"],
+                "price_raw": unit["price_raw"],
+                "beds": unit["beds"],
+                "baths": unit["baths"],
+                "sqft": unit["sqft"],
+                "available_move_in_date": unit["available_move_in_date"],
+                "total_available_units": page.available_units,
+                "listing_url": listing_url,
+                "scrape_date": scrape_date or datetime.now().date(),
+                "scrape_timestamp": scrape_timestamp or datetime.now().isoformat()
+            })
+
+        return floorplans
+    except Exception as e:
+        logging.warning(f"Failed to scrape floorplans from {listing_url}: {e}")
+        return []
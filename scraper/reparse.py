@@ -0,0 +1,64 @@
+# scraper/reparse.py
+#
+# Re-run floorplan extraction over an archived scrape day and rewrite its bronze rows.
+#   python -m scraper.reparse 2025-05-07 --workers 8
+
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.database import create_bronze_table, replace_bronze_for_date
+from scraper.archive import read_manifest, read_page, archived_dates
+from scraper.page import BuildingPage, scrape_floorplans
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+
+def _reparse_entry(args):
+    entry, scrape_date, backend = args
+    page = BuildingPage(read_page(entry), backend=backend)
+    return scrape_floorplans(page, entry["url"], scrape_date=scrape_date, scrape_timestamp=entry["fetched_at"])
+
+
+def reparse_day(scrape_date, workers=None, backend=None, write=True):
+    # A building fetched twice in one day (e.g. a resumed run) keeps its last fetch
+    latest = {}
+    for entry in read_manifest(scrape_date, kind="detail"):
+        latest[entry["url"]] = entry
+    if not latest:
+        logging.warning(f"No archived detail pages for {scrape_date}.")
+        return []
+
+    started = time.time()
+    jobs = [(entry, scrape_date, backend) for entry in latest.values()]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_reparse_entry, jobs, chunksize=8))
+
+    listings = [floorplan for floorplans in results for floorplan in floorplans]
+    elapsed = time.time() - started
+    logging.info(f"Re-parsed {len(jobs)} buildings into {len(listings)} units for {scrape_date} "
+                 f"in {elapsed:.1f}s ({len(jobs) / elapsed:.0f} pages/s)")
+
+    if write:
+        create_bronze_table()
+        replace_bronze_for_date(scrape_date, listings)
+    return listings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild bronze for an archived scrape day from its saved HTML.")
+    parser.add_argument("scrape_date", nargs="?", help="YYYY-MM-DD (default: latest archived day)")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument("--backend", default=None, help="HTML parser backend (selectolax, lxml, html.parser)")
+    parser.add_argument("--dry-run", action="store_true", help="parse only, leave bronze untouched")
+    args = parser.parse_args()
+
+    scrape_date = args.scrape_date or (archived_dates() or [None])[-1]
+    if not scrape_date:
+        logging.warning("HTML archive is empty.")
+    else:
+        reparse_day(scrape_date, workers=args.workers, backend=args.backend, write=not args.dry_run)
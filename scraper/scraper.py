@@ -1,13 +1,13 @@
 # scraper/scraper.py
 
 import time
+import argparse
 import csv
 import os
-import re
 import logging
-import warnings
 import contextlib
-import ctypes
+import queue
+import threading
 import undetected_chromedriver as uc
 from datetime import datetime
 from selenium.webdriver.common.by import By
@@ -16,7 +16,9 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from database.database import create_bronze_table, insert_bronze_listing
+from database.database import create_bronze_table, insert_bronze_listings
+from scraper.page import BuildingPage, scrape_floorplans
+from scraper.archive import archive_page
 
 # Setup
 @contextlib.contextmanager
@@ -37,7 +39,16 @@ CHROME_PATH = os.environ.get("CHROMEDRIVER_PATH", ChromeDriverManager().install(
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
 
-def fetch_listings():
+SEARCH_URL = "https://www.apartments.com/des-moines-ia/"
+BUILDING_LIMIT = 200 #SHOULD BE 200 as of May 2nd, 2025
+MAX_PAGES = 10
+SCRAPER_WORKERS = int(os.environ.get("SCRAPER_WORKERS", "1"))
+
+# uc.Chrome patches the chromedriver binary on launch, so parallel launches must not race
+_driver_lock = threading.Lock()
+
+
+def create_driver():
     options = uc.ChromeOptions()
     #options.binary_location = "/usr/bin/google-chrome" #this is specific to this version, done for live launch!
     options.headless = True
@@ -47,177 +58,175 @@ def fetch_listings():
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
 
-    driver = uc.Chrome(driver_executable_path=CHROME_PATH, options=options)
+    with _driver_lock:
+        return uc.Chrome(driver_executable_path=CHROME_PATH, options=options)
 
-    listings = []
-    seen_building_urls = set()
-    buildings_scraped = 0
-    building_limit = 200 #SHOULD BE 200 as of May 2nd, 2025
 
-    try:
-        url = "https://www.apartments.com/des-moines-ia/"
-        driver.get(url)
-        time.sleep(5)
+def quit_driver(driver):
+    with suppress_oserror_6():
+        driver.quit()
 
-        page = 1
-        max_pages = 10
 
-        while page <= max_pages and buildings_scraped < building_limit:
-            logging.info(f"Scraping page {page}...")
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            cards = soup.find_all('li', class_='mortar-wrapper')
+def fetch_listings(workers=SCRAPER_WORKERS):
+    # Frontier order, like the serial scraper, so the CSV and bronze ids don't depend on worker timing
+    listings = []
+    buildings_scraped = 0
+    for listing_url, floorplans in iter_building_batches(workers, ordered=True):
+        listings.extend(floorplans)
+        buildings_scraped += 1
+    return listings, buildings_scraped
 
-            for card in cards:
-                if buildings_scraped >= building_limit:
-                    break
 
-                try:
-                    link_tag = card.find('a', class_='property-link', href=True)
-                    if not link_tag:
-                        continue
-                    listing_url = link_tag['href']
-                    if listing_url in seen_building_urls:
-                        continue
-                    seen_building_urls.add(listing_url)
+def iter_building_batches(workers=SCRAPER_WORKERS, skip_urls=(), scrape_date=None, ordered=False):
+    # Phase 1 walks the result pages once to build the frontier of building URLs,
+    # phase 2 loads each detail page directly instead of clicking in and back out.
+    # Yields (listing_url, floorplans) in completion order as each building finishes so callers
+    # can persist as they go. ordered=True holds results back and yields them in frontier order
+    # once every worker is done; failed buildings are skipped either way.
+    workers = max(1, workers or 1)
+    started = time.time()
 
-                    logging.info(f"[{datetime.now().strftime('%H:%M:%S')}] Scraping building {buildings_scraped + 1} of page {page}")
+    driver = create_driver()
+    try:
+        frontier = collect_building_urls(driver)
+    except Exception:
+        quit_driver(driver)
+        raise
+    pending = [listing_url for listing_url in frontier if listing_url not in skip_urls]
+    logging.info(f"Collected {len(frontier)} building URLs in {time.time() - started:.0f}s"
+                 + (f", {len(frontier) - len(pending)} already done" if skip_urls else ""))
+
+    url_queue = queue.Queue()
+    for listing_url in pending:
+        url_queue.put(listing_url)
+
+    result_queue = queue.Queue()
+    stop = threading.Event()
+    stats = [{"worker": i + 1, "buildings": 0, "units": 0, "failures": 0, "seconds": 0.0} for i in range(workers)]
+
+    # The index driver is already warm, so it becomes worker 1
+    threads = [
+        threading.Thread(target=_scrape_worker, args=(url_queue, result_queue, stats[i], stop, scrape_date),
+                         kwargs={"driver": driver if i == 0 else None}, name=f"scraper-{i + 1}", daemon=True)
+        for i in range(workers)
+    ]
+    for thread in threads:
+        url_queue.put(None)
+        thread.start()
 
-                    listing_element = driver.find_element(By.XPATH, f"//a[@href='{listing_url}']")
-                    driver.execute_script("arguments[0].click();", listing_element)
-                    time.sleep(3)
+    buildings_scraped = 0
+    held = {}
+    try:
+        finished = 0
+        while finished < len(threads):
+            result = result_queue.get()
+            if result is None:
+                finished += 1
+                continue
+            buildings_scraped += 1
+            if ordered:
+                held[result[0]] = result
+            else:
+                yield result
+        for listing_url in pending:
+            if listing_url in held:
+                yield held.pop(listing_url)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
 
-                    building_name = get_building_name(driver)
-                    floorplans = scrape_floorplans(driver, building_name, listing_url)
-                    listings.extend(floorplans)
+        if workers > 1:
+            for s in stats:
+                logging.info(f"Worker {s['worker']}: {s['buildings']} buildings, {s['units']} units, "
+                             f"{s['failures']} failures in {s['seconds']:.0f}s")
+        logging.info(f"Scraped {buildings_scraped} buildings with {workers} worker(s) in {time.time() - started:.0f}s")
 
-                    buildings_scraped += 1
-                    driver.back()
-                    time.sleep(3)
 
-                except Exception as e:
-                    logging.warning(f"Failed to scrape listing: {e}")
-                    try:
-                        driver.back()
-                        time.sleep(3)
-                    except:
-                        pass
-                    continue
-
-            if buildings_scraped < building_limit:
-                try:
-                    next_button = driver.find_element(By.CSS_SELECTOR, 'a.next')
-                    if next_button and next_button.is_enabled():
-                        next_button.click()
-                        page += 1
-                        time.sleep(5)
-                    else:
-                        break
-                except Exception as e:
-                    logging.warning(f"No next button or error: {e}")
-                    break
+def collect_building_urls(driver, building_limit=BUILDING_LIMIT, max_pages=MAX_PAGES):
+    frontier = []
+    seen_building_urls = set()
 
-    finally:
+    driver.get(SEARCH_URL)
+    time.sleep(5)
+
+    page = 1
+    while page <= max_pages and len(frontier) < building_limit:
+        logging.info(f"Collecting building links from page {page}...")
+        html = driver.page_source
+        archive_page("index", SEARCH_URL, html, page=page)
+        soup = BeautifulSoup(html, 'html.parser')
+
+        for card in soup.find_all('li', class_='mortar-wrapper'):
+            if len(frontier) >= building_limit:
+                break
+            link_tag = card.find('a', class_='property-link', href=True)
+            if not link_tag or link_tag['href'] in seen_building_urls:
+                continue
+            seen_building_urls.add(link_tag['href'])
+            frontier.append(link_tag['href'])
 
-        with suppress_oserror_6():
-            driver.quit()
-            del driver
+        if len(frontier) >= building_limit:
+            break
+        try:
+            next_button = driver.find_element(By.CSS_SELECTOR, 'a.next')
+            if next_button and next_button.is_enabled():
+                next_button.click()
+                page += 1
+                time.sleep(5)
+            else:
+                break
+        except Exception as e:
+            logging.warning(f"No next button or error: {e}")
+            break
 
-            
-        
-        
+    return frontier
 
 
+def scrape_building(driver, listing_url, scrape_date=None):
+    driver.get(listing_url)
+    time.sleep(3)
 
+    html = driver.page_source
+    archive_page("detail", listing_url, html, scrape_date=scrape_date)
+    page = BuildingPage(html)
+    return page.name, scrape_floorplans(page, listing_url, scrape_date=scrape_date)
 
-    return listings, buildings_scraped
 
-def get_building_name(driver):
+def _scrape_worker(url_queue, result_queue, stats, stop, scrape_date=None, driver=None):
     try:
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        title_tag = soup.find('h1', class_='propertyName')
-        return title_tag.get_text(strip=True) if title_tag else None
-    except:
-        return None
+        if driver is None:
+            try:
+                driver = create_driver()
+            except Exception as e:
+                # The remaining workers keep draining the queue
+                logging.error(f"Worker {stats['worker']} could not start a browser: {e}")
+                return
+
+        try:
+            while not stop.is_set():
+                listing_url = url_queue.get()
+                if listing_url is None:
+                    break
 
-def scrape_floorplans(driver, building_name, listing_url):
-    try:
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        floorplans = []
-
-        address = city = state = zipcode = None
-        address_block = soup.find('div', class_='propertyAddressRow')
-        if address_block:
-            address_span = address_block.find('span', class_='delivery-address')
-            if address_span:
-                address = address_span.get_text(strip=True)
-                city_span = address_span.find_next_sibling('span')
-                if city_span:
-                    city = city_span.get_text(strip=True)
-                statezip_container = address_block.find('span', class_='stateZipContainer')
-                if statezip_container:
-                    state_zip_spans = statezip_container.find_all('span')
-                    if len(state_zip_spans) >= 2:
-                        state = state_zip_spans[0].get_text(strip=True)
-                        zipcode = state_zip_spans[1].get_text(strip=True)
-
-        seen_unit_ids = set()
-        available_units = None
-        availability_header = soup.find('div', class_='availability')
-        if availability_header:
-            match = re.search(r'(\d+)', availability_header.get_text(strip=True))
-            if match:
-                available_units = int(match.group(1))
-
-        # ✅ New: Check if unit containers exist
-        unit_cards = soup.find_all('li', class_='unitContainer js-unitContainerV3')
-        if not unit_cards:
-            logging.warning(f"No unitContainer elements found for building: {building_name} ({listing_url})")
-            # OPTIONAL: Add placeholder row here if you want a record of zero-units
-            return []
-
-        for unit in unit_cards:
-            unit_id = unit.get('data-unit')
-            if unit_id in seen_unit_ids:
-                continue
-            seen_unit_ids.add(unit_id)
-
-            unit_name = unit.get('data-model')
-            beds = unit.get('data-beds')
-            baths = unit.get('data-baths')
-
-            price_raw = unit.find('div', class_='pricingColumn')
-            sqft_raw = unit.find('div', class_='sqftColumn')
-            available_move_in_date = unit.find('div', class_='availableColumn')
-
-            sqft = None
-            if sqft_raw:
-                match = re.search(r'(\d{3,5})', sqft_raw.get_text(strip=True).replace(',', ''))
-                if match:
-                    sqft = match.group(1)
-
-            floorplans.append({
-                "building_name": building_name,
-                "address": address,
-                "city": city,
-                "state": state,
-                "zipcode": zipcode,
-                "unit_name": unit_name,
-                "unit_id": unit_id,
-                "price_raw": price_raw.get_text(strip=True) if price_raw else None,
-                "beds": beds,
-                "baths": baths,
-                "sqft": sqft,
-                "available_move_in_date": available_move_in_date.get_text(strip=True) if available_move_in_date else None,
-                "total_available_units": available_units,
-                "listing_url": listing_url,
-                "scrape_date": datetime.now().date(),
-                "scrape_timestamp": datetime.now().isoformat()
-            })
-
-        return floorplans
-    except Exception as e:
-        logging.warning(f"Failed to scrape floorplans from {listing_url}: {e}")
-        return []
+                started = time.time()
+                try:
+                    building_name, floorplans = scrape_building(driver, listing_url, scrape_date)
+                    result_queue.put((listing_url, floorplans))
+
+                    stats["buildings"] += 1
+                    stats["units"] += len(floorplans)
+                    logging.info(f"[{datetime.now().strftime('%H:%M:%S')}] Worker {stats['worker']} scraped building "
+                                 f"{stats['buildings']}: {building_name or listing_url}")
+                except Exception as e:
+                    stats["failures"] += 1
+                    logging.warning(f"Worker {stats['worker']} failed to scrape {listing_url}: {e}")
+                finally:
+                    stats["seconds"] += time.time() - started
+        finally:
+            quit_driver(driver)
+    finally:
+        result_queue.put(None)
 
 def save_listings_to_csv(listings):
     os.makedirs(EXPORT_DIR, exist_ok=True)
@@ -234,12 +243,16 @@ def save_listings_to_csv(listings):
 
 def save_listings_to_db(listings):
     create_bronze_table()
-    for listing in listings:
-        insert_bronze_listing(listing)
+    insert_bronze_listings(listings)
     logging.info(f"Inserted {len(listings)} listings into bronze_listings table.")
 
 if __name__ == "__main__":
-    listings = fetch_listings()
+    parser = argparse.ArgumentParser(description="Scrape apartments.com listings into CSV and bronze.")
+    parser.add_argument("--workers", type=int, default=SCRAPER_WORKERS,
+                        help="number of parallel browser sessions (default: $SCRAPER_WORKERS or 1)")
+    args = parser.parse_args()
+
+    listings, _ = fetch_listings(workers=args.workers)
     if listings:
         os.makedirs(EXPORT_DIR, exist_ok=True)  # <-- explicitly make sure it's created
         save_listings_to_csv(listings)